@@ -6,7 +6,7 @@ import logging
 from apps.activity_log.utils.functions import log_request
 from . import serializers
 from .models import *
-from config.utils.pagination import CustomPageNumberPagination
+from config.utils.pagination import get_paginator
 from .utils.permissions import ActivityLogManagementPermission
 logger = logging.getLogger("myapp")
 
@@ -21,7 +21,7 @@ class GetActivityLogView(APIView):
     def get(self, request):
         try:
             instances = ActivityLog.objects.all().order_by("-timestamp")
-            paginator = CustomPageNumberPagination()
+            paginator = get_paginator(request, ordering="-timestamp")
             result_page = paginator.paginate_queryset(instances, request)
             serializer = serializers.AdminActivityLogSerializer(
                 result_page, many=True)
@@ -54,7 +54,7 @@ class MyActivityLogView(APIView):
     def get(self, request):
         try:
             instances = ActivityLog.objects.filter(user=request.user).order_by("-timestamp")
-            paginator = CustomPageNumberPagination()
+            paginator = get_paginator(request, ordering="-timestamp")
             result_page = paginator.paginate_queryset(instances, request)
             serializer = serializers.ActivityLogSerializer(
                 result_page, many=True)
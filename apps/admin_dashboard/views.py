@@ -6,7 +6,7 @@ import logging
 from apps.activity_log.utils.functions import log_request
 from . import serializers
 from .models import *
-from config.utils.pagination import CustomPageNumberPagination
+from config.utils.pagination import CustomPageNumberPagination, get_paginator
 from apps.authentication.models import Customer
 from apps.products.models import Product,ProductVariant
 logger = logging.getLogger("myapp")
@@ -22,7 +22,7 @@ class AllProductsView(APIView):
     def get(self, request):
         try:
             instances = Product.objects.select_related('brand','category','store').all().order_by("id")
-            paginator = CustomPageNumberPagination()
+            paginator = get_paginator(request, ordering="id")
             result_page = paginator.paginate_queryset(instances, request)
             serializer = serializers.AllProductSerializer(
                 result_page, many=True)
@@ -11,6 +11,7 @@ from .serializers import (
     CartAddProductSerializer, CartItemUpdateSerializer
 )
 from .services.cart_manage import get_or_create_cart
+from apps.products.services.event_counter import ProductEventCounter
 
 
 
@@ -135,6 +136,9 @@ class CartView(APIView):
             )["total"] or 0
             cart.save()
 
+            # buffered in Redis, flushed into ProductAnalytics.add_to_cart
+            ProductEventCounter.record(product.id, "add_to_cart")
+
             return Response({
                 "code": 201,
                 "status": "success",
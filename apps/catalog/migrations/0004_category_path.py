@@ -0,0 +1,43 @@
+# Generated by Django 5.2.7 on 2026-10-18 06:29
+
+from django.db import migrations, models
+
+
+def backfill_category_paths(apps, schema_editor):
+    Category = apps.get_model('catalog', 'Category')
+
+    parents = dict(Category.objects.values_list('id', 'parent_id'))
+    paths = {}
+
+    def path_of(category_id):
+        if category_id not in paths:
+            parent_id = parents[category_id]
+            paths[category_id] = (path_of(parent_id) if parent_id else '') + f"{category_id:010d}/"
+        return paths[category_id]
+
+    batch = []
+    for category_id in parents:
+        path = path_of(category_id)
+        batch.append(Category(pk=category_id, path=path, depth=path.count('/') - 1))
+    Category.objects.bulk_update(batch, ['path', 'depth'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0003_carouselimage_categorygridimage'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='depth',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='category',
+            name='path',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=255),
+        ),
+        migrations.RunPython(backfill_category_paths, migrations.RunPython.noop),
+    ]
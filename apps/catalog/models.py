@@ -1,6 +1,8 @@
 # apps/catalog/models.py
-from django.db import models
-from django.utils.text import slugify
+from django.db import models, transaction
+from django.db.models import F, Value
+from django.db.models.functions import Concat, Substr
+from config.utils.slugs import allocate_slugs
 
 class CatalogBaseModel(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
@@ -12,6 +14,9 @@ class CatalogBaseModel(models.Model):
         
 
 class Category(CatalogBaseModel):
+    # width of one id segment in `path`; ids sort and prefix-match as fixed-width strings
+    PATH_STEP = 10
+
     name = models.CharField(max_length=255)
     slug = models.SlugField(unique=True)
     parent = models.ForeignKey(
@@ -19,18 +24,79 @@ class Category(CatalogBaseModel):
     )
     icon = models.ImageField(upload_to="category_icons/", blank=True, null=True)
     display_order = models.IntegerField(default=0)
+    # materialized path: zero-padded ids from the root down to this category, each followed by "/"
+    path = models.CharField(max_length=255, default="", editable=False, db_index=True)
+    depth = models.PositiveSmallIntegerField(default=0, editable=False)
 
+    @classmethod
+    def path_segment(cls, pk):
+        return f"{pk:0{cls.PATH_STEP}d}/"
 
     def save(self, *args, **kwargs):
         if not self.slug:
-            base_slug = slugify(self.name)
-            slug = base_slug
-            counter = 1
-            while Category.objects.filter(slug=slug).exists():
-                slug = f"{base_slug}-{counter}"
-                counter += 1
-            self.slug = slug
-        super().save(*args, **kwargs)
+            self.slug = allocate_slugs(Category, [self.name])[0]
+        update_fields = kwargs.get("update_fields")
+        sync_path = self.pk is None or not self.path or update_fields is None or "parent" in update_fields
+        moved = False
+        if sync_path:
+            parent_path = ""
+            if self.parent_id:
+                parent_path = Category.objects.filter(pk=self.parent_id).values_list("path", flat=True).first() or ""
+            old_path = Category.objects.filter(pk=self.pk).values_list("path", flat=True).first() if self.pk else None
+            if old_path and parent_path.startswith(old_path):
+                raise ValueError("A category cannot be moved under itself or one of its descendants.")
+        from apps.images.services.derivatives import ImageDerivativeService
+        uploads = ImageDerivativeService.new_uploads(self, ["icon"])
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if sync_path:
+                moved = self._sync_path(parent_path, old_path)
+
+        from apps.products.services.home_rails import HomeRailService
+        from apps.products.services.suggest import ProductSuggestService
+        from apps.products.services.facets import ProductFacetService
+        from apps.home.services.home_page import HomePageService
+        from .services.category_tree import CategoryTreeService
+        HomeRailService.invalidate()
+        ProductSuggestService.index_catalog(Category, self.pk)
+        CategoryTreeService.invalidate()
+        # carousel and grid images embed their category
+        HomePageService.invalidate(["carousel", "category_grid"])
+        if moved:
+            # listings of the old and new ancestors now cover a different set of products
+            ProductFacetService.invalidate()
+        ImageDerivativeService.schedule(self, uploads)
+
+    def _sync_path(self, parent_path, old_path):
+        """
+        Write this category's path and depth and, after a move, re-root its subtree with one
+        UPDATE. Returns whether an existing category changed place in the tree.
+        """
+        path = parent_path + self.path_segment(self.pk)
+        depth = path.count("/") - 1
+        if path != old_path:
+            Category.objects.filter(pk=self.pk).update(path=path, depth=depth)
+        if old_path and old_path != path:
+            Category.objects.filter(path__startswith=old_path).exclude(pk=self.pk).update(
+                path=Concat(Value(path), Substr("path", len(old_path) + 1)),
+                depth=F("depth") + (depth - (old_path.count("/") - 1)),
+            )
+        self.path, self.depth = path, depth
+        return bool(old_path) and old_path != path
+
+    def delete(self, *args, **kwargs):
+        pk = self.pk
+        result = super().delete(*args, **kwargs)
+
+        from apps.products.services.home_rails import HomeRailService
+        from apps.products.services.suggest import ProductSuggestService
+        from apps.home.services.home_page import HomePageService
+        from .services.category_tree import CategoryTreeService
+        HomeRailService.invalidate()
+        ProductSuggestService.index_catalog(Category, pk)
+        CategoryTreeService.invalidate()
+        HomePageService.invalidate(["carousel", "category_grid"])
+        return result
         
     class Meta:
         indexes = [
@@ -50,14 +116,22 @@ class Brand(CatalogBaseModel):
 
     def save(self, *args, **kwargs):
         if not self.slug:
-            base_slug = slugify(self.name)
-            slug = base_slug
-            counter = 1
-            while Brand.objects.filter(slug=slug).exists():
-                slug = f"{base_slug}-{counter}"
-                counter += 1
-            self.slug = slug
+            self.slug = allocate_slugs(Brand, [self.name])[0]
+        from apps.images.services.derivatives import ImageDerivativeService
+        uploads = ImageDerivativeService.new_uploads(self, ["logo"])
         super().save(*args, **kwargs)
+
+        from apps.products.services.suggest import ProductSuggestService
+        ProductSuggestService.index_catalog(Brand, self.pk)
+        ImageDerivativeService.schedule(self, uploads)
+
+    def delete(self, *args, **kwargs):
+        pk = self.pk
+        result = super().delete(*args, **kwargs)
+
+        from apps.products.services.suggest import ProductSuggestService
+        ProductSuggestService.index_catalog(Brand, pk)
+        return result
     
     def __str__(self):
         return self.name
@@ -92,6 +166,22 @@ class CategoryGridImage(CatalogBaseModel):
     image = models.ImageField(upload_to="category_grid_images/")
     display_order = models.IntegerField(default=0)
     
+    def save(self, *args, **kwargs):
+        from apps.images.services.derivatives import ImageDerivativeService
+        uploads = ImageDerivativeService.new_uploads(self, ["image"])
+        super().save(*args, **kwargs)
+
+        from apps.home.services.home_page import HomePageService
+        HomePageService.invalidate(["category_grid"])
+        ImageDerivativeService.schedule(self, uploads)
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+
+        from apps.home.services.home_page import HomePageService
+        HomePageService.invalidate(["category_grid"])
+        return result
+
     def __str__(self):
         return self.category.name
     
@@ -100,5 +190,21 @@ class CarouselImage(CatalogBaseModel):
     image = models.ImageField(upload_to="carousel_images/")
     display_order = models.IntegerField(default=0)
     
+    def save(self, *args, **kwargs):
+        from apps.images.services.derivatives import ImageDerivativeService
+        uploads = ImageDerivativeService.new_uploads(self, ["image"])
+        super().save(*args, **kwargs)
+
+        from apps.home.services.home_page import HomePageService
+        HomePageService.invalidate(["carousel"])
+        ImageDerivativeService.schedule(self, uploads)
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+
+        from apps.home.services.home_page import HomePageService
+        HomePageService.invalidate(["carousel"])
+        return result
+
     def __str__(self):
         return self.category.name
\ No newline at end of file
@@ -1,6 +1,9 @@
 from rest_framework import serializers
 from .models import Category, Brand,CategoryGridImage,CarouselImage
 from django.utils import timezone
+from apps.products.tasks import reindex_product_search_documents, drop_product_details
+from apps.products.services.facets import ProductFacetService
+from apps.images.serializers import DerivativeListSerializer, ImageSetField
 
 
 class CategorySerializer(serializers.Serializer):
@@ -62,6 +65,12 @@ class CategorySerializer(serializers.Serializer):
                 )
         else:
             # 2. Logic for PATCH (Update):
+            # A category cannot be moved under itself or one of its descendants.
+            if self.instance.path and parent_category.path.startswith(self.instance.path):
+                raise serializers.ValidationError(
+                    f"Cannot assign to '{parent_category.name}': it is this category or one of its subcategories."
+                )
+
             # Check if the 'parent' field is being changed in this update request.
             original_parent = self.instance.parent
             
@@ -84,6 +93,7 @@ class CategorySerializer(serializers.Serializer):
         return category
 
     def update(self, instance, validated_data):
+        old_name = instance.name
         instance.name = validated_data.get('name', instance.name)
         instance.parent = validated_data.get('parent', instance.parent)
         instance.icon = validated_data.get('icon', instance.icon)
@@ -91,6 +101,10 @@ class CategorySerializer(serializers.Serializer):
         instance.display_order = validated_data.get('display_order', instance.display_order)
         instance.updated_at = timezone.now()
         instance.save()
+        if instance.name != old_name:
+            reindex_product_search_documents.delay_on_commit(category_id=instance.id)
+            drop_product_details.delay_on_commit(category_id=instance.id)
+            ProductFacetService.invalidate()
         return instance
     
 
@@ -102,26 +116,16 @@ class CategoryParentDataSerializer(serializers.ModelSerializer):
 
 class CategorySerializerForView(serializers.ModelSerializer):
     parent = CategoryParentDataSerializer(read_only=True)
+    icon_set = ImageSetField("icon", size="thumb")
 
     class Meta:
         model = Category
-        fields = ['id', 'name', 'slug', 'parent', 'icon', 'display_order']
+        list_serializer_class = DerivativeListSerializer
+        fields = ['id', 'name', 'slug', 'parent', 'icon', 'icon_set', 'display_order']
         
 
 
 
-class CategoryTreeViewSerializer(serializers.ModelSerializer):
-    children = serializers.SerializerMethodField()
-
-    class Meta:
-        model = Category
-        fields = ['id', 'name', 'slug', 'icon', 'display_order', 'children']
-
-    def get_children(self, obj):
-        children = obj.children.filter(is_active=True).order_by('display_order')
-        return CategoryTreeViewSerializer(children, many=True).data
-
-
 class BrandSerializer(serializers.Serializer):
     id = serializers.IntegerField(read_only=True)
     name = serializers.CharField(max_length=255)
@@ -155,18 +159,26 @@ class BrandSerializer(serializers.Serializer):
         return brand
 
     def update(self, instance, validated_data):
+        old_name = instance.name
         instance.name = validated_data.get('name', instance.name)
         instance.logo = validated_data.get('logo', instance.logo)
         instance.display_order = validated_data.get('display_order', instance.display_order)
         instance.is_active = validated_data.get('is_active', instance.is_active)
         instance.updated_at = timezone.now()
         instance.save()
+        if instance.name != old_name:
+            reindex_product_search_documents.delay_on_commit(brand_id=instance.id)
+            drop_product_details.delay_on_commit(brand_id=instance.id)
+            ProductFacetService.invalidate()
         return instance
     
 class BrandSerializerForView(serializers.ModelSerializer):
+    logo_set = ImageSetField("logo", size="thumb")
+
     class Meta:
         model = Brand
-        fields = ['id', 'name', 'slug', 'logo', 'display_order']
+        list_serializer_class = DerivativeListSerializer
+        fields = ['id', 'name', 'slug', 'logo', 'logo_set', 'display_order']
 
 
 class BrandDetailSerializer(serializers.ModelSerializer):
@@ -185,8 +197,11 @@ class CategoryGridImageSerializer(serializers.Serializer):
         return category_grid_image
 
 class CategoryGridImageSerializerForView(serializers.ModelSerializer):
+    image_set = ImageSetField("image", size="medium")
+
     class Meta:
         model = CategoryGridImage
+        list_serializer_class = DerivativeListSerializer
         fields = '__all__'
         depth = 1
         
@@ -201,7 +216,10 @@ class CarouselImageSerializer(serializers.Serializer):
         return carousel_image
         
 class CarouselImageSerializerForView(serializers.ModelSerializer):
+    image_set = ImageSetField("image", size="large")
+
     class Meta:
         model = CarouselImage
+        list_serializer_class = DerivativeListSerializer
         fields = '__all__'
         depth = 1
\ No newline at end of file
@@ -0,0 +1,113 @@
+import logging
+
+from django.core.cache import cache
+from django.db import transaction
+
+from ..models import Category
+
+logger = logging.getLogger("myapp")
+
+
+CATEGORY_TREE_CACHE_KEY = "category_tree"
+CATEGORY_DESCENDANTS_CACHE_KEY = "category_descendants"
+# the tree is dropped on every category write; the timeout only bounds a missed invalidation
+CATEGORY_TREE_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+class CategoryTreeService:
+    """
+    The active category tree (navigation menu) as one cached payload.
+
+    The tree is built from a single query ordered by depth, so every parent is placed
+    before its children and the nesting is done in memory; children of an inactive
+    category are left out with it. The result is stored under one django-redis key and
+    dropped on any category save or delete, so a warm menu costs no queries.
+
+    The same goes for the descendant map (slug -> ids of the category and everything
+    under it), which lets listings filter a parent category with one `category_id IN (...)`.
+    """
+
+    @staticmethod
+    def _icon_url(icon):
+        if not icon:
+            return None
+        try:
+            return icon.url
+        except ValueError:
+            return None
+
+    @classmethod
+    def build(cls):
+        from apps.images.services.derivatives import ImageDerivativeService
+
+        categories = list(
+            Category.objects.filter(is_active=True)
+            .order_by("depth", "display_order", "id")
+            .only("id", "name", "slug", "icon", "display_order", "parent_id", "depth")
+        )
+        derivatives = ImageDerivativeService.lookup(category.icon.name for category in categories if category.icon)
+
+        nodes, roots = {}, []
+        for category in categories:
+            node = {
+                "id": category.id,
+                "name": category.name,
+                "slug": category.slug,
+                "icon": cls._icon_url(category.icon),
+                "icon_set": ImageDerivativeService.image_set(
+                    category.icon.name, derivatives[category.icon.name], size="thumb"
+                ) if category.icon else None,
+                "display_order": category.display_order,
+                "children": [],
+            }
+            if category.parent_id is None:
+                roots.append(node)
+            elif category.parent_id in nodes:
+                nodes[category.parent_id]["children"].append(node)
+            else:
+                # under an inactive category
+                continue
+            nodes[category.id] = node
+        return roots
+
+    @classmethod
+    def get(cls):
+        tree = cache.get(CATEGORY_TREE_CACHE_KEY)
+        if tree is None:
+            tree = cls.build()
+            cache.set(CATEGORY_TREE_CACHE_KEY, tree, timeout=CATEGORY_TREE_CACHE_TIMEOUT)
+        return tree
+
+    @staticmethod
+    def build_descendants():
+        """{slug: [category id, descendant ids...]} from the materialized paths, in one query."""
+        rows = list(Category.objects.values_list("id", "slug", "path"))
+        slugs = {category_id: slug for category_id, slug, _ in rows}
+        descendants = {slug: [] for slug in slugs.values()}
+        for category_id, _, path in rows:
+            # every id on the path is the category itself or one of its ancestors
+            for segment in path.split("/")[:-1]:
+                ancestor_slug = slugs.get(int(segment))
+                if ancestor_slug is not None:
+                    descendants[ancestor_slug].append(category_id)
+        return descendants
+
+    @classmethod
+    def descendant_map(cls):
+        descendants = cache.get(CATEGORY_DESCENDANTS_CACHE_KEY)
+        if descendants is None:
+            descendants = cls.build_descendants()
+            cache.set(CATEGORY_DESCENDANTS_CACHE_KEY, descendants, timeout=CATEGORY_TREE_CACHE_TIMEOUT)
+        return descendants
+
+    @classmethod
+    def descendant_ids(cls, slug):
+        """Ids of the category and all of its descendants; [] for an unknown slug."""
+        return cls.descendant_map().get(slug, [])
+
+    @staticmethod
+    def invalidate():
+        keys = [CATEGORY_TREE_CACHE_KEY, CATEGORY_DESCENDANTS_CACHE_KEY]
+        # again after commit, so a read racing the write cannot re-cache the old tree
+        cache.delete_many(keys)
+        transaction.on_commit(lambda: cache.delete_many(keys))
@@ -10,6 +10,7 @@ import logging
 logger = logging.getLogger("myapp")
 from rest_framework.permissions import IsAuthenticated,IsAdminUser
 from config.utils.pagination import CustomPageNumberPagination
+from .services.category_tree import CategoryTreeService
 
 
 
@@ -181,18 +182,16 @@ class CategoryDetailView(APIView):
 class CategoryTreeView(APIView):
     def get(self, request):
         try:
-            # Fetch top-level categories (categories with no parent)
-            top_level_categories = models.Category.objects.filter(parent__isnull=True, is_active=True).order_by('display_order')
+            # Whole active tree from the cache; paginated over the top-level categories
             pagination_data = CustomPageNumberPagination()
-            top_level_categories = pagination_data.paginate_queryset(top_level_categories, request)
-            serializer = serializers.CategoryTreeViewSerializer(top_level_categories, many=True)
+            top_level_categories = pagination_data.paginate_queryset(CategoryTreeService.get(), request)
             
             log_request(request, "Category tree fetched", "info","Category tree fetched successfully", response_status_code=status.HTTP_200_OK)
             return pagination_data.get_paginated_response({
                 "code": status.HTTP_200_OK,
                 "status": "success",
                 "message": "Category tree fetched successfully",
-                "data": serializer.data
+                "data": top_level_categories
             }, status=status.HTTP_200_OK)
         except Exception as e:
             logger.exception(str(e))
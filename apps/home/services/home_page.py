@@ -0,0 +1,94 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from django.core.cache import cache
+from django.db import connections, transaction
+
+from apps.catalog.models import CarouselImage, CategoryGridImage
+from apps.catalog.serializers import CarouselImageSerializerForView, CategoryGridImageSerializerForView
+from apps.catalog.services.category_tree import CATEGORY_TREE_CACHE_KEY, CATEGORY_TREE_CACHE_TIMEOUT, CategoryTreeService
+from apps.products.services.home_rails import HOME_RAIL_CACHE_TIMEOUT, HomeRailService
+
+logger = logging.getLogger("myapp")
+
+
+HOME_FRAGMENT_CACHE_PREFIX = "home_fragments"
+# banners change rarely and are dropped on every write
+HOME_IMAGE_CACHE_TIMEOUT = 60 * 60 * 6
+
+
+def build_carousel():
+    images = CarouselImage.objects.select_related("category").order_by("-display_order", "created_at")
+    return CarouselImageSerializerForView(images, many=True).data
+
+
+def build_category_grid():
+    images = CategoryGridImage.objects.select_related("category").order_by("-display_order", "created_at")
+    return CategoryGridImageSerializerForView(images, many=True).data
+
+
+class HomePageService:
+    """
+    The storefront homepage as one payload assembled from independently cached fragments.
+
+    Every section keeps its own cache key, timeout and invalidation: the product rails and
+    the category tree reuse the keys of HomeRailService and CategoryTreeService, the
+    banner images are cached here. All fragments are read with one get_many; missing ones
+    are built in parallel threads (each with its own DB connection) and written back.
+    A section that fails to build is returned as None instead of failing the page.
+    """
+
+    # section -> (cache key, builder, timeout)
+    FRAGMENTS = {
+        "carousel": (f"{HOME_FRAGMENT_CACHE_PREFIX}:carousel", build_carousel, HOME_IMAGE_CACHE_TIMEOUT),
+        "category_grid": (f"{HOME_FRAGMENT_CACHE_PREFIX}:category_grid", build_category_grid, HOME_IMAGE_CACHE_TIMEOUT),
+        "category_tree": (CATEGORY_TREE_CACHE_KEY, CategoryTreeService.build, CATEGORY_TREE_CACHE_TIMEOUT),
+        **{
+            rail: (HomeRailService.cache_key(rail), partial(HomeRailService.build, rail), HOME_RAIL_CACHE_TIMEOUT)
+            for rail in HomeRailService.RAILS
+        },
+    }
+
+    @classmethod
+    def _build(cls, section):
+        _, builder, _ = cls.FRAGMENTS[section]
+        try:
+            return builder()
+        except Exception as e:
+            logger.exception(f"Home fragment {section} failed: {str(e)}")
+            return None
+
+    @classmethod
+    def _build_in_thread(cls, section):
+        try:
+            return cls._build(section)
+        finally:
+            # worker threads open their own connections; do not leave them behind
+            connections.close_all()
+
+    @classmethod
+    def get(cls):
+        keys = {section: key for section, (key, _, _) in cls.FRAGMENTS.items()}
+        cached = cache.get_many(list(keys.values()))
+        page = {section: cached[key] for section, key in keys.items() if key in cached}
+
+        missing = [section for section in cls.FRAGMENTS if section not in page]
+        if len(missing) == 1:
+            page[missing[0]] = cls._build(missing[0])
+        elif missing:
+            with ThreadPoolExecutor(max_workers=len(missing)) as executor:
+                page.update(zip(missing, executor.map(cls._build_in_thread, missing)))
+
+        for section in missing:
+            if page[section] is not None:
+                key, _, timeout = cls.FRAGMENTS[section]
+                cache.set(key, page[section], timeout=timeout)
+        return {section: page[section] for section in cls.FRAGMENTS}
+
+    @classmethod
+    def invalidate(cls, sections):
+        keys = [cls.FRAGMENTS[section][0] for section in sections]
+        # again after commit, so a read racing the write cannot re-cache the old fragment
+        cache.delete_many(keys)
+        transaction.on_commit(lambda: cache.delete_many(keys))
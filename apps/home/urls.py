@@ -0,0 +1,6 @@
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path('', views.HomePageView.as_view(), name="home_page_view"),
+]
@@ -0,0 +1,37 @@
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status
+from rest_framework.permissions import AllowAny
+import logging
+
+from .services.home_page import HomePageService
+
+logger = logging.getLogger("myapp")
+
+
+class HomePageView(APIView):
+    """
+    Everything the storefront homepage needs in one request: carousel, category grid,
+    category tree, latest, best selling and top categories, from cached fragments.
+    """
+    # the page is the same for everyone; skip the per-request JWT decode and user lookup
+    authentication_classes = []
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        try:
+            return Response({
+                "code": status.HTTP_200_OK,
+                "status": "success",
+                "message": "Home page fetched successfully",
+                "data": HomePageService.get()
+            }, status=status.HTTP_200_OK)
+
+        except Exception as e:
+            logger.exception(str(e))
+            return Response({
+                "code": status.HTTP_500_INTERNAL_SERVER_ERROR,
+                "status": "failed",
+                "message": "Internal server error",
+                "errors": {"server_error": [str(e)]}
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
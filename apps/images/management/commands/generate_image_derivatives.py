@@ -0,0 +1,31 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand
+
+from ...services.derivatives import IMAGE_FIELDS, ImageDerivativeService
+
+
+class Command(BaseCommand):
+    help = 'Generates thumbnail and WebP derivatives for images uploaded before the pipeline existed'
+
+    def add_arguments(self, parser):
+        parser.add_argument("--force", action="store_true", help="Regenerate derivatives that already exist")
+
+    def handle(self, *args, **options):
+        force = options["force"]
+        images = files = failed = 0
+        for label, fields in IMAGE_FIELDS.items():
+            model = apps.get_model(label)
+            for field in fields:
+                sources = (
+                    model.objects.exclude(**{f"{field}__isnull": True}).exclude(**{field: ""})
+                    .values_list(field, flat=True).distinct().iterator()
+                )
+                for source in sources:
+                    try:
+                        files += ImageDerivativeService.generate(source, force=force)
+                        images += 1
+                    except Exception as e:
+                        failed += 1
+                        self.stdout.write(self.style.ERROR(f"Something went wrong with {source}: {e}"))
+
+        self.stdout.write(self.style.SUCCESS(f"{images} images processed, {files} derivatives written, {failed} failed"))
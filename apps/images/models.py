@@ -0,0 +1,20 @@
+from django.db import models
+
+
+class ImageDerivative(models.Model):
+    """Resized, re-encoded copy of an uploaded image, keyed by the storage name of the original"""
+    source = models.CharField(max_length=500)
+    size = models.CharField(max_length=20)      # thumb / small / medium / large
+    format = models.CharField(max_length=10)    # webp, or jpeg / png as the fallback
+    file = models.CharField(max_length=500)     # storage name of the derivative
+    width = models.PositiveIntegerField()
+    height = models.PositiveIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['source', 'size', 'format'], name='unique_image_derivative'),
+        ]
+
+    def __str__(self):
+        return f"{self.source} ({self.size}, {self.format})"
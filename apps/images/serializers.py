@@ -0,0 +1,47 @@
+from django.db import models
+from rest_framework import serializers
+
+from .services.derivatives import ImageDerivativeService
+
+
+DERIVATIVES_CONTEXT_KEY = "image_derivatives"
+
+
+class ImageSetField(serializers.Field):
+    """
+    Read-only {"src", "srcset", "webp_srcset"} of an image field, from its recorded derivatives.
+    Under DerivativeListSerializer the derivatives of the whole page come from one query.
+    """
+
+    def __init__(self, image_field, size="small", **kwargs):
+        kwargs["source"] = "*"
+        kwargs["read_only"] = True
+        super().__init__(**kwargs)
+        self.image_field = image_field
+        self.size = size
+
+    def to_representation(self, instance):
+        image = getattr(instance, self.image_field)
+        if not image:
+            return None
+        derivatives = self.context.get(DERIVATIVES_CONTEXT_KEY)
+        if derivatives is None or image.name not in derivatives:
+            derivatives = ImageDerivativeService.lookup([image.name])
+        request = self.context.get("request")
+        return ImageDerivativeService.image_set(
+            image.name, derivatives.get(image.name, []), size=self.size,
+            build_url=request.build_absolute_uri if request else None,
+        )
+
+
+class DerivativeListSerializer(serializers.ListSerializer):
+    """Loads the derivatives of every ImageSetField on the page with one query."""
+
+    def to_representation(self, data):
+        items = list(data.all() if isinstance(data, models.manager.BaseManager) else data)
+        image_fields = [field.image_field for field in self.child.fields.values() if isinstance(field, ImageSetField)]
+        if image_fields:
+            self.child.context[DERIVATIVES_CONTEXT_KEY] = ImageDerivativeService.lookup(
+                getattr(item, field).name for item in items for field in image_fields if getattr(item, field)
+            )
+        return super().to_representation(items)
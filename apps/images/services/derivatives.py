@@ -0,0 +1,170 @@
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from PIL import Image, ImageOps
+
+from ..models import ImageDerivative
+
+
+DERIVATIVE_PREFIX = "derivatives"
+# size name -> maximum width in pixels; originals are never upscaled
+DERIVATIVE_SIZES = {"thumb": 160, "small": 320, "medium": 640, "large": 1280}
+# encoder options per format
+SAVE_OPTIONS = {
+    "webp": {"format": "WEBP", "quality": 80, "method": 4},
+    "jpeg": {"format": "JPEG", "quality": 82, "optimize": True, "progressive": True},
+    "png": {"format": "PNG", "optimize": True},
+}
+# image fields that get derivatives, per model
+IMAGE_FIELDS = {
+    "products.Product": ("main_image",),
+    "products.ProductImage": ("image",),
+    "products.ProductVariant": ("image",),
+    "catalog.Brand": ("logo",),
+    "catalog.Category": ("icon",),
+    "catalog.CarouselImage": ("image",),
+    "catalog.CategoryGridImage": ("image",),
+}
+
+
+class ImageDerivativeService:
+    """
+    Fixed-size thumbnails of uploaded images, each as WebP plus a JPEG (or PNG, for
+    images with transparency) fallback, generated by a Celery task after the upload
+    commits and recorded in ImageDerivative. Serializers turn the recorded rows into a
+    `src` of the size they need and `srcset` / `webp_srcset` strings, so clients pick the
+    smallest file that fits instead of downloading the original.
+    """
+
+    # ---------- scheduling ----------
+    @staticmethod
+    def new_uploads(instance, fields):
+        """Image fields of `instance` holding a file that is not saved to storage yet (call before save)."""
+        return [field for field in fields if getattr(instance, field) and not getattr(instance, field)._committed]
+
+    @staticmethod
+    def schedule(instance, fields):
+        """Generate derivatives of the given fields once the upload is committed (call after save)."""
+        if not fields:
+            return
+        from ..tasks import generate_image_derivatives
+
+        model_label, pk = instance._meta.label, instance.pk
+        for field in fields:
+            source = getattr(instance, field).name
+            transaction.on_commit(lambda source=source: generate_image_derivatives.delay(source, model_label, pk))
+
+    # ---------- generation ----------
+    @staticmethod
+    def derivative_name(source, size, image_format):
+        # the full source name, extension included, so logo.png and logo.jpg never share files
+        return f"{DERIVATIVE_PREFIX}/{source}_{size}.{image_format}"
+
+    @staticmethod
+    def _encode(image, image_format):
+        buffer = BytesIO()
+        image.save(buffer, **SAVE_OPTIONS[image_format])
+        return ContentFile(buffer.getvalue())
+
+    @classmethod
+    def generate(cls, source, force=False):
+        """Write the derivatives of one stored image. Returns the number of files written."""
+        if not force and ImageDerivative.objects.filter(source=source).exists():
+            return 0
+        with default_storage.open(source, "rb") as file:
+            image = Image.open(file)
+            # phone photos carry their rotation in EXIF, which the resized copies would lose
+            image = ImageOps.exif_transpose(image)
+            image.load()
+
+        transparent = image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info)
+        fallback = "png" if transparent else "jpeg"
+        image = image.convert("RGBA" if transparent else "RGB")
+
+        rows, widths = [], set()
+        for size, max_width in DERIVATIVE_SIZES.items():
+            width = min(max_width, image.width)
+            if width in widths:
+                # the original is narrower than this size; the previous derivative already covers it
+                continue
+            widths.add(width)
+            resized = image.copy()
+            resized.thumbnail((width, image.height), Image.Resampling.LANCZOS)
+            for image_format in ("webp", fallback):
+                name = cls.derivative_name(source, size, image_format)
+                if default_storage.exists(name):
+                    default_storage.delete(name)
+                name = default_storage.save(name, cls._encode(resized, image_format))
+                rows.append(ImageDerivative(
+                    source=source, size=size, format=image_format, file=name, width=resized.width, height=resized.height
+                ))
+
+        ImageDerivative.objects.bulk_create(
+            rows, update_conflicts=True, unique_fields=["source", "size", "format"], update_fields=["file", "width", "height"]
+        )
+        return len(rows)
+
+    @staticmethod
+    def invalidate_owner(model_label, pk):
+        """Drop cached payloads that embed the image, so they are rebuilt with the new srcsets."""
+        if model_label in ("products.Product", "products.ProductImage", "products.ProductVariant"):
+            from apps.products.models import ProductImage, ProductVariant
+            from apps.products.services.home_rails import HomeRailService
+            from apps.products.services.product_detail import ProductDetailService
+
+            product_id = pk
+            if model_label == "products.ProductImage":
+                product_id = ProductImage.objects.filter(pk=pk).values_list("product_id", flat=True).first()
+            elif model_label == "products.ProductVariant":
+                product_id = ProductVariant.objects.filter(pk=pk).values_list("product_id", flat=True).first()
+            ProductDetailService.invalidate(product_id)
+            HomeRailService.invalidate()
+        elif model_label == "catalog.Category":
+            from apps.catalog.services.category_tree import CategoryTreeService
+            from apps.home.services.home_page import HomePageService
+
+            CategoryTreeService.invalidate()
+            HomePageService.invalidate(["carousel", "category_grid"])
+        elif model_label == "catalog.CarouselImage":
+            from apps.home.services.home_page import HomePageService
+            HomePageService.invalidate(["carousel"])
+        elif model_label == "catalog.CategoryGridImage":
+            from apps.home.services.home_page import HomePageService
+            HomePageService.invalidate(["category_grid"])
+
+    # ---------- reads ----------
+    @staticmethod
+    def lookup(sources):
+        """{source: [derivative rows]} for many images in one query; every requested source is a key."""
+        derivatives = {source: [] for source in sources if source}
+        if derivatives:
+            for row in ImageDerivative.objects.filter(source__in=list(derivatives)).values(
+                "source", "size", "format", "file", "width"
+            ):
+                derivatives[row["source"]].append(row)
+        return derivatives
+
+    @staticmethod
+    def image_set(source, derivatives, size="small", build_url=None):
+        """
+        {"src", "srcset", "webp_srcset"} for one image: `src` is the fallback at `size` (or the
+        largest smaller one), falling back to the original until the derivatives exist.
+        """
+        def url(name):
+            value = default_storage.url(name)
+            return build_url(value) if build_url else value
+
+        fallback = sorted((row for row in derivatives if row["format"] != "webp"), key=lambda row: row["width"])
+        webp = sorted((row for row in derivatives if row["format"] == "webp"), key=lambda row: row["width"])
+        src = url(source)
+        max_width = DERIVATIVE_SIZES[size]
+        fitting = [row for row in fallback if row["width"] <= max_width]
+        if fitting:
+            src = url(fitting[-1]["file"])
+        return {
+            "src": src,
+            "srcset": ", ".join(f"{url(row['file'])} {row['width']}w" for row in fallback),
+            "webp_srcset": ", ".join(f"{url(row['file'])} {row['width']}w" for row in webp),
+        }
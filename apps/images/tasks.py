@@ -0,0 +1,19 @@
+from config.celery import app
+import logging
+
+logger = logging.getLogger("myapp")
+
+
+@app.task
+def generate_image_derivatives(source, model_label=None, pk=None, force=False):
+    """Write the thumbnails / WebP copies of an uploaded image and refresh the caches that show it."""
+    from .services.derivatives import ImageDerivativeService
+
+    try:
+        written = ImageDerivativeService.generate(source, force=force)
+        if written and model_label:
+            ImageDerivativeService.invalidate_owner(model_label, pk)
+        return {"status": "success", "source": source, "files": written}
+    except Exception as e:
+        logger.exception(f"Image derivatives for {source} failed: {str(e)}")
+        return {"status": "failed", "source": source, "error": str(e)}
@@ -85,6 +85,10 @@ class Order(OrderBaseModel):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # sales rollup scans orders changed since its high-water mark
+            models.Index(fields=['updated_at', 'id']),
+        ]
     
     def __str__(self):
         return self.order_number
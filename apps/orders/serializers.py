@@ -11,6 +11,8 @@ from apps.coupons.models import Coupon, CouponUsage
 from django.utils import timezone
 from . import models
 from django.db.models import F
+from apps.products.services.product_detail import ProductDetailService
+from apps.products.services.variant_lookup import VariantLookupService
 from rest_framework.exceptions import ValidationError
 from .utils.get_shipping_configuration import get_shipping_configuration
 
@@ -227,6 +229,11 @@ class OrderSerializer(serializers.Serializer):
                 if not updated:
                     raise ValidationError("Product stock changed. Please retry.")
 
+        # stock is part of the cached product detail documents and variant lookup maps
+        for product_id in {payload["product"].id for payload in order_items_payload}:
+            ProductDetailService.invalidate(product_id)
+            VariantLookupService.invalidate(product_id)
+
         return order
 
 
@@ -213,6 +213,9 @@ class WalletTransaction(PaymentBaseModel):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['created_at', 'id']),
+        ]
     
     def __str__(self):
         return f"{self.transaction_type} - {self.amount}"
@@ -15,6 +15,7 @@ from .models import (
 from apps.orders.models import Order, OrderItem
 from apps.stores.models import Store, CommissionRate
 from .utils.helper_functions import extract_gateway_response
+from apps.products.services.event_counter import ProductEventCounter
 
 
 # ==========================================
@@ -176,6 +177,9 @@ class SSLCommerzService:
                     order.payment_type = f'sslcommerz_{card_type}'
                     order.payment_method = 'online_payment'
                     order.save()
+
+                    # sales_count / revenue analytics, emitted after commit
+                    ProductEventCounter.record_order_sale(order.id)
                     
                     # Create platform holds
                     # PaymentProcessingService.create_platform_holds(order)
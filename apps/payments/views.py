@@ -23,10 +23,11 @@ from .models import (
     RefundRequest, PlatformHold, Payout
 )
 from apps.orders.models import Order
+from apps.products.services.event_counter import ProductEventCounter
 from . import serializers
 
 logger = logging.getLogger('myapp')
-from config.utils.pagination import CustomPageNumberPagination
+from config.utils.pagination import CustomPageNumberPagination, get_paginator
 
 
 from apps.orders.serializers import OrderSerializerView
@@ -357,6 +358,9 @@ class VerifyPaymentView(APIView):
                 order.status = "confirmed"
                 order.save()
 
+                # sales_count / revenue analytics, emitted after commit
+                ProductEventCounter.record_order_sale(order.id)
+
             return Response({
                 "code": status.HTTP_200_OK,
                 "status": "success",
@@ -511,7 +515,7 @@ class WalletTransactionListView(APIView):
     def get(self, request):
         try:
             transactions = WalletTransaction.objects.all().order_by('-created_at')
-            pagination = CustomPageNumberPagination()
+            pagination = get_paginator(request, ordering="-created_at")
             result_page = pagination.paginate_queryset(transactions, request, view=self)
             serializer = serializers.WalletTransactionSerializer(result_page, many=True)
             return pagination.get_paginated_response({
@@ -0,0 +1,15 @@
+# Price ranges shown by the facets endpoint: (key, lower bound inclusive, upper bound exclusive).
+# Bounds are in store currency and compared against Product.effective_price.
+PRICE_BUCKETS = (
+    ("0-500", 0, 500),
+    ("500-1000", 500, 1000),
+    ("1000-2500", 1000, 2500),
+    ("2500-5000", 2500, 5000),
+    ("5000-10000", 5000, 10000),
+    ("10000+", 10000, None),
+)
+
+# Facet payloads live in the django-redis cache under a generation number;
+# bumping the generation invalidates every cached filter combination at once.
+FACET_CACHE_PREFIX = "product_facets"
+FACET_CACHE_TIMEOUT = 60 * 15
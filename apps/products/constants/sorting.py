@@ -0,0 +1,10 @@
+# ?sort= options for product listings -> keyset ordering key.
+# Every key is backed by (status, <key>, id) and (status, category, <key>, id) indexes on Product;
+# "id" is always the tie-breaker in the same direction.
+PRODUCT_SORT_ORDERING = {
+    "price_asc": "effective_price",
+    "price_desc": "-effective_price",
+    "rating": "-avg_rating",
+    "popularity": "-view_count",
+    "newest": "-created_at",
+}
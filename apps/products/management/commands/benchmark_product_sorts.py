@@ -0,0 +1,148 @@
+import random
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from apps.catalog.models import Category
+from ...constants.sorting import PRODUCT_SORT_ORDERING
+from ...models import Product
+
+
+BENCH_PREFIX = "bench-sort"
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmarks ProductsView sort modes: prints the query plan and latency of the first page '
+        'and of a deep keyset page for every ?sort= option, with and without a category filter. '
+        'Use --seed to generate a synthetic catalog first (e.g. --seed 1000000).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', type=int, default=0, help='Number of synthetic products to create')
+        parser.add_argument('--categories', type=int, default=50)
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--page-size', type=int, default=24)
+        parser.add_argument('--deep-pages', type=int, default=200, help='How many pages to walk for the deep-page timing')
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--cleanup', action='store_true', help='Delete the synthetic catalog and exit')
+
+    def handle(self, *args, **options):
+        try:
+            if options['cleanup']:
+                self.cleanup()
+                return
+            if options['seed']:
+                self.seed(options['seed'], options['categories'], options['batch_size'])
+            self.benchmark(options['page_size'], options['deep_pages'], options['repeat'])
+        except Exception as e:
+            self.stdout.write(self.style.ERROR(f"Something went wrong: {e}"))
+
+    # ---------- dataset ----------
+    def seed(self, total, category_count, batch_size):
+        categories = []
+        for i in range(category_count):
+            category, _ = Category.objects.get_or_create(
+                slug=f"{BENCH_PREFIX}-{i}", defaults={"name": f"Bench category {i}"}
+            )
+            categories.append(category)
+
+        start_id = Product.objects.filter(slug__startswith=BENCH_PREFIX).count()
+        now = timezone.now()
+        rng = random.Random(42)
+        created = 0
+        while created < total:
+            size = min(batch_size, total - created)
+            batch = []
+            for n in range(start_id + created, start_id + created + size):
+                price = Decimal(rng.randint(100, 500000)) / 100
+                batch.append(Product(
+                    title=f"Bench product {n}",
+                    slug=f"{BENCH_PREFIX}-{n}",
+                    category=rng.choice(categories),
+                    status=rng.choices(["published", "draft"], weights=[9, 1])[0],
+                    base_price=price,
+                    min_price=price,
+                    max_price=price,
+                    effective_price=price,
+                    stock=rng.randint(0, 50),
+                    in_stock=True,
+                    view_count=int(rng.paretovariate(1.2)),
+                    avg_rating=Decimal(rng.randint(100, 500)) / 100,
+                ))
+            with transaction.atomic():
+                objs = Product.objects.bulk_create(batch)
+                # spread created_at so "newest" is not a single value
+                for obj in objs:
+                    obj.created_at = now - timedelta(minutes=rng.randint(0, 60 * 24 * 365))
+                Product.objects.bulk_update(objs, ["created_at"])
+            created += size
+            self.stdout.write(f"Seeded {created}/{total}")
+        self.stdout.write(self.style.SUCCESS(f"Seeded {total} products"))
+
+    def cleanup(self):
+        deleted, _ = Product.objects.filter(slug__startswith=BENCH_PREFIX).delete()
+        Category.objects.filter(slug__startswith=BENCH_PREFIX).delete()
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} synthetic rows"))
+
+    # ---------- measurements ----------
+    def _queryset(self, ordering, category_id):
+        queryset = Product.objects.filter(status="published")
+        if category_id:
+            queryset = queryset.filter(category_id=category_id)
+        tie_breaker = "-id" if ordering.startswith("-") else "id"
+        return queryset.order_by(ordering, tie_breaker)
+
+    @staticmethod
+    def _timed(fn, repeat):
+        samples = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            fn()
+            samples.append((time.perf_counter() - started) * 1000)
+        samples.sort()
+        return samples[len(samples) // 2]
+
+    def _deep_cursor(self, queryset, ordering, page_size, pages):
+        """Return the (value, id) cursor of the last row of page `pages`."""
+        field = ordering.lstrip("-")
+        offset = page_size * pages
+        rows = list(queryset.values_list(field, "id")[offset - 1:offset]) if offset else []
+        return rows[0] if rows else None
+
+    def benchmark(self, page_size, deep_pages, repeat):
+        from config.utils.pagination import KeysetPagination
+
+        category_id = (
+            Product.objects.filter(status="published", category__isnull=False)
+            .values_list("category_id", flat=True).first()
+        )
+        total = Product.objects.filter(status="published").count()
+        self.stdout.write(f"Published products: {total}, page size {page_size}, median of {repeat} runs\n")
+
+        for sort, ordering in PRODUCT_SORT_ORDERING.items():
+            for scope, scope_category in (("all", None), ("category", category_id)):
+                queryset = self._queryset(ordering, scope_category)
+                first_page = queryset[:page_size]
+                first_ms = self._timed(lambda: list(first_page), repeat)
+
+                cursor = self._deep_cursor(queryset, ordering, page_size, deep_pages)
+                deep_ms = None
+                if cursor:
+                    paginator = KeysetPagination(ordering=ordering)
+                    deep_page = queryset.filter(paginator._keyset_filter(cursor[0], cursor[1], True))[:page_size]
+                    deep_ms = self._timed(lambda: list(deep_page), repeat)
+                offset_page = queryset[page_size * deep_pages:page_size * (deep_pages + 1)]
+                offset_ms = self._timed(lambda: list(offset_page), repeat)
+
+                self.stdout.write(self.style.MIGRATE_HEADING(f"sort={sort} scope={scope}"))
+                self.stdout.write(
+                    f"  first page: {first_ms:.2f} ms | page {deep_pages} keyset: "
+                    f"{'n/a' if deep_ms is None else f'{deep_ms:.2f} ms'} | page {deep_pages} offset: {offset_ms:.2f} ms"
+                )
+                for line in first_page.explain().splitlines():
+                    self.stdout.write(f"    {line}")
@@ -0,0 +1,44 @@
+import time
+
+from django.core.management.base import BaseCommand
+from ...services.product_import import IMPORT_BATCH_SIZE, IMPORT_FORMATS, ProductImportService, detect_format
+
+
+class Command(BaseCommand):
+    help = 'Imports products (with images, attributes and variants) from a CSV or JSONL file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--format', choices=IMPORT_FORMATS, help='Defaults to the file extension')
+        parser.add_argument('--store', type=int, help='Store id for rows without a store column')
+        parser.add_argument('--batch-size', type=int, default=IMPORT_BATCH_SIZE)
+        parser.add_argument('--show-errors', type=int, default=20, help='Number of row errors to print')
+
+    def handle(self, *args, **options):
+        try:
+            file_format = options['format'] or detect_format(options['path'])
+            if file_format is None:
+                self.stdout.write(self.style.ERROR(f"Unknown file format, pass --format ({', '.join(IMPORT_FORMATS)})"))
+                return
+
+            started = time.monotonic()
+
+            def progress(stats):
+                elapsed = time.monotonic() - started
+                self.stdout.write(
+                    f"{stats['processed']} rows read, {stats['created']} products created, "
+                    f"{stats['failed']} failed ({stats['processed'] / elapsed if elapsed else 0:.0f} rows/s)"
+                )
+
+            service = ProductImportService(store_id=options['store'], batch_size=options['batch_size'], progress=progress)
+            with open(options['path'], 'rb') as fileobj:
+                stats = service.run(fileobj, file_format)
+
+            for error in stats['errors'][:options['show_errors']]:
+                self.stdout.write(self.style.WARNING(f"line {error['line']}: {error['errors']}"))
+            self.stdout.write(self.style.SUCCESS(
+                f"Imported {stats['created']} products and {stats['variants']} variants, "
+                f"{stats['failed']} rows failed in {time.monotonic() - started:.1f}s"
+            ))
+        except Exception as e:
+            self.stdout.write(self.style.ERROR(f"Something went wrong: {e}"))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from ...services.attribute_facets import AttributeFacetService
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the flattened attribute filter table (ProductAttributeFacet)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--product', type=int, action='append', dest='product_ids', help='Limit to a product id (repeatable)')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        try:
+            written = AttributeFacetService.sync_products(options['product_ids'], batch_size=options['batch_size'])
+            self.stdout.write(self.style.SUCCESS(f"Wrote {written} attribute facet rows"))
+        except Exception as e:
+            self.stdout.write(self.style.ERROR(f"Something went wrong: {e}"))
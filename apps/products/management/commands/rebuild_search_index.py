@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from ...services.search_engine import ProductSearchService
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the product search documents (and tsvectors on PostgreSQL)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        try:
+            written = ProductSearchService.index_products(batch_size=options['batch_size'])
+            self.stdout.write(self.style.SUCCESS(f"Indexed {written} products"))
+        except Exception as e:
+            self.stdout.write(self.style.ERROR(f"Something went wrong: {e}"))
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from ...services.suggest import ProductSuggestService
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the Redis typeahead index of product titles, brands and categories'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        try:
+            counts = ProductSuggestService.rebuild(batch_size=options['batch_size'])
+            self.stdout.write(self.style.SUCCESS(
+                f"Indexed {counts['product']} products, {counts['brand']} brands and {counts['category']} categories"
+            ))
+        except Exception as e:
+            self.stdout.write(self.style.ERROR(f"Something went wrong: {e}"))
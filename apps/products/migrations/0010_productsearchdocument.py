@@ -0,0 +1,85 @@
+# Generated by Django 5.2.7 on 2026-10-18 05:37
+
+import django.contrib.postgres.search
+import django.db.models.deletion
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations, models
+from django.utils.html import strip_tags
+
+
+def create_postgres_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(
+        "CREATE INDEX IF NOT EXISTS products_search_vector_gin "
+        "ON products_productsearchdocument USING gin (search_vector)"
+    )
+    schema_editor.execute(
+        "CREATE INDEX IF NOT EXISTS products_search_title_trgm "
+        "ON products_productsearchdocument USING gin (title gin_trgm_ops)"
+    )
+
+
+def drop_postgres_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute("DROP INDEX IF EXISTS products_search_vector_gin")
+    schema_editor.execute("DROP INDEX IF EXISTS products_search_title_trgm")
+
+
+def backfill_search_documents(apps, schema_editor):
+    Product = apps.get_model('products', 'Product')
+    ProductSearchDocument = apps.get_model('products', 'ProductSearchDocument')
+
+    documents = []
+    products = Product.objects.select_related('brand', 'category', 'store').order_by('id')
+    for product in products.iterator(chunk_size=500):
+        keywords = [
+            product.brand.name if product.brand_id else '',
+            product.category.name if product.category_id else '',
+            product.store.store_name if product.store_id else '',
+        ]
+        body = [strip_tags(product.description or ''), strip_tags(product.specification or '')]
+        documents.append(ProductSearchDocument(
+            product_id=product.id,
+            title=product.title or '',
+            keywords=' '.join(k for k in keywords if k),
+            body=' '.join(b for b in body if b),
+        ))
+        if len(documents) >= 500:
+            ProductSearchDocument.objects.bulk_create(documents)
+            documents = []
+    if documents:
+        ProductSearchDocument.objects.bulk_create(documents)
+
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(
+            "UPDATE products_productsearchdocument SET search_vector = "
+            "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('english', coalesce(keywords, '')), 'B') || "
+            "setweight(to_tsvector('english', coalesce(body, '')), 'C')"
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0009_productvariant_products_pr_product_b3692c_idx'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.CreateModel(
+            name='ProductSearchDocument',
+            fields=[
+                ('product', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='search_document', serialize=False, to='products.product')),
+                ('title', models.CharField(default='', max_length=500)),
+                ('keywords', models.TextField(blank=True, default='')),
+                ('body', models.TextField(blank=True, default='')),
+                ('search_vector', django.contrib.postgres.search.SearchVectorField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True, db_index=True)),
+            ],
+        ),
+        migrations.RunPython(create_postgres_indexes, drop_postgres_indexes),
+        migrations.RunPython(backfill_search_documents, migrations.RunPython.noop),
+    ]
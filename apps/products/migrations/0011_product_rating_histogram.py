@@ -0,0 +1,69 @@
+# Generated by Django 5.2.7 on 2026-10-18 05:39
+
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill_rating_aggregates(apps, schema_editor):
+    Product = apps.get_model('products', 'Product')
+    Review = apps.get_model('review', 'Review')
+
+    stats = {}
+    rows = (
+        Review.objects.filter(status='approved', product__isnull=False)
+        .values('product_id', 'rating').annotate(total=Count('id')).order_by()
+    )
+    for row in rows:
+        stats.setdefault(row['product_id'], {})[row['rating']] = row['total']
+
+    batch = []
+    for product_id, counts in stats.items():
+        total = sum(counts.values())
+        weighted = sum(star * count for star, count in counts.items())
+        batch.append(Product(
+            pk=product_id,
+            total_reviews=total,
+            avg_rating=(Decimal(weighted) / Decimal(total)).quantize(Decimal('0.01'), ROUND_HALF_UP),
+            **{f'rating_{star}_count': counts.get(star, 0) for star in range(1, 6)},
+        ))
+    fields = ['avg_rating', 'total_reviews'] + [f'rating_{star}_count' for star in range(1, 6)]
+    Product.objects.bulk_update(batch, fields, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0010_productsearchdocument'),
+        ('review', '0003_review_is_verified_purchase'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='rating_1_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='rating_2_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='rating_3_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='rating_4_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='rating_5_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_rating_aggregates, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,108 @@
+# Generated by Django 5.2.7 on 2026-10-18 05:40
+
+from decimal import Decimal
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+ZERO = Decimal('0.00')
+
+
+def summarize(product_row, variants):
+    """Price / stock summary as of this migration (PriceSummaryService.summarize at the time)."""
+    variants = sorted(variants, key=lambda v: (v['created_at'], v['id']))
+
+    if product_row['type'] == 'variable' or variants:
+        if not variants:
+            return {
+                'min_price': ZERO, 'max_price': ZERO, 'effective_price': ZERO,
+                'default_variant_id': None, 'in_stock': False,
+            }
+        default = next((v for v in variants if v['is_default']), variants[0])
+        prices = [v['price'] for v in variants]
+        effective = [
+            v['discount_price'] if v['discount_price'] is not None and ZERO < v['discount_price'] < v['price'] else v['price']
+            for v in variants
+        ]
+        return {
+            'min_price': min(prices),
+            'max_price': max(prices),
+            'effective_price': min(effective),
+            'default_variant_id': default['id'],
+            'in_stock': any(v['stock'] > 0 for v in variants),
+        }
+
+    base_price = product_row['base_price'] or ZERO
+    discount = product_row['discount_amount'] or ZERO
+    return {
+        'min_price': base_price,
+        'max_price': base_price,
+        'effective_price': base_price - discount if ZERO < discount < base_price else base_price,
+        'default_variant_id': None,
+        'in_stock': product_row['stock'] > 0,
+    }
+
+
+def backfill_price_summary(apps, schema_editor):
+    Product = apps.get_model('products', 'Product')
+    ProductVariant = apps.get_model('products', 'ProductVariant')
+
+    variants_by_product = {}
+    for variant in ProductVariant.objects.values(
+        'id', 'product_id', 'price', 'discount_price', 'stock', 'is_default', 'created_at'
+    ).iterator(chunk_size=2000):
+        variants_by_product.setdefault(variant['product_id'], []).append(variant)
+
+    batch = []
+    rows = Product.objects.values('id', 'type', 'base_price', 'discount_amount', 'stock')
+    for row in rows.iterator(chunk_size=2000):
+        summary = summarize(row, variants_by_product.get(row['id'], []))
+        batch.append(Product(pk=row['id'], **summary))
+    Product.objects.bulk_update(
+        batch,
+        ['min_price', 'max_price', 'effective_price', 'default_variant_id', 'in_stock'],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0003_carouselimage_categorygridimage'),
+        ('products', '0011_product_rating_histogram'),
+        ('stores', '0002_remove_store_commission_rate_alter_store_store_owner_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='default_variant',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='products.productvariant'),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='effective_price',
+            field=models.DecimalField(decimal_places=2, default='0.00', max_digits=10),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='in_stock',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='max_price',
+            field=models.DecimalField(decimal_places=2, default='0.00', max_digits=10),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='min_price',
+            field=models.DecimalField(decimal_places=2, default='0.00', max_digits=10),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['status', 'in_stock'], name='products_pr_status_4894a7_idx'),
+        ),
+        migrations.RunPython(backfill_price_summary, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 5.2.7 on 2026-10-18 05:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0003_carouselimage_categorygridimage'),
+        ('products', '0012_product_price_summary'),
+        ('stores', '0002_remove_store_commission_rate_alter_store_store_owner_and_more'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='product',
+            name='products_pr_categor_70227a_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='product',
+            name='products_pr_status_36c7aa_idx',
+        ),
+        # 0012 no longer creates its two effective_price indexes (superseded below); drop them
+        # where an earlier version of 0012 already built them
+        migrations.RunSQL(
+            'DROP INDEX IF EXISTS products_pr_status_64c238_idx',
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+        migrations.RunSQL(
+            'DROP INDEX IF EXISTS products_pr_categor_d3779a_idx',
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['status', 'created_at', 'id'], name='products_pr_status_0db408_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['status', 'category', 'created_at', 'id'], name='products_pr_status_54272e_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['status', 'effective_price', 'id'], name='products_pr_status_7e2f51_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['status', 'category', 'effective_price', 'id'], name='products_pr_status_8a5cba_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['status', 'avg_rating', 'id'], name='products_pr_status_f3b3a9_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['status', 'category', 'avg_rating', 'id'], name='products_pr_status_6af91b_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['status', 'view_count', 'id'], name='products_pr_status_9a862c_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['status', 'category', 'view_count', 'id'], name='products_pr_status_ccc7d4_idx'),
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.2.7 on 2026-10-18 05:46
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def normalize_token(text):
+    return " ".join(str(text).lower().split())
+
+
+def backfill_attribute_facets(apps, schema_editor):
+    ProductVariantAttribute = apps.get_model('products', 'ProductVariantAttribute')
+    ProductAttributeFacet = apps.get_model('products', 'ProductAttributeFacet')
+
+    batch = []
+    rows = ProductVariantAttribute.objects.values(
+        'id', 'attribute__name', 'value__value', 'variant_id', 'variant__product_id', 'variant__stock'
+    )
+    for row in rows.iterator(chunk_size=2000):
+        batch.append(ProductAttributeFacet(
+            variant_attribute_id=row['id'],
+            attribute_name=normalize_token(row['attribute__name']),
+            value=normalize_token(row['value__value']),
+            product_id=row['variant__product_id'],
+            variant_id=row['variant_id'],
+            in_stock=row['variant__stock'] > 0,
+        ))
+    ProductAttributeFacet.objects.bulk_create(batch, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0013_product_sort_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductAttributeFacet',
+            fields=[
+                ('variant_attribute', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='facet', serialize=False, to='products.productvariantattribute')),
+                ('attribute_name', models.CharField(max_length=100)),
+                ('value', models.CharField(max_length=100)),
+                ('in_stock', models.BooleanField(default=False)),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='products.product')),
+                ('variant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='products.productvariant')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['attribute_name', 'value', 'in_stock', 'variant', 'product'], name='products_pr_attribu_e4d7f0_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_attribute_facets, migrations.RunPython.noop),
+    ]
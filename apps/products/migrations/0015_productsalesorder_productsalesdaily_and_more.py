@@ -0,0 +1,57 @@
+# Generated by Django 5.2.7 on 2026-10-18 06:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0003_carouselimage_categorygridimage'),
+        ('orders', '0011_order_orders_orde_updated_40110c_idx'),
+        ('products', '0014_productattributefacet'),
+        ('stores', '0002_remove_store_commission_rate_alter_store_store_owner_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductSalesOrder',
+            fields=[
+                ('order', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='+', serialize=False, to='orders.order')),
+                ('counted', models.BooleanField(default=False)),
+                ('order_updated_at', models.DateTimeField(db_index=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ProductSalesDaily',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('quantity', models.IntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default='0.00', max_digits=14)),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='products.product')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['date', 'product'], name='products_pr_date_0cc771_idx')],
+                'constraints': [models.UniqueConstraint(fields=('product', 'date'), name='unique_product_sales_date')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ProductSalesRollup',
+            fields=[
+                ('product', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='sales_rollup', serialize=False, to='products.product')),
+                ('quantity_7d', models.IntegerField(default=0)),
+                ('quantity_30d', models.IntegerField(default=0)),
+                ('quantity_all', models.IntegerField(default=0)),
+                ('revenue_7d', models.DecimalField(decimal_places=2, default='0.00', max_digits=14)),
+                ('revenue_30d', models.DecimalField(decimal_places=2, default='0.00', max_digits=14)),
+                ('revenue_all', models.DecimalField(decimal_places=2, default='0.00', max_digits=14)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('category', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='catalog.category')),
+                ('store', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='stores.store')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['-quantity_7d', 'product'], name='products_pr_quantit_afcea4_idx'), models.Index(fields=['-quantity_30d', 'product'], name='products_pr_quantit_478580_idx'), models.Index(fields=['-quantity_all', 'product'], name='products_pr_quantit_82f2ce_idx'), models.Index(fields=['category', '-quantity_7d', 'product'], name='products_pr_categor_7bc14d_idx'), models.Index(fields=['category', '-quantity_30d', 'product'], name='products_pr_categor_1bd438_idx'), models.Index(fields=['category', '-quantity_all', 'product'], name='products_pr_categor_bb09e5_idx'), models.Index(fields=['store', '-quantity_7d', 'product'], name='products_pr_store_i_95aaac_idx'), models.Index(fields=['store', '-quantity_30d', 'product'], name='products_pr_store_i_b500f9_idx'), models.Index(fields=['store', '-quantity_all', 'product'], name='products_pr_store_i_4c7cca_idx')],
+            },
+        ),
+    ]
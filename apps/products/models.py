@@ -1,5 +1,6 @@
 from django.db import models
-from django.utils.text import slugify
+from config.utils.slugs import allocate_slugs
+from django.contrib.postgres.search import SearchVectorField
 from apps.catalog.models import Category, Brand
 from apps.stores.models import Store
 from .constants.choices import TYPE, STATUS
@@ -35,23 +36,75 @@ class Product(ProductBaseModel):
     avg_rating = models.DecimalField(max_digits=3, decimal_places=2, default='0.00')
     specification = models.TextField(blank=True, default='')
     total_reviews = models.IntegerField(default=0)
+    # approved review histogram, maintained by RatingAggregateService
+    rating_1_count = models.IntegerField(default=0)
+    rating_2_count = models.IntegerField(default=0)
+    rating_3_count = models.IntegerField(default=0)
+    rating_4_count = models.IntegerField(default=0)
+    rating_5_count = models.IntegerField(default=0)
+    # price / stock summary, maintained by PriceSummaryService
+    min_price = models.DecimalField(max_digits=10, decimal_places=2, default='0.00')
+    max_price = models.DecimalField(max_digits=10, decimal_places=2, default='0.00')
+    effective_price = models.DecimalField(max_digits=10, decimal_places=2, default='0.00')
+    default_variant = models.ForeignKey("ProductVariant", on_delete=models.SET_NULL, null=True, blank=True, related_name="+")
+    in_stock = models.BooleanField(default=False)
 
     def save(self, *args, **kwargs):
         if not self.slug:
-            base_slug = slugify(self.title)
-            slug = base_slug
-            counter = 1
-            while Product.objects.filter(slug=slug).exists():
-                slug = f"{base_slug}-{counter}"
-                counter += 1
-            self.slug = slug
+            self.slug = allocate_slugs(Product, [self.title])[0]
+        from apps.images.services.derivatives import ImageDerivativeService
+        uploads = ImageDerivativeService.new_uploads(self, ["main_image"])
         super().save(*args, **kwargs)
+
+        from .services.search_engine import ProductSearchService
+        from .services.price_summary import PriceSummaryService
+        from .services.facets import ProductFacetService
+        from .services.home_rails import HomeRailService
+        from .services.sales_rollup import SalesRollupService
+        ProductSearchService.index_product(self, update_fields=kwargs.get("update_fields"))
+        PriceSummaryService.refresh(self.pk, update_fields=kwargs.get("update_fields"))
+        ProductFacetService.invalidate(update_fields=kwargs.get("update_fields"))
+        HomeRailService.invalidate(update_fields=kwargs.get("update_fields"))
+        SalesRollupService.sync_dimensions(self, update_fields=kwargs.get("update_fields"))
+        from .services.product_detail import ProductDetailService
+        from .services.suggest import ProductSuggestService
+        from .services.trending import TrendingService
+        ProductDetailService.invalidate(self.pk, slug=self.slug)
+        ProductSuggestService.index_product(self.pk, update_fields=kwargs.get("update_fields"))
+        TrendingService.sync_dimensions(self, update_fields=kwargs.get("update_fields"))
+        ImageDerivativeService.schedule(self, uploads)
+
+    def delete(self, *args, **kwargs):
+        product_id, slug = self.pk, self.slug
+        result = super().delete(*args, **kwargs)
+
+        from .services.facets import ProductFacetService
+        from .services.home_rails import HomeRailService
+        from .services.product_detail import ProductDetailService
+        from .services.variant_lookup import VariantLookupService
+        from .services.suggest import ProductSuggestService
+        from .services.trending import TrendingService
+        ProductFacetService.invalidate()
+        HomeRailService.invalidate()
+        ProductDetailService.invalidate(product_id, slug=slug)
+        VariantLookupService.invalidate(product_id, slug=slug)
+        ProductSuggestService.remove_product(product_id)
+        TrendingService.remove_product(product_id, category_id=self.category_id, store_id=self.store_id)
+        return result
         
     class Meta:
         indexes = [
-            models.Index(fields=['category', 'status', 'created_at']),
-            models.Index(fields=['status', 'created_at']),
             models.Index(fields=['category', 'status']),
+            models.Index(fields=['status', 'in_stock']),
+            # sort indexes, see constants/sorting.py
+            models.Index(fields=['status', 'created_at', 'id']),
+            models.Index(fields=['status', 'category', 'created_at', 'id']),
+            models.Index(fields=['status', 'effective_price', 'id']),
+            models.Index(fields=['status', 'category', 'effective_price', 'id']),
+            models.Index(fields=['status', 'avg_rating', 'id']),
+            models.Index(fields=['status', 'category', 'avg_rating', 'id']),
+            models.Index(fields=['status', 'view_count', 'id']),
+            models.Index(fields=['status', 'category', 'view_count', 'id']),
         ]
         
     def __str__(self):
@@ -64,6 +117,23 @@ class ProductImage(ProductBaseModel):
     product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name="images",db_index=True)
     image = models.ImageField(upload_to="products/gallery/")
 
+    def save(self, *args, **kwargs):
+        from apps.images.services.derivatives import ImageDerivativeService
+        uploads = ImageDerivativeService.new_uploads(self, ["image"])
+        super().save(*args, **kwargs)
+
+        from .services.product_detail import ProductDetailService
+        ProductDetailService.invalidate(self.product_id)
+        ImageDerivativeService.schedule(self, uploads)
+
+    def delete(self, *args, **kwargs):
+        product_id = self.product_id
+        result = super().delete(*args, **kwargs)
+
+        from .services.product_detail import ProductDetailService
+        ProductDetailService.invalidate(product_id)
+        return result
+
     def __str__(self):
         return f"Image of {self.product.title}"
 
@@ -74,6 +144,26 @@ class ProductAttribute(ProductBaseModel):
     name = models.CharField(max_length=100)
     is_variation = models.BooleanField(default=True)
     
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+
+        from .services.attribute_facets import AttributeFacetService
+        from .services.product_detail import ProductDetailService
+        from .services.variant_lookup import VariantLookupService
+        AttributeFacetService.rename_attribute(self)
+        ProductDetailService.invalidate(self.product_id)
+        VariantLookupService.invalidate(self.product_id)
+
+    def delete(self, *args, **kwargs):
+        product_id = self.product_id
+        result = super().delete(*args, **kwargs)
+
+        from .services.product_detail import ProductDetailService
+        from .services.variant_lookup import VariantLookupService
+        ProductDetailService.invalidate(product_id)
+        VariantLookupService.invalidate(product_id)
+        return result
+
     class Meta:
         constraints = [
             models.UniqueConstraint(fields=['product', 'name'], name='unique_product_attribute')
@@ -89,6 +179,26 @@ class ProductAttributeValue(ProductBaseModel):
     value = models.CharField(max_length=100)
     color_code = models.CharField(max_length=20, blank=True, default='')
     
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+
+        from .services.attribute_facets import AttributeFacetService
+        from .services.product_detail import ProductDetailService
+        from .services.variant_lookup import VariantLookupService
+        AttributeFacetService.rename_value(self)
+        ProductDetailService.invalidate(self.attribute.product_id)
+        VariantLookupService.invalidate(self.attribute.product_id)
+
+    def delete(self, *args, **kwargs):
+        product_id = self.attribute.product_id
+        result = super().delete(*args, **kwargs)
+
+        from .services.product_detail import ProductDetailService
+        from .services.variant_lookup import VariantLookupService
+        ProductDetailService.invalidate(product_id)
+        VariantLookupService.invalidate(product_id)
+        return result
+
     class Meta:
         constraints = [
             models.UniqueConstraint(fields=['attribute', 'value'], name='unique_attribute_value')
@@ -114,7 +224,40 @@ class ProductVariant(ProductBaseModel):
             ProductVariant.objects.filter(
                 product=self.product, is_default=True
             ).exclude(pk=self.pk).update(is_default=False)
+        from apps.images.services.derivatives import ImageDerivativeService
+        uploads = ImageDerivativeService.new_uploads(self, ["image"])
         super().save(*args, **kwargs)
+
+        from .services.price_summary import PriceSummaryService
+        from .services.facets import ProductFacetService
+        from .services.attribute_facets import AttributeFacetService
+        from .services.home_rails import HomeRailService
+        from .services.product_detail import ProductDetailService
+        from .services.variant_lookup import VariantLookupService
+        PriceSummaryService.refresh(self.product_id)
+        AttributeFacetService.sync_variant(self.pk)
+        ProductFacetService.invalidate()
+        HomeRailService.invalidate()
+        ProductDetailService.invalidate(self.product_id)
+        VariantLookupService.invalidate(self.product_id)
+        ImageDerivativeService.schedule(self, uploads)
+
+    def delete(self, *args, **kwargs):
+        product_id = self.product_id
+        result = super().delete(*args, **kwargs)
+
+        from .services.price_summary import PriceSummaryService
+        from .services.facets import ProductFacetService
+        from .services.home_rails import HomeRailService
+        from .services.product_detail import ProductDetailService
+        from .services.variant_lookup import VariantLookupService
+        PriceSummaryService.refresh(product_id)
+        ProductFacetService.invalidate()
+        HomeRailService.invalidate()
+        ProductDetailService.invalidate(product_id)
+        VariantLookupService.invalidate(product_id)
+        return result
+
     class Meta:
         indexes = [
             models.Index(fields=["product", "is_default", "created_at"]),
@@ -132,6 +275,28 @@ class ProductVariantAttribute(models.Model):
     attribute = models.ForeignKey(ProductAttribute, on_delete=models.CASCADE, related_name="variant_attrs",db_index=True)
     value = models.ForeignKey(ProductAttributeValue, on_delete=models.CASCADE, related_name="variant_attrs")
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+
+        from .services.attribute_facets import AttributeFacetService
+        from .services.product_detail import ProductDetailService
+        from .services.variant_lookup import VariantLookupService
+        AttributeFacetService.sync_variant(self.variant_id)
+        ProductDetailService.invalidate(self.variant.product_id)
+        VariantLookupService.invalidate(self.variant.product_id)
+
+    def delete(self, *args, **kwargs):
+        variant_id, product_id = self.variant_id, self.variant.product_id
+        result = super().delete(*args, **kwargs)
+
+        from .services.attribute_facets import AttributeFacetService
+        from .services.product_detail import ProductDetailService
+        from .services.variant_lookup import VariantLookupService
+        AttributeFacetService.sync_variant(variant_id)
+        ProductDetailService.invalidate(product_id)
+        VariantLookupService.invalidate(product_id)
+        return result
+
     class Meta:
         constraints = [
             models.UniqueConstraint(fields=['variant', 'attribute'], name='unique_variant_attribute')
@@ -140,6 +305,28 @@ class ProductVariantAttribute(models.Model):
         return f"{self.attribute.name}: {self.value.value} ({self.variant.variant_name})"
 
 
+# Flattened attribute filter table
+class ProductAttributeFacet(models.Model):
+    """
+    One row per variant attribute value, normalized for filtering (color=red&size=m).
+    Kept in sync by AttributeFacetService; rows cascade away with the variant attribute.
+    """
+    variant_attribute = models.OneToOneField(ProductVariantAttribute, on_delete=models.CASCADE, primary_key=True, related_name="facet")
+    attribute_name = models.CharField(max_length=100)    # lower-cased, whitespace collapsed
+    value = models.CharField(max_length=100)             # lower-cased, whitespace collapsed
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name="+")
+    variant = models.ForeignKey(ProductVariant, on_delete=models.CASCADE, related_name="+")
+    in_stock = models.BooleanField(default=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["attribute_name", "value", "in_stock", "variant", "product"]),
+        ]
+
+    def __str__(self):
+        return f"{self.attribute_name}={self.value} (variant {self.variant_id})"
+
+
 # Product Analytics
 class ProductAnalytics(models.Model):
     product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name="analytics",db_index=True)
@@ -157,3 +344,120 @@ class ProductAnalytics(models.Model):
         ]
     def __str__(self):
         return f"Analytics for {self.product.title} - {self.date}"
+
+
+# Product Search Document
+class ProductSearchDocument(models.Model):
+    """Denormalized search text per product, kept in sync by ProductSearchService"""
+    product = models.OneToOneField(Product, on_delete=models.CASCADE, primary_key=True, related_name="search_document")
+    title = models.CharField(max_length=500, default='')
+    keywords = models.TextField(blank=True, default='')    # brand, category and store names
+    body = models.TextField(blank=True, default='')        # description and specification
+    search_vector = SearchVectorField(null=True, blank=True)  # populated on PostgreSQL only
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    def __str__(self):
+        return f"Search document for {self.title}"
+
+
+# Orders counted by the sales rollup
+class ProductSalesOrder(models.Model):
+    """Whether an order's items are currently included in ProductSalesDaily; guards against double counting"""
+    order = models.OneToOneField("orders.Order", on_delete=models.CASCADE, primary_key=True, related_name="+")
+    counted = models.BooleanField(default=False)
+    order_updated_at = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return f"Sales rollup state of order {self.order_id}"
+
+
+# Product Sales (daily buckets)
+class ProductSalesDaily(models.Model):
+    """Units and revenue of paid orders per product and order date, fed by SalesRollupService"""
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name="+")
+    date = models.DateField()
+    quantity = models.IntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default='0.00')
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['product', 'date'], name='unique_product_sales_date')
+        ]
+        indexes = [
+            models.Index(fields=['date', 'product']),
+        ]
+
+    def __str__(self):
+        return f"Sales of product {self.product_id} on {self.date}"
+
+
+# Product Sales Rollup (best sellers)
+class ProductSalesRollup(models.Model):
+    """Windowed sales totals per product; category and store are copied from the product for top-N lookups"""
+    product = models.OneToOneField(Product, on_delete=models.CASCADE, primary_key=True, related_name="sales_rollup")
+    category = models.ForeignKey(Category, on_delete=models.SET_NULL, null=True, blank=True, related_name="+")
+    store = models.ForeignKey(Store, on_delete=models.SET_NULL, null=True, blank=True, related_name="+")
+    quantity_7d = models.IntegerField(default=0)
+    quantity_30d = models.IntegerField(default=0)
+    quantity_all = models.IntegerField(default=0)
+    revenue_7d = models.DecimalField(max_digits=14, decimal_places=2, default='0.00')
+    revenue_30d = models.DecimalField(max_digits=14, decimal_places=2, default='0.00')
+    revenue_all = models.DecimalField(max_digits=14, decimal_places=2, default='0.00')
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-quantity_7d', 'product']),
+            models.Index(fields=['-quantity_30d', 'product']),
+            models.Index(fields=['-quantity_all', 'product']),
+            models.Index(fields=['category', '-quantity_7d', 'product']),
+            models.Index(fields=['category', '-quantity_30d', 'product']),
+            models.Index(fields=['category', '-quantity_all', 'product']),
+            models.Index(fields=['store', '-quantity_7d', 'product']),
+            models.Index(fields=['store', '-quantity_30d', 'product']),
+            models.Index(fields=['store', '-quantity_all', 'product']),
+        ]
+
+    def __str__(self):
+        return f"Sales rollup for product {self.product_id}"
+
+
+# Orders counted by the co-occurrence job
+class ProductCooccurrenceOrder(models.Model):
+    """Whether an order's basket is currently included in ProductCooccurrence; guards against double counting"""
+    order = models.OneToOneField("orders.Order", on_delete=models.CASCADE, primary_key=True, related_name="+")
+    counted = models.BooleanField(default=False)
+    order_updated_at = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return f"Co-occurrence state of order {self.order_id}"
+
+
+# Product pair counts (sparse co-occurrence matrix)
+class ProductCooccurrence(models.Model):
+    """Number of paid orders containing both products; stored in both directions, fed by BoughtTogetherService"""
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name="+")
+    other = models.ForeignKey(Product, on_delete=models.CASCADE, related_name="+")
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['product', 'other'], name='unique_product_cooccurrence')
+        ]
+        indexes = [
+            models.Index(fields=['product', '-count', 'other']),
+        ]
+
+    def __str__(self):
+        return f"Products {self.product_id} and {self.other_id} bought together {self.count} times"
+
+
+# Frequently bought together (top-K neighbours)
+class ProductBoughtTogether(models.Model):
+    """Top co-purchased products of one product as [[product_id, count], ...], best first"""
+    product = models.OneToOneField(Product, on_delete=models.CASCADE, primary_key=True, related_name="bought_together")
+    neighbours = models.JSONField(default=list)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Bought together with product {self.product_id}"
@@ -6,6 +6,10 @@ from django.db import transaction
 import re
 from apps.review.serializers import ReviewListSerializer
 from apps.review.models import Review
+from apps.review.services.rating_aggregate import RatingAggregateService
+from apps.images.serializers import DerivativeListSerializer, ImageSetField
+from apps.images.services.derivatives import ImageDerivativeService
+from config.utils.skus import normalize_sku
 
 
 
@@ -95,8 +99,12 @@ class ProductSerializer(serializers.Serializer):
             
             if 'gallery_images' in validated_data:
                 gallery_images_data = validated_data.get('gallery_images', [])
-                for image_file in gallery_images_data:
-                    models.ProductImage.objects.create(product=product, image=image_file)
+                gallery_images = models.ProductImage.objects.bulk_create([
+                    models.ProductImage(product=product, image=image_file) for image_file in gallery_images_data
+                ])
+                # bulk_create skips ProductImage.save, so queue the derivatives here
+                for gallery_image in gallery_images:
+                    ImageDerivativeService.schedule(gallery_image, ["image"])
 
 
             return product
@@ -127,8 +135,11 @@ class ProductSerializer(serializers.Serializer):
                 # Delete existing gallery images
                 instance.images.all().delete()
                 # Create new gallery images
-                for image_data in gallery_images_data:
-                    models.ProductImage.objects.create(product=instance, image=image_data)
+                gallery_images = models.ProductImage.objects.bulk_create([
+                    models.ProductImage(product=instance, image=image_data) for image_data in gallery_images_data
+                ])
+                for gallery_image in gallery_images:
+                    ImageDerivativeService.schedule(gallery_image, ["image"])
             
             return instance
 
@@ -157,40 +168,44 @@ class ProductSerializerView(DynamicFieldsModelSerializer):
     brand = serializers.StringRelatedField()
     category = serializers.StringRelatedField()
     variants = serializers.SerializerMethodField()
-    average_rating = serializers.FloatField(read_only=True)
-    total_reviews = serializers.IntegerField(
-        source="total_reviews_count", read_only=True
-    )
+    average_rating = serializers.SerializerMethodField()
+    total_reviews = serializers.IntegerField(read_only=True)
+    # listing-size thumbnail with srcsets, from the generated derivatives
+    main_image_set = ImageSetField("main_image", size="small")
 
     class Meta:
         model = models.Product
+        list_serializer_class = DerivativeListSerializer
         fields = [
             'id','slug',
             'store','category','brand',
             'title','type',
-            'base_price','main_image','stock',
+            'base_price','main_image','main_image_set','stock',
+            'min_price','max_price','effective_price','in_stock',
             'is_featured','status',
             'average_rating','total_reviews',
             'variants'
         ]
 
+    def get_average_rating(self, obj):
+        # stored aggregate, maintained by RatingAggregateService
+        if not obj.total_reviews:
+            return None
+        return float(obj.avg_rating)
+
     def get_variants(self, obj):
 
-        variants = getattr(obj, "prefetched_variants", [])
+        # default_variant is maintained by PriceSummaryService;
+        # listing views select_related it instead of prefetching every variant
+        variant = obj.default_variant if obj.default_variant_id else None
 
-        if not variants:
+        if variant is None:
             return []
 
-        # priority → default
-        default_variant = next(
-            (v for v in variants if v.is_default), None
-        )
-
-        variant = default_variant or variants[0]
-
         return {
             "id": variant.id,
-            "price": variant.price,
+            # a string like the serializer's DecimalFields, so cached and fresh payloads match
+            "price": str(variant.price),
             "is_default": variant.is_default
         }
 
@@ -204,27 +219,42 @@ class ProductStoreForProductDetailsSerializer(serializers.ModelSerializer):
         
     
 class ProductDetailSerializer(serializers.ModelSerializer):
+    """
+    Detail document cached by ProductDetailService. Attributes, variants and images are
+    read from the prefetched relations; reviews are paginated separately.
+    """
     images = ProductImageSerializerView(many=True, read_only=True)
     attributes = serializers.SerializerMethodField()
     variants = serializers.SerializerMethodField()
     brand = BrandSerializerForProduct()
     category = CategorySerializerForProduct()
     store = ProductStoreForProductDetailsSerializer()
-    reviews = serializers.SerializerMethodField()
+    rating_summary = serializers.SerializerMethodField()
 
     def get_attributes(self, obj):
-        attributes = models.ProductAttribute.objects.filter(product=obj)
-        return ProductAttributeSerializer(attributes, many=True).data
+        return [
+            {
+                **ProductAttributeSerializer(attribute).data,
+                "values": ProductMiniAttributeValueSerializer(attribute.values.all(), many=True).data,
+            }
+            for attribute in obj.attributes.all()
+        ]
 
     def get_variants(self, obj):
-        variants = models.ProductVariant.objects.filter(product=obj)
-        return ProductVariantSerializer(variants, many=True).data
-
-    def get_reviews(self, obj):
-        reviews = Review.objects.filter(product=obj, status='approved').order_by('-created_at')
-        return ReviewListSerializer(reviews, many=True).data
+        return [
+            {
+                **ProductVariantSerializer(variant).data,
+                "variant_attrs": VariantMiniAttributeSerializer(variant.variant_attrs.all(), many=True).data,
+            }
+            for variant in obj.variants.all()
+        ]
 
-    
+    def get_rating_summary(self, obj):
+        return {
+            "average": float(obj.avg_rating),
+            "total": obj.total_reviews,
+            "histogram": RatingAggregateService.histogram(obj),
+        }
 
     class Meta:
         model = models.Product
@@ -377,16 +407,9 @@ class ProductVariantSerializer(serializers.Serializer):
         if self.instance:
             self.fields['image'].required = False   
             
-    def _name(self, value):
-        value = value.strip()
-        value = re.sub(r'[^\w\s]', '', value)     
-        value = re.sub(r'\s+', '-', value)       
-        value = value.lower()
-        return value.strip('-') 
-        
     def validate_sku(self, value):
         # when creating, ensure SKU is unique; when updating, allow same
-        value = self._name(value)
+        value = normalize_sku(value)
         if self.instance:
             if self.instance.sku == value:
                 return value
@@ -413,6 +436,143 @@ class ProductVariantSerializer(serializers.Serializer):
         return instance
 
 
+class VariantMatrixAttributeSerializer(serializers.Serializer):
+    name = serializers.CharField()
+    values = serializers.ListField(child=serializers.CharField(), min_length=1)
+
+
+class VariantMatrixOverrideSerializer(serializers.Serializer):
+    values = serializers.DictField(child=serializers.CharField())
+    price = serializers.DecimalField(max_digits=10, decimal_places=2, required=False)
+    discount_price = serializers.DecimalField(max_digits=10, decimal_places=2, required=False, allow_null=True)
+    stock = serializers.IntegerField(required=False, min_value=0)
+
+
+class ProductVariantMatrixSerializer(serializers.Serializer):
+    """
+    Generate every combination of the given attribute values as variants of a variable
+    product. `price`, `discount_price` and `stock` apply to each variant unless an entry of
+    `overrides` (matched on its full set of values) says otherwise.
+    """
+    product = serializers.PrimaryKeyRelatedField(queryset=models.Product.objects.all())
+    attributes = VariantMatrixAttributeSerializer(many=True)
+    price = serializers.DecimalField(max_digits=10, decimal_places=2)
+    discount_price = serializers.DecimalField(max_digits=10, decimal_places=2, required=False, allow_null=True)
+    stock = serializers.IntegerField(default=0, min_value=0)
+    sku_prefix = serializers.CharField(required=False)
+    overrides = VariantMatrixOverrideSerializer(many=True, required=False)
+    default = serializers.DictField(child=serializers.CharField(), required=False)
+
+    @staticmethod
+    def _normalize(value):
+        value = re.sub(r'[^\w\s]', '', value.strip())
+        return re.sub(r'\s+', '_', value).lower().strip('_')
+
+    @staticmethod
+    def _sku_part(value):
+        # no whitespace left, so the prefix is its own normalized form
+        return normalize_sku('_'.join(value.split()))
+
+    def _combination(self, values, names):
+        combination = {self._normalize(name): self._normalize(value) for name, value in values.items()}
+        if set(combination) != set(names):
+            return None
+        return {name: combination[name] for name in names}
+
+    def validate(self, attrs):
+        from .services.variant_matrix import VariantMatrixService, MAX_MATRIX_VARIANTS
+
+        product = attrs['product']
+        if product.type != 'variable':
+            raise serializers.ValidationError({'product': ['Variants can only be generated for variable products.']})
+
+        attributes = []
+        for attribute in attrs['attributes']:
+            name = self._normalize(attribute['name'])
+            values = list(dict.fromkeys(v for v in (self._normalize(value) for value in attribute['values']) if v))
+            if not name or not values:
+                raise serializers.ValidationError({'attributes': ['Every attribute needs a name and at least one value.']})
+            attributes.append({'name': name, 'values': values})
+        names = [attribute['name'] for attribute in attributes]
+        if len(names) != len(set(names)):
+            raise serializers.ValidationError({'attributes': ['Attribute names must be unique.']})
+
+        combinations = VariantMatrixService.combinations(attributes)
+        if len(combinations) > MAX_MATRIX_VARIANTS:
+            raise serializers.ValidationError({
+                'attributes': [f'{len(combinations)} combinations requested, at most {MAX_MATRIX_VARIANTS} are allowed.']
+            })
+        keys = {tuple(combination.values()) for combination in combinations}
+
+        overrides = {}
+        for override in attrs.get('overrides', []):
+            combination = self._combination(override['values'], names)
+            if combination is None or tuple(combination.values()) not in keys:
+                raise serializers.ValidationError({'overrides': [f"No combination matches {override['values']}."]})
+            overrides[tuple(combination.values())] = override
+
+        default = None
+        if attrs.get('default'):
+            default = self._combination(attrs['default'], names)
+            if default is None or tuple(default.values()) not in keys:
+                raise serializers.ValidationError({'default': ['No combination matches the default selection.']})
+
+        prefix = self._sku_part(attrs.get('sku_prefix') or product.slug)
+        rows = []
+        for combination in combinations:
+            override = overrides.get(tuple(combination.values()), {})
+            sku = VariantMatrixService.sku_for(prefix, combination)
+            if len(sku) > models.ProductVariant._meta.get_field('sku').max_length:
+                raise serializers.ValidationError({'sku_prefix': [f'Generated SKU is too long: {sku}']})
+            rows.append({
+                'combination': combination,
+                'sku': sku,
+                'variant_name': ' / '.join(combination.values()),
+                'price': override.get('price', attrs['price']),
+                'discount_price': override.get('discount_price', attrs.get('discount_price')),
+                'stock': override.get('stock', attrs['stock']),
+            })
+
+        attrs['attributes'] = attributes
+        attrs['rows'] = rows
+        attrs['default'] = default
+        return attrs
+
+    def create(self, validated_data):
+        from .services.variant_matrix import VariantMatrixService
+
+        try:
+            variants, skipped = VariantMatrixService.generate(
+                validated_data['product'],
+                validated_data['attributes'],
+                validated_data['rows'],
+                default=validated_data['default'],
+            )
+        except ValueError as e:
+            raise serializers.ValidationError({'sku': [str(e)]})
+        return {'variants': variants, 'skipped': skipped}
+
+
+class ProductVariantBulkUpdateSerializer(serializers.Serializer):
+    """
+    Stock / price feed: `items` is a list of {sku, stock, price, discount_price} rows.
+    Rows are validated one by one by InventorySyncService so that a bad row is reported
+    in the per-row results instead of rejecting the whole feed.
+    """
+    items = serializers.ListField(allow_empty=False)
+
+    def validate_items(self, value):
+        from .services.inventory_sync import BULK_UPDATE_MAX_ROWS
+        if len(value) > BULK_UPDATE_MAX_ROWS:
+            raise serializers.ValidationError(f'At most {BULK_UPDATE_MAX_ROWS} rows are allowed per request.')
+        return value
+
+    def create(self, validated_data):
+        from .services.inventory_sync import InventorySyncService
+        results, summary = InventorySyncService(validated_data['user']).apply(validated_data['items'])
+        return {**summary, 'results': results}
+
+
 class ProductVariantSerializerView(serializers.ModelSerializer):
     product = serializers.StringRelatedField()
 
@@ -0,0 +1,188 @@
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Exists, OuterRef, Q
+
+from ..constants.facets import FACET_CACHE_PREFIX, FACET_CACHE_TIMEOUT
+from ..models import ProductAttributeFacet, ProductVariant, ProductVariantAttribute
+
+
+def normalize_token(text):
+    return " ".join(str(text).lower().split())
+
+
+class AttributeFacetService:
+    """
+    Maintain ProductAttributeFacet and resolve attribute filters (color=red&size=m) against it.
+    A product matches when one of its variants carries every requested attribute,
+    which is a single grouped scan of the (attribute_name, value, ...) index.
+    """
+
+    NAMES_CACHE_KEY = f"{FACET_CACHE_PREFIX}:attribute_names"
+
+    # ---------- maintenance ----------
+    @staticmethod
+    def _rows(variant_attrs):
+        return [
+            ProductAttributeFacet(
+                variant_attribute_id=variant_attr.pk,
+                attribute_name=normalize_token(variant_attr.attribute.name),
+                value=normalize_token(variant_attr.value.value),
+                product_id=variant_attr.variant.product_id,
+                variant_id=variant_attr.variant_id,
+                in_stock=variant_attr.variant.stock > 0,
+            )
+            for variant_attr in variant_attrs
+        ]
+
+    @classmethod
+    def _after_write(cls):
+        from .facets import ProductFacetService
+        cache.delete(cls.NAMES_CACHE_KEY)
+        ProductFacetService.invalidate()
+
+    @classmethod
+    @transaction.atomic
+    def sync_variant(cls, variant_id):
+        """Rebuild the facet rows of one variant (a handful of rows)."""
+        if not variant_id:
+            return
+        variant_attrs = ProductVariantAttribute.objects.filter(variant_id=variant_id).select_related(
+            "attribute", "value", "variant"
+        )
+        ProductAttributeFacet.objects.filter(variant_id=variant_id).delete()
+        ProductAttributeFacet.objects.bulk_create(cls._rows(variant_attrs))
+        cls._after_write()
+
+    @classmethod
+    def sync_products(cls, product_ids=None, batch_size=1000):
+        """Rebuild the facet rows of many products (`None` rebuilds the whole table)."""
+        variant_attrs = ProductVariantAttribute.objects.select_related("attribute", "value", "variant").order_by("pk")
+        stale = ProductAttributeFacet.objects.all()
+        if product_ids is not None:
+            product_ids = list(product_ids)
+            variant_attrs = variant_attrs.filter(variant__product_id__in=product_ids)
+            stale = stale.filter(product_id__in=product_ids)
+
+        written = 0
+        with transaction.atomic():
+            stale.delete()
+            batch = []
+            for variant_attr in variant_attrs.iterator(chunk_size=batch_size):
+                batch.append(variant_attr)
+                if len(batch) >= batch_size:
+                    written += len(ProductAttributeFacet.objects.bulk_create(cls._rows(batch)))
+                    batch = []
+            if batch:
+                written += len(ProductAttributeFacet.objects.bulk_create(cls._rows(batch)))
+        cls._after_write()
+        return written
+
+    @classmethod
+    def sync_stock(cls, variant_ids, batch_size=1000):
+        """Refresh the in_stock flag of the facet rows of many variants (one UPDATE per batch)."""
+        variant_ids = list(variant_ids)
+        in_stock = Exists(ProductVariant.objects.filter(pk=OuterRef("variant_id"), stock__gt=0))
+        updated = 0
+        for i in range(0, len(variant_ids), batch_size):
+            updated += ProductAttributeFacet.objects.filter(variant_id__in=variant_ids[i:i + batch_size]).update(in_stock=in_stock)
+        cls._after_write()
+        return updated
+
+    @classmethod
+    def rename_attribute(cls, attribute):
+        if ProductAttributeFacet.objects.filter(variant_attribute__attribute_id=attribute.pk).update(
+            attribute_name=normalize_token(attribute.name)
+        ):
+            cls._after_write()
+
+    @classmethod
+    def rename_value(cls, attribute_value):
+        if ProductAttributeFacet.objects.filter(variant_attribute__value_id=attribute_value.pk).update(
+            value=normalize_token(attribute_value.value)
+        ):
+            cls._after_write()
+
+    # ---------- filtering ----------
+    @classmethod
+    def attribute_names(cls):
+        names = cache.get(cls.NAMES_CACHE_KEY)
+        if names is None:
+            names = sorted(
+                ProductAttributeFacet.objects.values_list("attribute_name", flat=True).distinct().order_by()
+            )
+            cache.set(cls.NAMES_CACHE_KEY, names, timeout=FACET_CACHE_TIMEOUT)
+        return names
+
+    @classmethod
+    def parse(cls, query_params, reserved=()):
+        """
+        Pick attribute filters out of the query string: any parameter named after a known
+        attribute. Comma-separated values are alternatives (color=red,blue).
+        Returns {attribute_name: [values]} with normalized, sorted values.
+        """
+        known = set(cls.attribute_names())
+        attributes = {}
+        for param in query_params:
+            name = normalize_token(param)
+            if param in reserved or name not in known:
+                continue
+            values = {
+                normalize_token(value)
+                for raw in query_params.getlist(param)
+                for value in raw.split(",")
+                if value.strip()
+            }
+            if values:
+                attributes[name] = sorted(values | set(attributes.get(name, [])))
+        return attributes
+
+    @staticmethod
+    def matching_product_ids(attributes, in_stock=None):
+        """Subquery of product ids having a variant that matches every attribute in `attributes`."""
+        condition = Q()
+        for name, values in attributes.items():
+            condition |= Q(attribute_name=name, value__in=values)
+        rows = ProductAttributeFacet.objects.filter(condition)
+        if in_stock is not None:
+            rows = rows.filter(in_stock=in_stock)
+        return (
+            rows.values("variant_id", "product_id")
+            .annotate(matched=Count("attribute_name", distinct=True))
+            .filter(matched=len(attributes))
+            .values("product_id")
+        )
+
+    @classmethod
+    def value_counts(cls, products, attributes, in_stock=None):
+        """
+        Product counts per attribute value within `products` (already filtered by
+        everything except attributes). Each selected attribute is counted without its own
+        selection, so one query per selected attribute plus one for the rest.
+        """
+        def grouped(product_set, only=None, exclude=()):
+            rows = ProductAttributeFacet.objects.filter(product_id__in=product_set.values("id"))
+            if in_stock is not None:
+                rows = rows.filter(in_stock=in_stock)
+            if only is not None:
+                rows = rows.filter(attribute_name=only)
+            elif exclude:
+                rows = rows.exclude(attribute_name__in=exclude)
+            return rows.values("attribute_name", "value").annotate(count=Count("product_id", distinct=True)).order_by()
+
+        def narrowed(selection):
+            if not selection:
+                return products
+            return products.filter(pk__in=cls.matching_product_ids(selection, in_stock=in_stock))
+
+        rows = list(grouped(narrowed(attributes), exclude=list(attributes)))
+        for name in attributes:
+            others = {other: values for other, values in attributes.items() if other != name}
+            rows.extend(grouped(narrowed(others), only=name))
+
+        counts = {}
+        for row in rows:
+            counts.setdefault(row["attribute_name"], []).append({"value": row["value"], "count": row["count"]})
+        return [
+            {"name": name, "values": sorted(values, key=lambda entry: (-entry["count"], entry["value"]))}
+            for name, values in sorted(counts.items())
+        ]
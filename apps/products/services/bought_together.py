@@ -0,0 +1,202 @@
+from collections import Counter, defaultdict
+from datetime import timedelta
+from itertools import permutations
+
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import F, Max, Q, Window
+from django.db.models.functions import RowNumber
+from django.utils.dateparse import parse_datetime
+
+from apps.orders.models import Order, OrderItem
+from .sales_rollup import SOLD_ORDER_STATUSES
+from ..models import Product, ProductBoughtTogether, ProductCooccurrence, ProductCooccurrenceOrder
+
+
+# neighbours kept per product
+BOUGHT_TOGETHER_TOP_K = 20
+# baskets with more distinct products than this are bulk / B2B orders and say little about affinity
+MAX_BASKET_SIZE = 50
+
+
+class BoughtTogetherService:
+    """
+    Maintain a sparse product co-occurrence matrix from paid orders and the top-K
+    "frequently bought together" neighbours of every product.
+
+    Orders are consumed incrementally from a high-water mark on Order.updated_at, exactly
+    like SalesRollupService: ProductCooccurrenceOrder records which orders are counted, so
+    re-reading an order is harmless and cancelled / refunded orders are subtracted again.
+    Each chunk of orders is turned into pair deltas in memory (one Counter of the pairs that
+    actually occur) and added with one INSERT ... ON CONFLICT DO UPDATE per batch; only the
+    products whose pairs changed get their top-K list recomputed, with a window query.
+    """
+
+    WATERMARK_KEY = "bought_together:watermark"
+    LOCK_KEY = "bought_together:lock"
+    LOCK_TIMEOUT = 60 * 60 * 4
+    # re-read a little before the mark so late-committing order updates are not missed
+    WATERMARK_OVERLAP = timedelta(minutes=5)
+
+    # ---------- ingestion ----------
+    @classmethod
+    def _watermark(cls):
+        value = cache.get(cls.WATERMARK_KEY)
+        if value:
+            return parse_datetime(value)
+        # cache lost: the newest counted order is a safe (earlier) mark
+        return ProductCooccurrenceOrder.objects.aggregate(mark=Max("order_updated_at"))["mark"]
+
+    @staticmethod
+    def _pair_deltas(order_ids, sign, deltas):
+        """Add sign * 1 for every ordered pair of distinct products in each order's basket."""
+        if not order_ids:
+            return
+        baskets = defaultdict(set)
+        for order_id, product_id in (
+            OrderItem.objects.filter(order_id__in=order_ids, product__isnull=False)
+            .values_list("order_id", "product_id")
+            .distinct()
+        ):
+            baskets[order_id].add(product_id)
+        for products in baskets.values():
+            if 1 < len(products) <= MAX_BASKET_SIZE:
+                for pair in permutations(sorted(products), 2):
+                    deltas[pair] += sign
+
+    @staticmethod
+    def _upsert_sql(row_count):
+        quote = connection.ops.quote_name
+        table = quote(ProductCooccurrence._meta.db_table)
+        placeholders = ", ".join(["(%s, %s, %s)"] * row_count)
+        return (
+            f"INSERT INTO {table} ({quote('product_id')}, {quote('other_id')}, {quote('count')}) "
+            f"VALUES {placeholders} "
+            f"ON CONFLICT ({quote('product_id')}, {quote('other_id')}) "
+            f"DO UPDATE SET {quote('count')} = {table}.{quote('count')} + EXCLUDED.{quote('count')}"
+        )
+
+    @classmethod
+    def _apply(cls, deltas, batch_size):
+        """Add the pair deltas; drops pairs that fall to zero. Returns the touched product ids."""
+        existing = set()
+        product_ids = {product_id for pair in deltas for product_id in pair}
+        ids = sorted(product_ids)
+        for i in range(0, len(ids), batch_size):
+            existing.update(Product.objects.filter(pk__in=ids[i:i + batch_size]).values_list("id", flat=True))
+        rows = [
+            [product_id, other_id, delta]
+            for (product_id, other_id), delta in sorted(deltas.items())
+            if delta and product_id in existing and other_id in existing
+        ]
+
+        # stay under the backend's bound-parameter limit (SQLite)
+        max_params = connection.features.max_query_params
+        if max_params:
+            batch_size = max(1, min(batch_size, max_params // 3))
+        with connection.cursor() as cursor:
+            for i in range(0, len(rows), batch_size):
+                chunk = rows[i:i + batch_size]
+                cursor.execute(cls._upsert_sql(len(chunk)), [value for row in chunk for value in row])
+
+        touched = {row[0] for row in rows}
+        shrunk = sorted({row[0] for row in rows if row[2] < 0})
+        for i in range(0, len(shrunk), batch_size):
+            ProductCooccurrence.objects.filter(product_id__in=shrunk[i:i + batch_size], count__lte=0).delete()
+        return touched
+
+    @classmethod
+    def _ingest_chunk(cls, chunk, batch_size):
+        order_ids = [order["id"] for order in chunk]
+        counted = dict(ProductCooccurrenceOrder.objects.filter(order_id__in=order_ids).values_list("order_id", "counted"))
+
+        added, removed, marks = [], [], []
+        for order in chunk:
+            sold = order["payment_status"] == "paid" and order["status"] in SOLD_ORDER_STATUSES
+            if sold == counted.get(order["id"], False):
+                continue
+            (added if sold else removed).append(order["id"])
+            marks.append(ProductCooccurrenceOrder(order_id=order["id"], counted=sold, order_updated_at=order["updated_at"]))
+
+        deltas = Counter()
+        cls._pair_deltas(added, 1, deltas)
+        cls._pair_deltas(removed, -1, deltas)
+        with transaction.atomic():
+            touched = cls._apply(deltas, batch_size)
+            ProductCooccurrenceOrder.objects.bulk_create(
+                marks, update_conflicts=True, unique_fields=["order"], update_fields=["counted", "order_updated_at"]
+            )
+        return len(marks), touched
+
+    @classmethod
+    def ingest(cls, batch_size=1000):
+        """Consume orders changed since the high-water mark. Returns (orders counted or uncounted, touched product ids)."""
+        watermark = cls._watermark()
+        orders = Order.objects.all()
+        if watermark is not None:
+            orders = orders.filter(updated_at__gte=watermark - cls.WATERMARK_OVERLAP)
+        orders = orders.order_by("updated_at", "id").values("id", "updated_at", "payment_status", "status")
+
+        processed, touched, last = 0, set(), None
+        while True:
+            page = orders
+            if last is not None:
+                # keyset walk over the (updated_at, id) index
+                page = page.filter(Q(updated_at__gt=last["updated_at"]) | Q(updated_at=last["updated_at"], id__gt=last["id"]))
+            chunk = list(page[:batch_size])
+            if not chunk:
+                break
+            count, products = cls._ingest_chunk(chunk, batch_size)
+            processed, touched, last = processed + count, touched | products, chunk[-1]
+
+        if last is not None:
+            cache.set(cls.WATERMARK_KEY, last["updated_at"].isoformat(), timeout=None)
+        return processed, touched
+
+    # ---------- neighbours ----------
+    @staticmethod
+    def refresh_neighbours(product_ids, top_k=BOUGHT_TOGETHER_TOP_K, batch_size=1000):
+        """Recompute the top-K lists of `product_ids` from the pair counts. Returns the number of rows written."""
+        product_ids = sorted(product_ids)
+        written = 0
+        for i in range(0, len(product_ids), batch_size):
+            chunk = product_ids[i:i + batch_size]
+            neighbours = {product_id: [] for product_id in chunk}
+            ranked = (
+                ProductCooccurrence.objects.filter(product_id__in=chunk, count__gt=0)
+                .annotate(rank=Window(RowNumber(), partition_by=[F("product_id")], order_by=[F("count").desc(), F("other_id").asc()]))
+                .filter(rank__lte=top_k)
+                .values_list("product_id", "other_id", "count")
+            )
+            for product_id, other_id, count in ranked:
+                neighbours[product_id].append([other_id, count])
+            for product_id in neighbours:
+                neighbours[product_id].sort(key=lambda item: (-item[1], item[0]))
+
+            ProductBoughtTogether.objects.bulk_create(
+                [ProductBoughtTogether(product_id=product_id, neighbours=items) for product_id, items in neighbours.items()],
+                update_conflicts=True, unique_fields=["product"], update_fields=["neighbours", "updated_at"],
+            )
+            written += len(neighbours)
+        return written
+
+    @classmethod
+    def run(cls, batch_size=1000):
+        # one run at a time, the ledger check and the pair update are not atomic across runs
+        if not cache.add(cls.LOCK_KEY, 1, timeout=cls.LOCK_TIMEOUT):
+            return {"orders": 0, "products": 0, "skipped": True}
+        try:
+            processed, touched = cls.ingest(batch_size=batch_size)
+            written = cls.refresh_neighbours(touched, batch_size=batch_size)
+        finally:
+            cache.delete(cls.LOCK_KEY)
+        return {"orders": processed, "products": written}
+
+    # ---------- reads ----------
+    @staticmethod
+    def neighbour_ids(slug, limit=BOUGHT_TOGETHER_TOP_K):
+        """[(product_id, count)] co-purchased with the product, best first; None when the slug is unknown."""
+        row = Product.objects.filter(slug=slug).values_list("id", "bought_together__neighbours").first()
+        if row is None:
+            return None
+        return [tuple(item) for item in (row[1] or [])[:limit]]
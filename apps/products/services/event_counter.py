@@ -0,0 +1,94 @@
+import logging
+from collections import defaultdict
+from datetime import date
+from decimal import Decimal
+
+from django.db import transaction
+from django.utils import timezone
+from django_redis import get_redis_connection
+
+from .product_analytics import ProductAnalyticsService
+from .redis_buffer import drain_hash
+from .trending import TrendingService
+
+logger = logging.getLogger("myapp")
+
+
+PENDING_KEY = "product_events:pending"
+# buffered event -> ProductAnalytics column; revenue is buffered in cents to stay integral
+EVENT_FIELDS = {
+    "add_to_cart": "add_to_cart",
+    "wishlist": "wishlist",
+    "sales_count": "sales_count",
+    "revenue_cents": "revenue",
+}
+
+
+class ProductEventCounter:
+    """
+    Count add-to-cart, wishlist and sale events per (product, date) in one Redis hash
+    (field "<date>:<product_id>:<event>"), so the cart and checkout paths only pay for
+    an HINCRBY. `flush` folds the counters into ProductAnalytics with bulk upserts.
+    """
+
+    @staticmethod
+    def record_many(events):
+        """events: iterable of (product_id, event, amount)."""
+        today = timezone.localdate().isoformat()
+        events = [(product_id, event, amount) for product_id, event, amount in events if product_id and amount]
+        if not events:
+            return
+        TrendingService.record_many(events)
+        try:
+            pipe = get_redis_connection("default").pipeline(transaction=False)
+            for product_id, event, amount in events:
+                pipe.hincrby(PENDING_KEY, f"{today}:{product_id}:{event}", int(amount))
+            pipe.execute()
+        except Exception as e:
+            # without Redis write the counters straight away
+            logger.warning(f"Redis event counter failed, saving directly: {str(e)}")
+            pending = defaultdict(int)
+            for product_id, event, amount in events:
+                pending[f"{today}:{product_id}:{event}"] += int(amount)
+            try:
+                ProductEventCounter._write(pending)
+            except Exception as e:
+                logger.error(f"Failed to save product events: {str(e)}")
+
+    @classmethod
+    def record(cls, product_id, event, amount=1):
+        cls.record_many([(product_id, event, amount)])
+
+    @classmethod
+    def record_order_sale(cls, order_id):
+        """Emit sales_count / revenue events for every item of a freshly paid order, after commit."""
+        def emit():
+            from apps.orders.models import OrderItem
+
+            events = []
+            for product_id, quantity, subtotal in OrderItem.objects.filter(
+                order_id=order_id, product__isnull=False
+            ).values_list("product_id", "quantity", "subtotal"):
+                events.append((product_id, "sales_count", quantity))
+                events.append((product_id, "revenue_cents", int((subtotal or 0) * 100)))
+            cls.record_many(events)
+
+        transaction.on_commit(emit)
+
+    @staticmethod
+    def _write(pending, batch_size=500):
+        deltas = defaultdict(dict)
+        for field, count in pending.items():
+            day, product_id, event = field.split(":")
+            column = EVENT_FIELDS.get(event)
+            if column is None:
+                continue
+            value = Decimal(count) / 100 if event == "revenue_cents" else count
+            counts = deltas[(int(product_id), date.fromisoformat(day))]
+            counts[column] = counts.get(column, 0) + value
+        return ProductAnalyticsService.add_counts(deltas, batch_size=batch_size)
+
+    @classmethod
+    def flush(cls, batch_size=500):
+        """Write the buffered counters; returns the number of (product, date) rows upserted."""
+        return drain_hash(PENDING_KEY, lambda pending: cls._write(pending, batch_size))
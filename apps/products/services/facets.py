@@ -0,0 +1,143 @@
+import hashlib
+import json
+
+from django.core.cache import cache
+from django.db.models import Case, CharField, Count, Q, Value, When
+
+from apps.catalog.services.category_tree import CategoryTreeService
+from ..constants.facets import FACET_CACHE_PREFIX, FACET_CACHE_TIMEOUT, PRICE_BUCKETS
+from ..models import Product
+from .attribute_facets import AttributeFacetService
+from .listing_filters import ProductListingFilters
+
+
+# facets counted in Python from the grouped rows; every other filter is applied in SQL
+DISJUNCTIVE_FACETS = ("brand", "category", "in_stock")
+
+
+def _price_bucket_expression():
+    whens = []
+    for key, lower, upper in PRICE_BUCKETS:
+        condition = Q(effective_price__gte=lower)
+        if upper is not None:
+            condition &= Q(effective_price__lt=upper)
+        whens.append(When(condition, then=Value(key)))
+    return Case(*whens, default=Value(PRICE_BUCKETS[0][0]), output_field=CharField())
+
+
+class ProductFacetService:
+    """
+    Brand, category, price-range, in-stock and attribute-value counts for the product listing.
+
+    All facets come from one GROUP BY over the filtered products; brand, category and
+    in_stock are counted disjunctively (each facet ignores its own selection) while
+    folding the grouped rows in Python. Attribute values come from the
+    ProductAttributeFacet table (see AttributeFacetService.value_counts).
+    Results are cached per normalized filter set.
+    """
+
+    GENERATION_KEY = f"{FACET_CACHE_PREFIX}:generation"
+
+    # Product fields that can move a product between facet counts or listings
+    SOURCE_FIELDS = {
+        "status", "brand", "category", "store", "title", "description", "specification",
+        "type", "base_price", "discount_amount", "stock",
+    }
+
+    # ---------- cache ----------
+    @classmethod
+    def generation(cls):
+        return cache.get(cls.GENERATION_KEY) or 0
+
+    @classmethod
+    def invalidate(cls, update_fields=None):
+        """Drop every cached facet payload by moving to a new generation."""
+        if update_fields is not None and not cls.SOURCE_FIELDS.intersection(update_fields):
+            return
+        cache.add(cls.GENERATION_KEY, 0, timeout=None)
+        try:
+            cache.incr(cls.GENERATION_KEY)
+        except ValueError:
+            cache.set(cls.GENERATION_KEY, 1, timeout=None)
+
+    @classmethod
+    def cache_key(cls, filters):
+        digest = hashlib.sha1(json.dumps(filters, sort_keys=True).encode()).hexdigest()
+        return f"{FACET_CACHE_PREFIX}:{cls.generation()}:{digest}"
+
+    @classmethod
+    def get_facets(cls, filters):
+        key = cls.cache_key(filters)
+        facets = cache.get(key)
+        if facets is None:
+            facets = cls.compute(filters)
+            cache.set(key, facets, timeout=FACET_CACHE_TIMEOUT)
+        return facets
+
+    # ---------- computation ----------
+    @staticmethod
+    def compute(filters):
+        queryset = ProductListingFilters.apply(
+            Product.objects.filter(status="published"), filters, exclude=DISJUNCTIVE_FACETS
+        )
+        rows = (
+            queryset
+            .annotate(price_bucket=_price_bucket_expression())
+            .values("brand__slug", "brand__name", "category_id", "category__slug", "category__name", "price_bucket", "in_stock")
+            .annotate(count=Count("id"))
+            .order_by()
+        )
+
+        selected = {facet: filters[facet] for facet in DISJUNCTIVE_FACETS if facet in filters}
+        if "category" in selected:
+            # a category selection covers its subcategories, as in the listing
+            selected["category"] = set(CategoryTreeService.descendant_ids(selected["category"]))
+        total = 0
+        brands, categories, in_stock, price_ranges = {}, {}, {True: 0, False: 0}, {}
+
+        for row in rows:
+            row_values = {"brand": row["brand__slug"], "category": row["category_id"], "in_stock": row["in_stock"]}
+            misses = [
+                facet for facet, value in selected.items()
+                if (row_values[facet] not in value if facet == "category" else row_values[facet] != value)
+            ]
+            if len(misses) > 1:
+                continue
+            count = row["count"]
+
+            if not misses:
+                total += count
+                price_ranges[row["price_bucket"]] = price_ranges.get(row["price_bucket"], 0) + count
+            # a row missing exactly one selection still counts towards that facet's other options
+            if not misses or misses == ["brand"]:
+                if row["brand__slug"]:
+                    entry = brands.setdefault(row["brand__slug"], {"slug": row["brand__slug"], "name": row["brand__name"], "count": 0})
+                    entry["count"] += count
+            if not misses or misses == ["category"]:
+                if row["category__slug"]:
+                    entry = categories.setdefault(row["category__slug"], {"slug": row["category__slug"], "name": row["category__name"], "count": 0})
+                    entry["count"] += count
+            if not misses or misses == ["in_stock"]:
+                in_stock[row["in_stock"]] += count
+
+        attribute_products = ProductListingFilters.apply(
+            Product.objects.filter(status="published"), filters, exclude=("attributes",)
+        )
+        attributes = AttributeFacetService.value_counts(
+            attribute_products, filters.get("attributes", {}), in_stock=True if filters.get("in_stock") else None
+        )
+
+        def by_count(entries):
+            return sorted(entries, key=lambda entry: (-entry["count"], entry["name"] or ""))
+
+        return {
+            "total": total,
+            "brands": by_count(brands.values()),
+            "categories": by_count(categories.values()),
+            "price_ranges": [
+                {"key": key, "min": lower, "max": upper, "count": price_ranges.get(key, 0)}
+                for key, lower, upper in PRICE_BUCKETS
+            ],
+            "in_stock": {"true": in_stock[True], "false": in_stock[False]},
+            "attributes": attributes,
+        }
@@ -0,0 +1,169 @@
+import logging
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count
+
+from apps.catalog.models import Category
+from apps.catalog.services.category_tree import CategoryTreeService
+from ..models import Product
+from ..serializers import ProductSerializerView
+
+logger = logging.getLogger("myapp")
+
+
+HOME_RAIL_CACHE_PREFIX = "home_rails"
+HOME_RAIL_CACHE_TIMEOUT = 60 * 15
+# bursts of writes within this window are coalesced into one background rebuild
+HOME_RAIL_REBUILD_DELAY = 5
+
+LATEST_LIMIT = 16
+BEST_SELLING_LIMIT = 16
+TOP_CATEGORIES_LIMIT = 5
+TOP_CATEGORY_PRODUCTS_LIMIT = 10
+
+
+class HomeRailService:
+    """
+    Serialized homepage rails (latest, best selling, top categories) cached in django-redis.
+    Writes to products, variants and categories, and sales rollup refreshes, drop the
+    affected rails and schedule a rebuild, so anonymous homepage traffic is served from cache.
+    """
+
+    RAILS = ("latest", "best_selling", "top_categories")
+
+    # Product fields shown on the rails or deciding rail membership
+    SOURCE_FIELDS = {
+        "title", "slug", "type", "status", "category", "brand", "store", "main_image",
+        "base_price", "discount_amount", "stock", "is_featured",
+    }
+
+    # ---------- cache ----------
+    @staticmethod
+    def cache_key(rail):
+        return f"{HOME_RAIL_CACHE_PREFIX}:{rail}"
+
+    @classmethod
+    def get(cls, rail):
+        payload = cache.get(cls.cache_key(rail))
+        if payload is None:
+            payload = cls.build(rail)
+            cache.set(cls.cache_key(rail), payload, timeout=HOME_RAIL_CACHE_TIMEOUT)
+        return payload
+
+    @classmethod
+    def rebuild(cls, rails=None, only_missing=False):
+        """Recompute and store rails; `only_missing` skips rails that are still cached."""
+        rebuilt = []
+        for rail in rails or cls.RAILS:
+            if only_missing and cache.get(cls.cache_key(rail)) is not None:
+                continue
+            cache.set(cls.cache_key(rail), cls.build(rail), timeout=HOME_RAIL_CACHE_TIMEOUT)
+            rebuilt.append(rail)
+        return rebuilt
+
+    @classmethod
+    def invalidate(cls, rails=None, update_fields=None):
+        """Drop the given rails (all by default) and schedule a background rebuild."""
+        if update_fields is not None and not cls.SOURCE_FIELDS.intersection(update_fields):
+            return
+        cache.delete_many([cls.cache_key(rail) for rail in rails or cls.RAILS])
+
+        if cache.add(f"{HOME_RAIL_CACHE_PREFIX}:rebuild_scheduled", 1, timeout=HOME_RAIL_REBUILD_DELAY):
+            transaction.on_commit(cls._schedule_rebuild)
+
+    @staticmethod
+    def _schedule_rebuild():
+        from ..tasks import rebuild_home_rails
+        try:
+            rebuild_home_rails.apply_async(kwargs={"only_missing": True}, countdown=HOME_RAIL_REBUILD_DELAY)
+        except Exception as e:
+            # the next request rebuilds the rail itself
+            logger.warning(f"Could not schedule home rail rebuild: {str(e)}")
+
+    # ---------- builders ----------
+    @classmethod
+    def build(cls, rail):
+        if rail not in cls.RAILS:
+            raise ValueError(f"Unknown home rail: {rail}")
+        return getattr(cls, f"build_{rail}")()
+
+    @staticmethod
+    def build_latest():
+        queryset = (
+            Product.objects
+            .select_related('brand', 'category', 'store', 'default_variant')
+            .filter(status="published")
+            .order_by('-created_at')[:LATEST_LIMIT]
+        )
+        return ProductSerializerView(queryset, many=True).data
+
+    @staticmethod
+    def build_best_selling(window="all", category_id=None, store_id=None):
+        """Top sellers from ProductSalesRollup, topped up with the newest products in the same scope."""
+        from .sales_rollup import SalesRollupService
+
+        sales_map = dict(SalesRollupService.top(window, category_id=category_id, store_id=store_id, limit=BEST_SELLING_LIMIT))
+        product_ids = list(sales_map.keys())
+
+        products_map = {
+            product.id: product
+            for product in Product.objects.filter(id__in=product_ids, status="published")
+            .select_related('store', 'brand', 'category', 'default_variant')
+        }
+        ordered_products = [products_map[pid] for pid in product_ids if pid in products_map]
+
+        # fill up with the newest published products
+        if len(ordered_products) < BEST_SELLING_LIMIT:
+            additional_products = Product.objects.filter(status="published").exclude(id__in=product_ids)
+            if category_id:
+                additional_products = additional_products.filter(category_id=category_id)
+            if store_id:
+                additional_products = additional_products.filter(store_id=store_id)
+            ordered_products.extend(
+                additional_products
+                .select_related('store', 'brand', 'category', 'default_variant')
+                .order_by('-created_at')[:BEST_SELLING_LIMIT - len(ordered_products)]
+            )
+
+        product_list = ProductSerializerView(ordered_products, many=True).data
+        for product_data in product_list:
+            product_data['total_sales'] = sales_map.get(product_data['id'], 0)
+        return product_list
+
+    @staticmethod
+    def build_top_categories():
+        categories = list(Category.objects.filter(
+            is_active=True
+        ).order_by('display_order').only('id', 'name', 'slug', 'display_order')[:TOP_CATEGORIES_LIMIT])
+        # every category counts and shows the products of its subcategories too
+        descendants = CategoryTreeService.descendant_map()
+        scopes = {category.id: set(descendants.get(category.slug, [category.id])) for category in categories}
+
+        counts_by_category = dict(
+            Product.objects.filter(status="published", category_id__in=set().union(*scopes.values()))
+            .values_list('category_id').annotate(count=Count('id')).order_by()
+        )
+
+        response_data = []
+        for category in categories:
+            category_products = (
+                Product.objects.filter(status="published", category_id__in=scopes[category.id])
+                .select_related('store', 'brand', 'category', 'default_variant').only(
+                    'id', 'slug', 'title', 'type',
+                    'base_price', 'main_image', 'stock',
+                    'is_featured', 'status',
+                    'avg_rating', 'total_reviews',
+                    'min_price', 'max_price', 'effective_price', 'in_stock',
+                    'store_id', 'brand_id', 'category_id', 'default_variant'
+                ).order_by('-created_at')[:TOP_CATEGORY_PRODUCTS_LIMIT]
+            )
+            response_data.append({
+                "category_id": category.id,
+                "category_name": category.name,
+                "category_slug": category.slug,
+                "display_order": category.display_order,
+                "products_count": sum(counts_by_category.get(category_id, 0) for category_id in scopes[category.id]),
+                "products": ProductSerializerView(category_products, many=True).data
+            })
+        return response_data
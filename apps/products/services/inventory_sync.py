@@ -0,0 +1,200 @@
+from decimal import Decimal, InvalidOperation
+
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from config.utils.skus import normalize_sku
+from ..models import ProductVariant
+
+
+# rows accepted by one bulk update request
+BULK_UPDATE_MAX_ROWS = 5000
+# rows per ownership lookup and per UPDATE statement
+BULK_UPDATE_BATCH_SIZE = 500
+# largest value of a DecimalField(max_digits=10, decimal_places=2)
+MAX_PRICE = Decimal("99999999.99")
+UPDATE_FIELDS = ("stock", "price", "discount_price")
+
+
+class InventorySyncService:
+    """
+    Apply a vendor's stock / price feed to variants addressed by SKU.
+
+    Rows are validated in Python, ownership is checked with one query per batch (the variants
+    of the requested SKUs joined to their store's vendor / store owner) and the accepted rows
+    of a batch are written with a single `WITH v(...) AS (VALUES ...) UPDATE ... FROM v`
+    statement (PostgreSQL, SQLite 3.33+). The save hooks are skipped; the price summary,
+    facet stock flags and cached read models are refreshed once for the whole request.
+
+    Fields left out of a row keep their value; `discount_price: null` clears the discount.
+    SKUs outside the user's stores are reported as not found. Staff may update any SKU.
+    """
+
+    def __init__(self, user, batch_size=BULK_UPDATE_BATCH_SIZE):
+        self.user = user
+        self.batch_size = max(1, batch_size)
+
+    # ---------- parsing ----------
+    @staticmethod
+    def _decimal(raw, field, errors):
+        value = raw.get(field)
+        if value is None or value == "":
+            return None
+        try:
+            value = Decimal(str(value)).quantize(Decimal("0.01"))
+        except (InvalidOperation, ValueError):
+            errors.setdefault(field, []).append("A valid number is required.")
+            return None
+        if value < 0:
+            errors.setdefault(field, []).append("Must not be negative.")
+        elif value > MAX_PRICE:
+            errors.setdefault(field, []).append(f"Must not be greater than {MAX_PRICE}.")
+        return value
+
+    @staticmethod
+    def parse_row(raw):
+        """(normalized sku, {field: value} of the fields present, errors) of one raw row."""
+        if not isinstance(raw, dict):
+            return None, {}, {"non_field_errors": ["Each row must be an object."]}
+        errors = {}
+        # stored SKUs are normalized, so "ABC-123" addresses the variant saved as "abc123"
+        sku = normalize_sku(raw.get("sku") or "")
+        if not sku:
+            errors["sku"] = ["This field is required."]
+
+        changes = {}
+        if "stock" in raw:
+            try:
+                stock = int(raw["stock"])
+            except (TypeError, ValueError):
+                errors["stock"] = ["A valid integer is required."]
+            else:
+                if stock < 0:
+                    errors["stock"] = ["Must not be negative."]
+                changes["stock"] = stock
+        if "price" in raw:
+            price = InventorySyncService._decimal(raw, "price", errors)
+            if price is None and "price" not in errors:
+                errors["price"] = ["This field may not be null."]
+            changes["price"] = price
+        if "discount_price" in raw:
+            changes["discount_price"] = InventorySyncService._decimal(raw, "discount_price", errors)
+
+        if not changes and not errors:
+            errors["non_field_errors"] = [f"Provide at least one of: {', '.join(UPDATE_FIELDS)}."]
+        return sku, changes, errors
+
+    # ---------- ownership ----------
+    def _owned_variants(self, skus):
+        """{sku: (variant_id, product_id, price, discount_price)} of the SKUs the user may update."""
+        variants = ProductVariant.objects.filter(sku__in=skus)
+        if not self.user.is_staff:
+            variants = variants.filter(
+                Q(product__store__vendor__user=self.user) | Q(product__store__store_owner__user=self.user)
+            )
+        return {
+            sku: (variant_id, product_id, price, discount_price)
+            for sku, variant_id, product_id, price, discount_price in variants.values_list(
+                "sku", "id", "product_id", "price", "discount_price"
+            )
+        }
+
+    # ---------- writing ----------
+    @staticmethod
+    def _update_sql(row_count):
+        quote = connection.ops.quote_name
+        table = quote(ProductVariant._meta.db_table)
+        row = "(CAST(%s AS integer), CAST(%s AS integer), CAST(%s AS numeric(10, 2)), CAST(%s AS numeric(10, 2)), CAST(%s AS boolean))"
+        return (
+            f"WITH v (id, stock, price, discount_price, set_discount) AS (VALUES {', '.join([row] * row_count)}) "
+            f"UPDATE {table} SET "
+            f"{quote('stock')} = COALESCE(v.stock, {table}.{quote('stock')}), "
+            f"{quote('price')} = COALESCE(v.price, {table}.{quote('price')}), "
+            f"{quote('discount_price')} = CASE WHEN v.set_discount THEN v.discount_price ELSE {table}.{quote('discount_price')} END, "
+            f"{quote('updated_at')} = %s "
+            f"FROM v WHERE {table}.{quote('id')} = v.id"
+        )
+
+    @classmethod
+    def _write(cls, rows):
+        """rows: [(variant_id, changes)]; one UPDATE statement."""
+        params = []
+        for variant_id, changes in rows:
+            params.extend([
+                variant_id,
+                changes.get("stock"),
+                connection.ops.adapt_decimalfield_value(changes.get("price"), 10, 2),
+                connection.ops.adapt_decimalfield_value(changes.get("discount_price"), 10, 2),
+                "discount_price" in changes,
+            ])
+        params.append(connection.ops.adapt_datetimefield_value(timezone.now()))
+        with connection.cursor() as cursor:
+            cursor.execute(cls._update_sql(len(rows)), params)
+
+    def _process_batch(self, batch, results):
+        """batch: [(index, raw sku, sku, changes)] of valid rows; fills results and returns the written rows."""
+        owned = self._owned_variants([sku for _, _, sku, _ in batch])
+        writes = []
+        for index, raw_sku, sku, changes in batch:
+            if sku not in owned:
+                results[index] = {"index": index, "sku": raw_sku, "status": "not_found", "errors": {"sku": ["SKU not found in your stores."]}}
+                continue
+            variant_id, product_id, price, discount_price = owned[sku]
+            price = changes.get("price", price)
+            discount_price = changes.get("discount_price", discount_price)
+            if discount_price is not None and discount_price > price:
+                results[index] = {"index": index, "sku": raw_sku, "status": "invalid", "errors": {"discount_price": ["Must not be greater than the price."]}}
+                continue
+            writes.append((variant_id, product_id, changes))
+            results[index] = {"index": index, "sku": raw_sku, "status": "updated", "id": variant_id}
+        if writes:
+            self._write([(variant_id, changes) for variant_id, _, changes in writes])
+        return writes
+
+    def apply(self, raw_rows):
+        """Returns (per-row results in request order, {"updated", "failed"})."""
+        results = [None] * len(raw_rows)
+        seen = set()
+        valid = []
+        for index, raw in enumerate(raw_rows):
+            sku, changes, errors = self.parse_row(raw)
+            # results echo the SKU as the caller sent it
+            raw_sku = raw.get("sku") if isinstance(raw, dict) else None
+            if not errors and sku in seen:
+                errors = {"sku": ["Duplicate SKU in this request; only its first row is applied."]}
+            if errors:
+                results[index] = {"index": index, "sku": raw_sku, "status": "invalid", "errors": errors}
+                continue
+            seen.add(sku)
+            valid.append((index, raw_sku, sku, changes))
+
+        written = []
+        with transaction.atomic():
+            for i in range(0, len(valid), self.batch_size):
+                written.extend(self._process_batch(valid[i:i + self.batch_size], results))
+            if written:
+                self._after_write(
+                    {product_id for _, product_id, _ in written},
+                    [variant_id for variant_id, _, changes in written if "stock" in changes],
+                )
+
+        updated = len(written)
+        return results, {"updated": updated, "failed": len(raw_rows) - updated}
+
+    @staticmethod
+    def _after_write(product_ids, stock_variant_ids):
+        """What the skipped save hooks would have done, once for the whole request."""
+        from .price_summary import PriceSummaryService
+        from .attribute_facets import AttributeFacetService
+        from .facets import ProductFacetService
+        from .home_rails import HomeRailService
+        from .product_detail import ProductDetailService
+        from .variant_lookup import VariantLookupService
+        PriceSummaryService.refresh_many(product_ids)
+        if stock_variant_ids:
+            AttributeFacetService.sync_stock(stock_variant_ids)
+        ProductFacetService.invalidate()
+        HomeRailService.invalidate()
+        transaction.on_commit(lambda: ProductDetailService.drop(product_ids))
+        transaction.on_commit(lambda: VariantLookupService.drop(product_ids))
@@ -0,0 +1,82 @@
+from decimal import Decimal
+
+from django.db.models import Q
+
+from apps.catalog.services.category_tree import CategoryTreeService
+from .attribute_facets import AttributeFacetService
+from .search_engine import ProductSearchService
+
+
+class ProductListingFilters:
+    """
+    Parse and apply the ProductsView query-string filters.
+    Shared by the product listing and the facets endpoint so both see the same product set.
+    """
+
+    PARAMS = ("brand", "category", "search", "store", "min_price", "max_price", "in_stock")
+    # listing controls that are never attribute filters
+    RESERVED = PARAMS + ("sort", "new_arrival", "page", "page_size", "pagination", "cursor")
+
+    @staticmethod
+    def normalize(query_params):
+        """
+        Return the active filters as a plain dict with canonical values
+        (trimmed strings, normalized decimals, booleans), suitable as a cache key.
+        Attribute filters (color=red&size=m) are collected under "attributes".
+        """
+        filters = {}
+        for param in ProductListingFilters.PARAMS:
+            value = (query_params.get(param) or "").strip()
+            if not value:
+                continue
+            if param in ("min_price", "max_price"):
+                value = str(Decimal(value).normalize())
+            elif param == "in_stock":
+                value = value.lower() == "true"
+            elif param == "search":
+                value = " ".join(value.lower().split())
+            filters[param] = value
+
+        attributes = AttributeFacetService.parse(query_params, reserved=ProductListingFilters.RESERVED)
+        if attributes:
+            filters["attributes"] = attributes
+        return filters
+
+    @staticmethod
+    def apply(queryset, filters, exclude=()):
+        """
+        Filter `queryset` by the normalized `filters`.
+        Keys listed in `exclude` are skipped (the facets endpoint counts those itself).
+        Search is applied last and annotates `search_rank`.
+        """
+        conditions = Q()
+
+        if "brand" in filters and "brand" not in exclude:
+            conditions &= Q(brand__slug=filters["brand"])
+
+        if "category" in filters and "category" not in exclude:
+            # the category and its subcategories, resolved from the cached descendant map so
+            # the (status, category, <sort key>, id) indexes apply
+            category_ids = CategoryTreeService.descendant_ids(filters["category"])
+            conditions &= Q(category_id__in=category_ids) if category_ids else Q(pk__in=[])
+
+        if "store" in filters and "store" not in exclude:
+            conditions &= Q(store__store_name__icontains=filters["store"])
+
+        if "min_price" in filters and "min_price" not in exclude:
+            conditions &= Q(effective_price__gte=Decimal(filters["min_price"]))
+        if "max_price" in filters and "max_price" not in exclude:
+            conditions &= Q(effective_price__lte=Decimal(filters["max_price"]))
+
+        if "in_stock" in filters and "in_stock" not in exclude:
+            conditions &= Q(in_stock=filters["in_stock"])
+
+        if "attributes" in filters and "attributes" not in exclude:
+            conditions &= Q(pk__in=AttributeFacetService.matching_product_ids(
+                filters["attributes"], in_stock=True if filters.get("in_stock") else None
+            ))
+
+        queryset = queryset.filter(conditions)
+        if "search" in filters and "search" not in exclude:
+            queryset = ProductSearchService.search(queryset, filters["search"])
+        return queryset
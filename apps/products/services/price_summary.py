@@ -0,0 +1,101 @@
+from decimal import Decimal
+
+from ..models import Product, ProductVariant
+
+
+ZERO = Decimal("0.00")
+
+
+def _discounted(price, discount_price):
+    """Variant price a customer pays: discount_price when it is a real reduction."""
+    if discount_price is not None and ZERO < discount_price < price:
+        return discount_price
+    return price
+
+
+class PriceSummaryService:
+    """
+    Maintain the denormalized price/stock summary on Product
+    (min_price, max_price, effective_price, default_variant, in_stock),
+    so listings can filter and sort without touching variants.
+    """
+
+    # Product fields that change the summary of a simple product
+    SOURCE_FIELDS = {"type", "base_price", "discount_amount", "stock"}
+
+    @staticmethod
+    def summarize(product_row, variants):
+        """
+        product_row: dict with type, base_price, discount_amount, stock
+        variants: iterable of dicts with id, price, discount_price, stock, is_default, created_at
+        """
+        variants = sorted(variants, key=lambda v: (v["created_at"], v["id"]))
+
+        if product_row["type"] == "variable" or variants:
+            if not variants:
+                return {
+                    "min_price": ZERO, "max_price": ZERO, "effective_price": ZERO,
+                    "default_variant_id": None, "in_stock": False,
+                }
+            default = next((v for v in variants if v["is_default"]), variants[0])
+            prices = [v["price"] for v in variants]
+            return {
+                "min_price": min(prices),
+                "max_price": max(prices),
+                "effective_price": min(_discounted(v["price"], v["discount_price"]) for v in variants),
+                "default_variant_id": default["id"],
+                "in_stock": any(v["stock"] > 0 for v in variants),
+            }
+
+        base_price = product_row["base_price"] or ZERO
+        discount = product_row["discount_amount"] or ZERO
+        effective = base_price - discount if ZERO < discount < base_price else base_price
+        return {
+            "min_price": base_price,
+            "max_price": base_price,
+            "effective_price": effective,
+            "default_variant_id": None,
+            "in_stock": product_row["stock"] > 0,
+        }
+
+    @classmethod
+    def refresh(cls, product_id, update_fields=None):
+        """Recompute the summary of one product with two indexed reads and one UPDATE."""
+        if not product_id:
+            return
+        if update_fields is not None and not cls.SOURCE_FIELDS.intersection(update_fields):
+            return
+        product_row = Product.objects.filter(pk=product_id).values(
+            "type", "base_price", "discount_amount", "stock"
+        ).first()
+        if product_row is None:
+            return
+        variants = ProductVariant.objects.filter(product_id=product_id).values(
+            "id", "price", "discount_price", "stock", "is_default", "created_at"
+        )
+        Product.objects.filter(pk=product_id).update(**cls.summarize(product_row, variants))
+
+    @classmethod
+    def refresh_many(cls, product_ids, batch_size=1000):
+        """Recompute summaries for many products with one read per table per batch."""
+        product_ids = list(product_ids)
+        fields = ["min_price", "max_price", "effective_price", "default_variant_id", "in_stock"]
+        written = 0
+        for i in range(0, len(product_ids), batch_size):
+            chunk = product_ids[i:i + batch_size]
+            rows = Product.objects.filter(pk__in=chunk).values(
+                "id", "type", "base_price", "discount_amount", "stock"
+            )
+            variants_by_product = {}
+            for variant in ProductVariant.objects.filter(product_id__in=chunk).values(
+                "id", "product_id", "price", "discount_price", "stock", "is_default", "created_at"
+            ):
+                variants_by_product.setdefault(variant["product_id"], []).append(variant)
+
+            batch = [
+                Product(pk=row["id"], **cls.summarize(row, variants_by_product.get(row["id"], [])))
+                for row in rows
+            ]
+            Product.objects.bulk_update(batch, fields)
+            written += len(batch)
+        return written
@@ -0,0 +1,61 @@
+from decimal import Decimal
+
+from django.db import connection, transaction
+
+from ..models import Product, ProductAnalytics
+
+
+# ProductAnalytics columns that are accumulated from buffered counters
+COUNTER_FIELDS = ("views", "add_to_cart", "wishlist", "sales_count", "revenue")
+
+
+class ProductAnalyticsService:
+    """Write buffered per-(product, date) deltas into ProductAnalytics with one upsert per batch."""
+
+    @staticmethod
+    def _upsert_sql(row_count):
+        table = connection.ops.quote_name(ProductAnalytics._meta.db_table)
+        columns = ["product_id", "date", *COUNTER_FIELDS]
+        placeholders = ", ".join(["(" + ", ".join(["%s"] * len(columns)) + ")"] * row_count)
+        updates = ", ".join(
+            f"{connection.ops.quote_name(field)} = {table}.{connection.ops.quote_name(field)} + EXCLUDED.{connection.ops.quote_name(field)}"
+            for field in COUNTER_FIELDS
+        )
+        return (
+            f"INSERT INTO {table} ({', '.join(connection.ops.quote_name(column) for column in columns)}) "
+            f"VALUES {placeholders} "
+            f"ON CONFLICT ({connection.ops.quote_name('product_id')}, {connection.ops.quote_name('date')}) "
+            f"DO UPDATE SET {updates}"
+        )
+
+    @classmethod
+    def add_counts(cls, deltas, batch_size=500):
+        """
+        deltas: {(product_id, date): {"views": 3, "revenue": Decimal("10.00"), ...}}
+        Adds each delta onto the (product, date) row, creating it when missing
+        (INSERT ... ON CONFLICT DO UPDATE, PostgreSQL and SQLite). Rows of deleted
+        products are dropped. Returns the number of rows written.
+        """
+        if not deltas:
+            return 0
+        existing = set(Product.objects.filter(pk__in={product_id for product_id, _ in deltas}).values_list("id", flat=True))
+        rows = [
+            [product_id, connection.ops.adapt_datefield_value(day), *(
+                connection.ops.adapt_decimalfield_value(Decimal(counts.get(field, 0)), 12, 2)
+                if field == "revenue" else counts.get(field, 0)
+                for field in COUNTER_FIELDS
+            )]
+            for (product_id, day), counts in sorted(deltas.items())
+            if product_id in existing
+        ]
+
+        # stay under the backend's bound-parameter limit (SQLite)
+        max_params = connection.features.max_query_params
+        if max_params:
+            batch_size = max(1, min(batch_size, max_params // (len(COUNTER_FIELDS) + 2)))
+
+        with transaction.atomic(), connection.cursor() as cursor:
+            for i in range(0, len(rows), batch_size):
+                chunk = rows[i:i + batch_size]
+                cursor.execute(cls._upsert_sql(len(chunk)), [value for row in chunk for value in row])
+        return len(rows)
@@ -0,0 +1,54 @@
+from django.core.cache import cache
+
+from ..models import Product
+from ..serializers import ProductSerializerView
+
+
+PRODUCT_CARD_CACHE_PREFIX = "product_card"
+PRODUCT_CARD_CACHE_TIMEOUT = 60 * 60
+
+
+class ProductCardService:
+    """
+    Listing cards (ProductSerializerView) of single products cached in django-redis, for
+    rails that are assembled from product ids (recommendations, trending). Cards are read
+    with one get_many; misses are built with one query and written back with set_many.
+    Cards are dropped with the product's detail document (ProductDetailService), which
+    every write to a product or its variants already invalidates.
+    """
+
+    @staticmethod
+    def cache_key(product_id):
+        return f"{PRODUCT_CARD_CACHE_PREFIX}:{product_id}"
+
+    @classmethod
+    def get_many(cls, product_ids):
+        """Cards of the published products among `product_ids`, in the given order."""
+        product_ids = list(dict.fromkeys(product_ids))
+        keys = {product_id: cls.cache_key(product_id) for product_id in product_ids}
+        cached = cache.get_many(list(keys.values()))
+        cards = {product_id: cached[key] for product_id, key in keys.items() if key in cached}
+
+        missing = [product_id for product_id in product_ids if product_id not in cards]
+        if missing:
+            built = cls.build_many(missing)
+            # unpublished / deleted products are cached as {} so they are not re-read each time
+            cache.set_many(
+                {keys[product_id]: built.get(product_id) or {} for product_id in missing},
+                timeout=PRODUCT_CARD_CACHE_TIMEOUT,
+            )
+            cards.update(built)
+        return [cards[product_id] for product_id in product_ids if cards.get(product_id)]
+
+    @staticmethod
+    def build_many(product_ids):
+        products = (
+            Product.objects.filter(pk__in=product_ids, status="published")
+            .select_related("store", "brand", "category", "default_variant")
+        )
+        products = list(products)
+        return {product.pk: card for product, card in zip(products, ProductSerializerView(products, many=True).data)}
+
+    @classmethod
+    def drop(cls, product_ids):
+        cache.delete_many([cls.cache_key(product_id) for product_id in product_ids])
@@ -0,0 +1,133 @@
+import logging
+
+from django.core.cache import cache
+from django.db import transaction
+
+from apps.review.models import Review
+from apps.review.serializers import ReviewListSerializer
+from ..models import Product
+from .product_cards import ProductCardService
+
+logger = logging.getLogger("myapp")
+
+
+PRODUCT_DETAIL_CACHE_PREFIX = "product_detail"
+PRODUCT_DETAIL_CACHE_TIMEOUT = 60 * 60 * 24
+# writes to one product within this window are coalesced into one background rebuild
+PRODUCT_DETAIL_REBUILD_DELAY = 5
+# approved reviews embedded in the detail response; later pages come from the reviews endpoint
+REVIEW_PAGE_SIZE = 10
+
+
+class ProductDetailService:
+    """
+    Product detail read model: one serialized document per product (images, attributes with
+    their values, the variant matrix and the rating summary) plus the first page of approved
+    reviews, both cached in django-redis under the product slug and fetched with one get_many.
+    Writes to the product or anything embedded in it drop both entries (and the product's
+    listing card) after commit and schedule a rebuild, so detail latency does not depend on
+    the number of variants or reviews.
+    """
+
+    # ---------- cache ----------
+    @staticmethod
+    def document_key(slug):
+        return f"{PRODUCT_DETAIL_CACHE_PREFIX}:{slug}"
+
+    @staticmethod
+    def reviews_key(slug):
+        return f"{PRODUCT_DETAIL_CACHE_PREFIX}:{slug}:reviews"
+
+    @classmethod
+    def get(cls, slug):
+        """(document, first review page) of the product, or (None, None) when the slug is unknown."""
+        document_key, reviews_key = cls.document_key(slug), cls.reviews_key(slug)
+        cached = cache.get_many([document_key, reviews_key])
+        document, reviews = cached.get(document_key), cached.get(reviews_key)
+
+        if document is None:
+            product = cls.detail_queryset().filter(slug=slug).first()
+            if product is None:
+                return None, None
+            document = cls.build(product)
+            cache.set(document_key, document, timeout=PRODUCT_DETAIL_CACHE_TIMEOUT)
+        if reviews is None:
+            reviews = cls.build_reviews(document["id"])
+            cache.set(reviews_key, reviews, timeout=PRODUCT_DETAIL_CACHE_TIMEOUT)
+        return document, reviews
+
+    @classmethod
+    def rebuild(cls, product_id):
+        """Recompute and store the cached entries of one product; returns False when it no longer exists."""
+        product = cls.detail_queryset().filter(pk=product_id).first()
+        if product is None:
+            return False
+        cache.set_many({
+            cls.document_key(product.slug): cls.build(product),
+            cls.reviews_key(product.slug): cls.build_reviews(product.pk),
+        }, timeout=PRODUCT_DETAIL_CACHE_TIMEOUT)
+        return True
+
+    @classmethod
+    def invalidate(cls, product_id, slug=None):
+        """Drop the product's cached entries once the transaction commits and schedule a rebuild."""
+        if not product_id:
+            return
+        transaction.on_commit(lambda: cls._drop_and_schedule(product_id, slug))
+
+    @classmethod
+    def drop(cls, product_ids, batch_size=1000):
+        """Drop the cached entries of many products (brand / category / store renames); they rebuild on the next read."""
+        product_ids = list(product_ids)
+        dropped = 0
+        for i in range(0, len(product_ids), batch_size):
+            slugs = Product.objects.filter(pk__in=product_ids[i:i + batch_size]).values_list("slug", flat=True)
+            keys = [key for slug in slugs for key in (cls.document_key(slug), cls.reviews_key(slug))]
+            cache.delete_many(keys)
+            ProductCardService.drop(product_ids[i:i + batch_size])
+            dropped += len(keys) // 2
+        return dropped
+
+    @classmethod
+    def _drop_and_schedule(cls, product_id, slug=None):
+        from ..tasks import rebuild_product_detail
+
+        if slug is None:
+            slug = Product.objects.filter(pk=product_id).values_list("slug", flat=True).first()
+        if slug is not None:
+            cache.delete_many([cls.document_key(slug), cls.reviews_key(slug)])
+        ProductCardService.drop([product_id])
+
+        if not cache.add(f"{PRODUCT_DETAIL_CACHE_PREFIX}:{product_id}:rebuild_scheduled", 1, timeout=PRODUCT_DETAIL_REBUILD_DELAY):
+            return
+        try:
+            rebuild_product_detail.apply_async(kwargs={"product_id": product_id}, countdown=PRODUCT_DETAIL_REBUILD_DELAY)
+        except Exception as e:
+            # the next request rebuilds the entries itself
+            logger.warning(f"Could not schedule product detail rebuild: {str(e)}")
+
+    # ---------- builders ----------
+    @staticmethod
+    def detail_queryset():
+        return Product.objects.select_related(
+            "store", "category", "brand"
+        ).prefetch_related(
+            "images",
+            "attributes__values",
+            "variants__variant_attrs__attribute",
+            "variants__variant_attrs__value",
+        )
+
+    @staticmethod
+    def build(product):
+        from ..serializers import ProductDetailSerializer
+        return ProductDetailSerializer(product).data
+
+    @staticmethod
+    def build_reviews(product_id):
+        reviews = (
+            Review.objects.filter(product_id=product_id, status="approved")
+            .select_related("product")
+            .order_by("-created_at", "-id")[:REVIEW_PAGE_SIZE]
+        )
+        return ReviewListSerializer(reviews, many=True).data
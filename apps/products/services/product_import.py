@@ -0,0 +1,447 @@
+import codecs
+import csv
+import json
+import logging
+import re
+from decimal import Decimal, InvalidOperation
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from apps.catalog.models import Brand, Category
+from apps.stores.models import Store
+from config.utils.skus import normalize_sku
+from config.utils.slugs import allocate_slugs
+from .price_summary import PriceSummaryService
+from ..constants.choices import STATUS, TYPE
+from ..models import (
+    Product, ProductAttribute, ProductAttributeValue, ProductImage, ProductVariant, ProductVariantAttribute,
+)
+
+logger = logging.getLogger("myapp")
+
+
+IMPORT_FORMATS = ("csv", "jsonl")
+IMPORT_BATCH_SIZE = 500
+# per-row errors kept in the report; the failed counter keeps counting past it
+MAX_REPORTED_ERRORS = 1000
+
+TYPES = {value for value, _ in TYPE}
+STATUSES = {value for value, _ in STATUS}
+TRUE_VALUES = {"1", "true", "yes", "y"}
+
+
+def detect_format(filename):
+    extension = filename.rsplit(".", 1)[-1].lower() if "." in filename else ""
+    if extension == "ndjson":
+        return "jsonl"
+    return extension if extension in IMPORT_FORMATS else None
+
+
+def _attribute_token(value):
+    # same normalization as the attribute / attribute value serializers
+    value = re.sub(r'[^\w\s]', '', str(value).strip())
+    return re.sub(r'\s+', '_', value).lower().strip('_')
+
+
+class ProductImportService:
+    """
+    Stream a CSV or JSONL catalog file into products, images, attributes and variants.
+
+    Rows are parsed one at a time and written in chunks: each chunk resolves categories,
+    brands and stores with one query per model, checks SKUs with one query, allocates all
+    product slugs with one query and bulk_creates every table inside one transaction. The
+    derived data normally maintained by the save hooks (search documents, price summary,
+    attribute facets) is refreshed once per chunk.
+
+    Columns / keys: title (required), type, status, description, specification, base_price,
+    discount_amount, stock, is_featured, category, brand, store (slug, name or id),
+    main_image, images ("a.jpg|b.jpg" in CSV) and variants (a JSON list in CSV) where each
+    variant has sku, price, discount_price, stock, variant_name, is_default and attributes
+    ({"color": "red"}). Image values are paths in the default storage.
+    """
+
+    def __init__(self, store_id=None, batch_size=IMPORT_BATCH_SIZE, progress=None):
+        self.store_id = store_id
+        self.batch_size = batch_size
+        self.progress = progress
+        self.stats = {"processed": 0, "created": 0, "variants": 0, "failed": 0, "errors": []}
+        self._categories, self._brands, self._stores = {}, {}, {}
+        self._seen_skus = set()
+        self._created_ids = []
+
+    # ---------- reading ----------
+    @staticmethod
+    def iter_rows(fileobj, file_format):
+        """Yield (line number, row dict) without loading the file; `fileobj` is opened in binary mode."""
+        text = codecs.getreader("utf-8-sig")(fileobj)
+        if file_format == "csv":
+            reader = csv.DictReader(text)
+            for row in reader:
+                yield reader.line_num, row
+        elif file_format == "jsonl":
+            for line_number, line in enumerate(text, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except ValueError as e:
+                    yield line_number, ValueError(f"Invalid JSON: {e}")
+                    continue
+                yield line_number, row if isinstance(row, dict) else ValueError("Each line must be a JSON object.")
+        else:
+            raise ValueError(f"Unsupported import format: {file_format}")
+
+    # ---------- parsing ----------
+    @staticmethod
+    def _decimal(row, field, errors, default=None):
+        value = row.get(field)
+        if value in (None, ""):
+            return default
+        try:
+            value = Decimal(str(value)).quantize(Decimal("0.01"))
+        except (InvalidOperation, ValueError):
+            errors.setdefault(field, []).append("A valid number is required.")
+            return default
+        if value < 0:
+            errors.setdefault(field, []).append("Must not be negative.")
+        return value
+
+    @staticmethod
+    def _integer(row, field, errors, default=0):
+        value = row.get(field)
+        if value in (None, ""):
+            return default
+        try:
+            value = int(value)
+        except (TypeError, ValueError):
+            errors.setdefault(field, []).append("A valid integer is required.")
+            return default
+        if value < 0:
+            errors.setdefault(field, []).append("Must not be negative.")
+        return value
+
+    @staticmethod
+    def _boolean(value):
+        if isinstance(value, bool):
+            return value
+        return str(value or "").strip().lower() in TRUE_VALUES
+
+    @staticmethod
+    def _list(value):
+        if value in (None, ""):
+            return []
+        if isinstance(value, list):
+            return value
+        value = str(value).strip()
+        if value.startswith("["):
+            return json.loads(value)
+        return [item.strip() for item in value.split("|") if item.strip()]
+
+    def parse_row(self, row):
+        """(product fields, images, variants, errors) of one raw row."""
+        errors = {}
+        row = {str(key).strip().lower(): value for key, value in row.items() if key is not None}
+
+        title = str(row.get("title") or "").strip()
+        if not title:
+            errors["title"] = ["This field is required."]
+        product_type = str(row.get("type") or "simple").strip().lower()
+        if product_type not in TYPES:
+            errors["type"] = [f"Choose one of: {', '.join(sorted(TYPES))}"]
+        product_status = str(row.get("status") or "draft").strip().lower()
+        if product_status not in STATUSES:
+            errors["status"] = [f"Choose one of: {', '.join(sorted(STATUSES))}"]
+
+        fields = {
+            "title": title[:Product._meta.get_field("title").max_length],
+            "type": product_type,
+            "status": product_status,
+            "description": str(row.get("description") or ""),
+            "specification": str(row.get("specification") or ""),
+            "base_price": self._decimal(row, "base_price", errors, Decimal("0.00")),
+            "discount_amount": self._decimal(row, "discount_amount", errors),
+            "stock": self._integer(row, "stock", errors),
+            "is_featured": self._boolean(row.get("is_featured")),
+            "main_image": str(row.get("main_image") or "").strip() or None,
+            "category": str(row.get("category") or "").strip() or None,
+            "brand": str(row.get("brand") or "").strip() or None,
+            "store": str(row.get("store") or "").strip() or None,
+        }
+
+        try:
+            images = [str(image).strip() for image in self._list(row.get("images"))]
+        except ValueError:
+            images = []
+            errors["images"] = ["Provide image paths separated by | or a JSON list."]
+
+        variants = []
+        try:
+            raw_variants = self._list(row.get("variants"))
+        except ValueError:
+            raw_variants = []
+            errors["variants"] = ["Variants must be a JSON list."]
+        for index, raw in enumerate(raw_variants):
+            variant_errors = {}
+            if not isinstance(raw, dict):
+                errors.setdefault("variants", []).append(f"Variant {index + 1} must be an object.")
+                continue
+            sku = normalize_sku(raw.get("sku") or "")
+            if not sku:
+                variant_errors["sku"] = ["This field is required."]
+            attributes = raw.get("attributes") or {}
+            if not isinstance(attributes, dict):
+                variant_errors["attributes"] = ["Attributes must be an object of name: value."]
+                attributes = {}
+            variant = {
+                "sku": sku,
+                "variant_name": str(raw.get("variant_name") or " / ".join(str(value) for value in attributes.values())),
+                "price": self._decimal(raw, "price", variant_errors, Decimal("0.00")),
+                "discount_price": self._decimal(raw, "discount_price", variant_errors),
+                "stock": self._integer(raw, "stock", variant_errors),
+                "is_default": self._boolean(raw.get("is_default")),
+                "attributes": {
+                    _attribute_token(name): _attribute_token(value)
+                    for name, value in attributes.items() if _attribute_token(name) and _attribute_token(value)
+                },
+            }
+            if variant_errors:
+                errors.setdefault("variants", []).append({f"variant {index + 1}": variant_errors})
+            variants.append(variant)
+
+        if product_type == "simple" and variants:
+            errors.setdefault("variants", []).append("Simple products cannot have variants.")
+        if product_type == "variable":
+            # same rule as ProductSerializer: variants carry price and stock
+            fields["base_price"], fields["stock"] = Decimal("0.00"), 0
+        return fields, images, variants, errors
+
+    # ---------- references ----------
+    def _resolve(self, model, cache, keys, name_field):
+        missing = {key for key in keys if key and key not in cache}
+        if not missing:
+            return
+        condition = Q(slug__in=missing) | Q(**{f"{name_field}__in": missing})
+        ids = {int(key) for key in missing if key.isdigit()}
+        if ids:
+            condition |= Q(pk__in=ids)
+        for pk, slug, name in model.objects.filter(condition).values_list("pk", "slug", name_field):
+            for key in (str(pk), slug, name):
+                cache.setdefault(key, pk)
+        for key in missing:
+            cache.setdefault(key, None)
+
+    # ---------- writing ----------
+    def _fail(self, line_number, errors):
+        self.stats["failed"] += 1
+        if len(self.stats["errors"]) < MAX_REPORTED_ERRORS:
+            self.stats["errors"].append({"line": line_number, "errors": errors})
+
+    def _write_chunk(self, chunk):
+        """chunk: [(line number, fields, images, variants)] of rows that parsed cleanly."""
+        self._resolve(Category, self._categories, {fields["category"] for _, fields, _, _ in chunk}, "name")
+        self._resolve(Brand, self._brands, {fields["brand"] for _, fields, _, _ in chunk}, "name")
+        self._resolve(Store, self._stores, {fields["store"] for _, fields, _, _ in chunk}, "store_name")
+
+        skus = [variant["sku"] for _, _, _, variants in chunk for variant in variants]
+        taken = set(ProductVariant.objects.filter(sku__in=skus).values_list("sku", flat=True)) | self._seen_skus
+
+        rows = []
+        for line_number, fields, images, variants in chunk:
+            errors = {}
+            for reference, lookup in (("category", self._categories), ("brand", self._brands), ("store", self._stores)):
+                if fields[reference] and lookup.get(fields[reference]) is None:
+                    errors[reference] = [f"Unknown {reference}: {fields[reference]}"]
+            row_skus = [variant["sku"] for variant in variants]
+            duplicates = sorted({sku for sku in row_skus if sku in taken or row_skus.count(sku) > 1})
+            if duplicates:
+                errors["variants"] = [f"SKU repeated or already in use: {', '.join(duplicates)}"]
+            if errors:
+                self._fail(line_number, errors)
+                continue
+            taken.update(row_skus)
+            rows.append((line_number, fields, images, variants))
+        if not rows:
+            return
+
+        slugs = allocate_slugs(Product, [fields["title"] for _, fields, _, _ in rows])
+        try:
+            with transaction.atomic():
+                products = Product.objects.bulk_create([
+                    Product(
+                        slug=slug,
+                        category_id=self._categories.get(fields["category"]),
+                        brand_id=self._brands.get(fields["brand"]),
+                        store_id=self._stores.get(fields["store"]) or self.store_id,
+                        **self._summary(fields, variants),
+                        **{key: value for key, value in fields.items() if key not in ("category", "brand", "store")},
+                    )
+                    for slug, (_, fields, _, variants) in zip(slugs, rows)
+                ])
+                gallery = ProductImage.objects.bulk_create([
+                    ProductImage(product=product, image=image)
+                    for product, (_, _, images, _) in zip(products, rows)
+                    for image in images
+                ])
+                variant_count = self._write_variants(products, rows)
+        except Exception as e:
+            logger.exception(f"Product import chunk failed: {str(e)}")
+            for line_number, _, _, _ in rows:
+                self._fail(line_number, {"non_field_errors": [f"Could not be saved: {str(e)}"]})
+            return
+
+        self._seen_skus.update(variant["sku"] for _, _, _, variants in rows for variant in variants)
+        product_ids = [product.pk for product in products]
+        self._created_ids.extend(product_ids)
+        self.stats["created"] += len(products)
+        self.stats["variants"] += variant_count
+        self._after_write(product_ids, variable_ids=[
+            product.pk for product, (_, _, _, variants) in zip(products, rows) if variants
+        ], images=[
+            *((product, "main_image") for product in products if product.main_image),
+            *((image, "image") for image in gallery),
+        ])
+
+    @staticmethod
+    def _summary(fields, variants):
+        """Price / stock summary from the parsed row (default_variant is set once the variants exist)."""
+        summary = PriceSummaryService.summarize(fields, [
+            {"id": index, "price": variant["price"], "discount_price": variant["discount_price"],
+             "stock": variant["stock"], "is_default": variant["is_default"], "created_at": 0}
+            for index, variant in enumerate(variants)
+        ])
+        summary.pop("default_variant_id")
+        return summary
+
+    @staticmethod
+    def _write_variants(products, rows):
+        attributes = ProductAttribute.objects.bulk_create([
+            ProductAttribute(product=product, name=name, is_variation=True)
+            for product, (_, _, _, variants) in zip(products, rows)
+            for name in dict.fromkeys(name for variant in variants for name in variant["attributes"])
+        ])
+        attribute_map = {(attribute.product_id, attribute.name): attribute for attribute in attributes}
+
+        values = ProductAttributeValue.objects.bulk_create([
+            ProductAttributeValue(attribute=attribute_map[(product.pk, name)], value=value)
+            for product, (_, _, _, variants) in zip(products, rows)
+            for name, value in dict.fromkeys(
+                (name, value) for variant in variants for name, value in variant["attributes"].items()
+            )
+        ])
+        value_map = {(value.attribute.product_id, value.attribute.name, value.value): value for value in values}
+
+        pairs = []
+        for product, (_, _, _, variants) in zip(products, rows):
+            default_seen = False
+            for variant in variants:
+                is_default = variant["is_default"] and not default_seen
+                default_seen = default_seen or is_default
+                pairs.append((ProductVariant(
+                    product=product,
+                    sku=variant["sku"],
+                    variant_name=variant["variant_name"][:ProductVariant._meta.get_field("variant_name").max_length],
+                    price=variant["price"],
+                    discount_price=variant["discount_price"],
+                    stock=variant["stock"],
+                    is_default=is_default,
+                ), variant["attributes"]))
+        created = ProductVariant.objects.bulk_create([variant for variant, _ in pairs])
+
+        # the rest of the price summary was computed from the rows before the insert
+        default_variants = {}
+        for variant in created:
+            # the flagged variant, otherwise the first one (same rule as PriceSummaryService)
+            current = default_variants.get(variant.product_id)
+            if current is None or (variant.is_default and not current.is_default):
+                default_variants[variant.product_id] = variant
+        with_default = []
+        for product in products:
+            if product.pk in default_variants:
+                product.default_variant = default_variants[product.pk]
+                with_default.append(product)
+        Product.objects.bulk_update(with_default, ["default_variant"])
+
+        ProductVariantAttribute.objects.bulk_create([
+            ProductVariantAttribute(
+                variant=variant,
+                attribute=attribute_map[(variant.product_id, name)],
+                value=value_map[(variant.product_id, name, value)],
+            )
+            for variant, (_, selection) in zip(created, pairs)
+            for name, value in selection.items()
+        ])
+        return len(created)
+
+    @staticmethod
+    def _after_write(product_ids, variable_ids, images=()):
+        """
+        What the skipped save hooks would have done, once per chunk (price summaries are written
+        with the rows). images: [(instance, image field)] that need derivatives.
+        """
+        from apps.images.services.derivatives import ImageDerivativeService
+        from .search_engine import ProductSearchService
+        from .attribute_facets import AttributeFacetService
+        from .suggest import ProductSuggestService
+        ProductSearchService.index_products(product_ids)
+        ProductSuggestService.index_products(product_ids)
+        if variable_ids:
+            AttributeFacetService.sync_products(variable_ids)
+        for instance, field in images:
+            ImageDerivativeService.schedule(instance, [field])
+
+    # ---------- run ----------
+    def run(self, fileobj, file_format):
+        """Import every row of `fileobj`; returns the stats dict (also passed to `progress` after each chunk)."""
+        chunk = []
+        for line_number, raw in self.iter_rows(fileobj, file_format):
+            self.stats["processed"] += 1
+            if isinstance(raw, Exception):
+                self._fail(line_number, {"non_field_errors": [str(raw)]})
+                continue
+            fields, images, variants, errors = self.parse_row(raw)
+            if errors:
+                self._fail(line_number, errors)
+                continue
+            chunk.append((line_number, fields, images, variants))
+            if len(chunk) >= self.batch_size:
+                self._write_chunk(chunk)
+                chunk = []
+                if self.progress:
+                    self.progress(self.stats)
+        if chunk:
+            self._write_chunk(chunk)
+        self.stats["errors"].sort(key=lambda error: error["line"])
+
+        if self._created_ids:
+            from .facets import ProductFacetService
+            from .home_rails import HomeRailService
+            ProductFacetService.invalidate()
+            HomeRailService.invalidate()
+        if self.progress:
+            self.progress(self.stats)
+        return self.stats
+
+
+class ProductImportJob:
+    """Progress of an API-started import, kept in the cache for the status endpoint."""
+
+    CACHE_PREFIX = "product_import"
+    CACHE_TIMEOUT = 60 * 60 * 24
+
+    @classmethod
+    def cache_key(cls, job_id):
+        return f"{cls.CACHE_PREFIX}:{job_id}"
+
+    @classmethod
+    def get(cls, job_id):
+        return cache.get(cls.cache_key(job_id))
+
+    @classmethod
+    def update(cls, job_id, **state):
+        job = cls.get(job_id) or {"job_id": job_id}
+        job.update(state, updated_at=timezone.now().isoformat())
+        cache.set(cls.cache_key(job_id), job, timeout=cls.CACHE_TIMEOUT)
+        return job
@@ -0,0 +1,86 @@
+import logging
+import re
+import uuid
+
+from django_redis import get_redis_connection
+
+logger = logging.getLogger("myapp")
+
+
+RECENTLY_VIEWED_PREFIX = "recently_viewed"
+# products kept per visitor
+RECENTLY_VIEWED_CAPACITY = 20
+RECENTLY_VIEWED_TTL = 60 * 60 * 24 * 30
+GUEST_COOKIE = "guest_id"
+GUEST_COOKIE_MAX_AGE = RECENTLY_VIEWED_TTL
+
+GUEST_ID_RE = re.compile(r"^[0-9a-f]{32}$")
+
+
+class RecentlyViewedService:
+    """
+    Recently viewed products per visitor, kept in a capped Redis list (newest first).
+
+    Signed-in users are keyed by user id; guests by an opaque `guest_id` cookie that the
+    detail view hands out, so recording a view never creates a session or touches the
+    database. Recording is one MULTI round trip (LREM + LPUSH + LTRIM + EXPIRE), which moves
+    a re-viewed product to the front instead of duplicating it.
+    """
+
+    @staticmethod
+    def visitor(request):
+        """(list owner, guest id to set as cookie or None). The owner is None only for a guest without a cookie."""
+        if request.user and request.user.is_authenticated:
+            return f"u{request.user.id}", None
+        guest_id = request.COOKIES.get(GUEST_COOKIE, "")
+        if GUEST_ID_RE.match(guest_id):
+            return f"g{guest_id}", None
+        return None, None
+
+    @classmethod
+    def visitor_for_write(cls, request):
+        """Like `visitor`, but issues a new guest id for a guest without one."""
+        owner, _ = cls.visitor(request)
+        if owner is not None:
+            return owner, None
+        guest_id = uuid.uuid4().hex
+        return f"g{guest_id}", guest_id
+
+    @staticmethod
+    def set_guest_cookie(response, guest_id):
+        if guest_id:
+            response.set_cookie(GUEST_COOKIE, guest_id, max_age=GUEST_COOKIE_MAX_AGE, httponly=True, samesite="Lax")
+        return response
+
+    @staticmethod
+    def key(owner):
+        return f"{RECENTLY_VIEWED_PREFIX}:{owner}"
+
+    @classmethod
+    def record(cls, owner, product_id):
+        try:
+            key = cls.key(owner)
+            pipe = get_redis_connection("default").pipeline(transaction=True)
+            pipe.lrem(key, 0, product_id)
+            pipe.lpush(key, product_id)
+            pipe.ltrim(key, 0, RECENTLY_VIEWED_CAPACITY - 1)
+            pipe.expire(key, RECENTLY_VIEWED_TTL)
+            pipe.execute()
+        except Exception as e:
+            # history is best effort; the detail page must not fail or fall back to the database
+            logger.warning(f"Recently viewed record failed: {str(e)}")
+
+    @classmethod
+    def product_ids(cls, owner, limit=RECENTLY_VIEWED_CAPACITY):
+        if owner is None:
+            return []
+        try:
+            return [int(product_id) for product_id in get_redis_connection("default").lrange(cls.key(owner), 0, limit - 1)]
+        except Exception as e:
+            logger.warning(f"Recently viewed read failed: {str(e)}")
+            return []
+
+    @classmethod
+    def clear(cls, owner):
+        if owner is not None:
+            get_redis_connection("default").delete(cls.key(owner))
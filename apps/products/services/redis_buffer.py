@@ -0,0 +1,40 @@
+import uuid
+
+from django_redis import get_redis_connection
+
+
+def _text(value):
+    return value.decode() if isinstance(value, bytes) else value
+
+
+def drain_hash(pending_key, write, lock_timeout=60 * 10):
+    """
+    Flush a Redis hash of buffered counters into the database.
+
+    The hash is RENAMEd to a snapshot key first, so producers keep incrementing a fresh
+    hash while `write({field: int})` runs; the snapshot is deleted only after `write`
+    returns. Snapshots left behind by a failed run are retried on the next one, and a
+    lock keeps two workers from writing the same snapshot twice.
+    Returns the sum of `write` results, or 0 when another flush holds the lock.
+    """
+    conn = get_redis_connection("default")
+    lock_key = f"{pending_key}:flush_lock"
+    snapshot_prefix = f"{pending_key}:flushing:"
+    if not conn.set(lock_key, 1, nx=True, ex=lock_timeout):
+        return 0
+    try:
+        snapshots = [_text(key) for key in conn.scan_iter(f"{snapshot_prefix}*")]
+        if conn.exists(pending_key):
+            snapshot = f"{snapshot_prefix}{uuid.uuid4().hex}"
+            conn.rename(pending_key, snapshot)
+            snapshots.append(snapshot)
+
+        written = 0
+        for snapshot in snapshots:
+            pending = {_text(field): int(count) for field, count in conn.hgetall(snapshot).items()}
+            if pending:
+                written += write(pending)
+            conn.delete(snapshot)
+        return written
+    finally:
+        conn.delete(lock_key)
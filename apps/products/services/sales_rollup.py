@@ -0,0 +1,224 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Max, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from apps.orders.models import Order, OrderItem
+from ..models import Product, ProductSalesDaily, ProductSalesOrder, ProductSalesRollup
+
+
+# orders counted as sold (same rule the best-seller rail always used)
+SOLD_ORDER_STATUSES = ("confirmed", "completed", "delivered")
+SALES_WINDOWS = {"7d": 7, "30d": 30, "all": None}
+ZERO = Decimal("0.00")
+
+
+class SalesRollupService:
+    """
+    Maintain ProductSalesDaily / ProductSalesRollup from paid orders.
+
+    Orders are consumed incrementally from a high-water mark on Order.updated_at, so each
+    run only reads orders changed since the previous one. ProductSalesOrder records which
+    orders are currently counted, which makes re-reading an order harmless and lets
+    cancelled / refunded orders be subtracted again. Windowed totals are then recomputed
+    from the daily buckets for the touched products and for products with recent sales.
+    """
+
+    WATERMARK_KEY = "sales_rollup:watermark"
+    LOCK_KEY = "sales_rollup:lock"
+    LOCK_TIMEOUT = 60 * 30
+    # re-read a little before the mark so late-committing order updates are not missed
+    WATERMARK_OVERLAP = timedelta(minutes=5)
+
+    # ---------- ingestion ----------
+    @classmethod
+    def _watermark(cls):
+        value = cache.get(cls.WATERMARK_KEY)
+        if value:
+            return parse_datetime(value)
+        # cache lost: the newest counted order is a safe (earlier) mark
+        return ProductSalesOrder.objects.aggregate(mark=Max("order_updated_at"))["mark"]
+
+    @staticmethod
+    def _apply(order_ids, sign):
+        """Add (sign=1) or remove (sign=-1) the items of `order_ids` from the daily buckets."""
+        if not order_ids:
+            return set()
+        rows = (
+            OrderItem.objects.filter(order_id__in=order_ids, product__isnull=False)
+            .annotate(day=TruncDate("order__created_at"))
+            .values("product_id", "day")
+            .annotate(quantity=Sum("quantity"), revenue=Sum("subtotal"))
+            .order_by()
+        )
+        deltas = {(row["product_id"], row["day"]): row for row in rows}
+        if not deltas:
+            return set()
+
+        product_ids = {product_id for product_id, _ in deltas}
+        existing = {
+            (daily.product_id, daily.date): daily
+            for daily in ProductSalesDaily.objects.filter(
+                product_id__in=product_ids, date__in={day for _, day in deltas}
+            )
+        }
+        to_update, to_create = [], []
+        for key, row in deltas.items():
+            quantity = sign * (row["quantity"] or 0)
+            revenue = sign * (row["revenue"] or ZERO)
+            daily = existing.get(key)
+            if daily is None:
+                to_create.append(ProductSalesDaily(product_id=key[0], date=key[1], quantity=quantity, revenue=revenue))
+            else:
+                daily.quantity += quantity
+                daily.revenue += revenue
+                to_update.append(daily)
+        ProductSalesDaily.objects.bulk_update(to_update, ["quantity", "revenue"])
+        ProductSalesDaily.objects.bulk_create(to_create)
+        return product_ids
+
+    @classmethod
+    def _ingest_chunk(cls, chunk):
+        order_ids = [order["id"] for order in chunk]
+        counted = dict(ProductSalesOrder.objects.filter(order_id__in=order_ids).values_list("order_id", "counted"))
+
+        added, removed, marks = [], [], []
+        for order in chunk:
+            sold = order["payment_status"] == "paid" and order["status"] in SOLD_ORDER_STATUSES
+            if sold == counted.get(order["id"], False):
+                continue
+            (added if sold else removed).append(order["id"])
+            marks.append(ProductSalesOrder(order_id=order["id"], counted=sold, order_updated_at=order["updated_at"]))
+
+        with transaction.atomic():
+            touched = cls._apply(added, 1) | cls._apply(removed, -1)
+            ProductSalesOrder.objects.bulk_create(
+                marks, update_conflicts=True, unique_fields=["order"], update_fields=["counted", "order_updated_at"]
+            )
+        return len(marks), touched
+
+    @classmethod
+    def ingest(cls, batch_size=1000):
+        """Consume orders changed since the high-water mark. Returns (orders counted or uncounted, touched product ids)."""
+        watermark = cls._watermark()
+        orders = Order.objects.all()
+        if watermark is not None:
+            orders = orders.filter(updated_at__gte=watermark - cls.WATERMARK_OVERLAP)
+        orders = orders.order_by("updated_at", "id").values("id", "updated_at", "payment_status", "status")
+
+        processed, touched, last = 0, set(), None
+        while True:
+            page = orders
+            if last is not None:
+                # keyset walk over the (updated_at, id) index
+                page = page.filter(Q(updated_at__gt=last["updated_at"]) | Q(updated_at=last["updated_at"], id__gt=last["id"]))
+            chunk = list(page[:batch_size])
+            if not chunk:
+                break
+            count, products = cls._ingest_chunk(chunk)
+            processed, touched, last = processed + count, touched | products, chunk[-1]
+
+        if last is not None:
+            cache.set(cls.WATERMARK_KEY, last["updated_at"].isoformat(), timeout=None)
+        return processed, touched
+
+    # ---------- windows ----------
+    @staticmethod
+    def refresh_windows(product_ids=(), batch_size=1000):
+        """
+        Recompute the rollup rows of `product_ids` plus every product with sales in the
+        30 day window (those totals move as days pass). Returns the number of rows written.
+        """
+        today = timezone.localdate()
+        since_7d = today - timedelta(days=SALES_WINDOWS["7d"] - 1)
+        since_30d = today - timedelta(days=SALES_WINDOWS["30d"] - 1)
+
+        targets = set(product_ids) | set(
+            ProductSalesRollup.objects.filter(Q(quantity_7d__gt=0) | Q(quantity_30d__gt=0))
+            .values_list("product_id", flat=True)
+        ) | set(
+            ProductSalesDaily.objects.filter(date__gte=since_30d).values_list("product_id", flat=True).distinct()
+        )
+        targets = sorted(targets)
+
+        fields = [
+            "category", "store", "quantity_7d", "quantity_30d", "quantity_all", "revenue_7d", "revenue_30d", "revenue_all",
+            "updated_at",
+        ]
+        written = 0
+        for i in range(0, len(targets), batch_size):
+            chunk = targets[i:i + batch_size]
+            totals = {
+                row["product_id"]: row
+                for row in ProductSalesDaily.objects.filter(product_id__in=chunk)
+                .values("product_id")
+                .annotate(
+                    quantity_all=Sum("quantity"),
+                    revenue_all=Sum("revenue"),
+                    quantity_30d=Sum("quantity", filter=Q(date__gte=since_30d)),
+                    revenue_30d=Sum("revenue", filter=Q(date__gte=since_30d)),
+                    quantity_7d=Sum("quantity", filter=Q(date__gte=since_7d)),
+                    revenue_7d=Sum("revenue", filter=Q(date__gte=since_7d)),
+                )
+                .order_by()
+            }
+            batch = []
+            for product in Product.objects.filter(pk__in=chunk).values("id", "category_id", "store_id"):
+                row = totals.get(product["id"], {})
+                batch.append(ProductSalesRollup(
+                    product_id=product["id"],
+                    category_id=product["category_id"],
+                    store_id=product["store_id"],
+                    **{
+                        f"{measure}_{window}": row.get(f"{measure}_{window}") or (0 if measure == "quantity" else ZERO)
+                        for measure in ("quantity", "revenue")
+                        for window in SALES_WINDOWS
+                    },
+                ))
+            ProductSalesRollup.objects.bulk_create(
+                batch, update_conflicts=True, unique_fields=["product"], update_fields=fields
+            )
+            written += len(batch)
+        return written
+
+    @classmethod
+    def run(cls, batch_size=1000):
+        from .home_rails import HomeRailService
+
+        # one run at a time, the ledger check and the bucket update are not atomic across runs
+        if not cache.add(cls.LOCK_KEY, 1, timeout=cls.LOCK_TIMEOUT):
+            return {"orders": 0, "products": 0, "skipped": True}
+        try:
+            processed, touched = cls.ingest(batch_size=batch_size)
+            written = cls.refresh_windows(touched, batch_size=batch_size)
+        finally:
+            cache.delete(cls.LOCK_KEY)
+        if processed or written:
+            HomeRailService.invalidate(["best_selling"])
+        return {"orders": processed, "products": written}
+
+    @staticmethod
+    def sync_dimensions(product, update_fields=None):
+        """Keep the copied category / store of a rollup row in step with its product."""
+        if update_fields is not None and not {"category", "store"}.intersection(update_fields):
+            return
+        ProductSalesRollup.objects.filter(product_id=product.pk).update(
+            category_id=product.category_id, store_id=product.store_id
+        )
+
+    # ---------- reads ----------
+    @staticmethod
+    def top(window="all", category_id=None, store_id=None, limit=16):
+        """[(product_id, quantity)] of the best sellers, read from the rollup indexes."""
+        field = f"quantity_{window}"
+        rollups = ProductSalesRollup.objects.filter(**{f"{field}__gt": 0}, product__status="published")
+        if category_id:
+            rollups = rollups.filter(category_id=category_id)
+        if store_id:
+            rollups = rollups.filter(store_id=store_id)
+        return list(rollups.order_by(f"-{field}", "product_id").values_list("product_id", field)[:limit])
@@ -0,0 +1,250 @@
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db.models import Count, F, Q, Sum, Window
+from django.db.models.functions import RowNumber
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from apps.catalog.models import Brand, BrandAnalytics, Category, CategoryAnalytics
+from apps.orders.models import OrderItem
+from apps.review.models import Review
+from apps.stores.models import Store, StoreAnalytics
+from .sales_rollup import SalesRollupService
+from ..models import Product, ProductAnalytics, ProductSalesOrder
+
+
+ZERO = Decimal("0.00")
+SCOPES = ("category", "brand", "store")
+
+
+class ScopeAnalyticsService:
+    """
+    Keep CategoryAnalytics, BrandAnalytics and StoreAnalytics current.
+
+    Each run finds the products whose counters may have moved since the high-water mark
+    (product edits and publishes, reviews, buffered view / event days, and orders already
+    ingested by SalesRollupService) and recomputes only the category, brand and store rows
+    they belong to, from the per-product counters that are already maintained
+    (view_count, rating histogram, ProductSalesRollup). A category also counts the
+    products of its subcategories. A full run recomputes every row; it is scheduled
+    nightly to catch what deltas cannot see (deleted products, products moved out of a scope).
+    Dashboards read one analytics row per scope.
+    """
+
+    WATERMARK_KEY = "scope_analytics:watermark"
+    LOCK_KEY = "scope_analytics:lock"
+    LOCK_TIMEOUT = 60 * 60
+    # re-read a little before the mark so late-committing updates are not missed
+    WATERMARK_OVERLAP = timedelta(minutes=5)
+
+    # ---------- change detection ----------
+    @classmethod
+    def _marks(cls):
+        marks = cache.get(cls.WATERMARK_KEY) or {}
+        return {name: parse_datetime(value) for name, value in marks.items() if value}
+
+    @classmethod
+    def changed_scopes(cls, since, orders_since, orders_until, batch_size=1000):
+        """{scope: ids} touched by changes after `since`, and by orders in (`orders_since`, `orders_until`]."""
+        since = since - cls.WATERMARK_OVERLAP
+        product_ids = set(Product.objects.filter(updated_at__gte=since).values_list("id", flat=True))
+        product_ids.update(
+            Review.objects.filter(updated_at__gte=since, product__isnull=False).values_list("product_id", flat=True)
+        )
+        # views and cart / wishlist events are folded into ProductAnalytics per day
+        product_ids.update(
+            ProductAnalytics.objects.filter(date__gte=timezone.localdate(since)).values_list("product_id", flat=True).distinct()
+        )
+
+        scopes = {scope: set() for scope in SCOPES}
+        if orders_until is not None:
+            # only orders the sales rollup has already consumed, so the sold totals below are current
+            items = OrderItem.objects.filter(order__updated_at__lte=orders_until)
+            if orders_since is not None:
+                items = items.filter(order__updated_at__gte=orders_since - cls.WATERMARK_OVERLAP)
+            for product_id, store_id in items.values_list("product_id", "store_id").distinct():
+                if product_id:
+                    product_ids.add(product_id)
+                if store_id:
+                    scopes["store"].add(store_id)
+
+        product_ids = sorted(product_ids)
+        for i in range(0, len(product_ids), batch_size):
+            for dimensions in Product.objects.filter(pk__in=product_ids[i:i + batch_size]).values_list(
+                "category_id", "brand_id", "store_id"
+            ):
+                for scope, scope_id in zip(SCOPES, dimensions):
+                    if scope_id:
+                        scopes[scope].add(scope_id)
+
+        # a category's counters include its subcategories, so its ancestors move with it
+        for path in Category.objects.filter(pk__in=scopes["category"]).values_list("path", flat=True):
+            scopes["category"].update(int(segment) for segment in path.split("/")[:-1])
+        return scopes
+
+    @staticmethod
+    def all_scopes():
+        return {
+            "category": set(Category.objects.values_list("id", flat=True)),
+            "brand": set(Brand.objects.values_list("id", flat=True)),
+            "store": set(Store.objects.values_list("id", flat=True)),
+        }
+
+    # ---------- aggregation ----------
+    @staticmethod
+    def _product_totals(scope, scope_ids):
+        """{scope id: counters} summed over the products directly in each scope."""
+        rating_points = sum(F(f"rating_{star}_count") * star for star in range(1, 6))
+        totals = {
+            row[f"{scope}_id"]: row
+            for row in Product.objects.filter(**{f"{scope}_id__in": scope_ids})
+            .values(f"{scope}_id")
+            .annotate(
+                products_count=Count("id", filter=Q(status="published")),
+                views_count=Sum("view_count"),
+                total_sold=Sum("sales_rollup__quantity_all"),
+                total_revenue=Sum("sales_rollup__revenue_all"),
+                total_reviews=Sum("total_reviews"),
+                rating_points=Sum(rating_points),
+            )
+            .order_by()
+        }
+        # best seller per scope: (product id, quantity sold)
+        top = Product.objects.filter(
+            **{f"{scope}_id__in": scope_ids}, status="published", sales_rollup__quantity_all__gt=0
+        ).annotate(rank=Window(
+            RowNumber(), partition_by=[F(f"{scope}_id")], order_by=[F("sales_rollup__quantity_all").desc(), F("id").asc()]
+        )).filter(rank=1).values_list(f"{scope}_id", "id", "sales_rollup__quantity_all")
+        for scope_id, product_id, quantity in top:
+            totals[scope_id]["top_product"] = (product_id, quantity)
+        return totals
+
+    @staticmethod
+    def _combine(rows):
+        """Add up per-scope counter rows (a category and its subcategories)."""
+        rows = list(rows)
+        combined = {"products_count": 0, "views_count": 0, "total_sold": 0, "total_revenue": ZERO,
+                    "total_reviews": 0, "rating_points": 0, "top_product": None}
+        for row in rows:
+            for field in ("products_count", "views_count", "total_sold", "total_revenue", "total_reviews", "rating_points"):
+                combined[field] += row.get(field) or 0
+        # most sold wins, the lower product id on a tie (same order as the window query)
+        tops = [row["top_product"] for row in rows if row.get("top_product")]
+        if tops:
+            combined["top_product"] = max(tops, key=lambda top: (top[1], -top[0]))
+        reviews = combined["total_reviews"]
+        combined["avg_rating"] = (
+            (Decimal(combined["rating_points"]) / reviews).quantize(Decimal("0.01")) if reviews else ZERO
+        )
+        return combined
+
+    @classmethod
+    def _category_totals(cls, category_ids):
+        """Counters of each category including all of its subcategories, via the materialized paths."""
+        members = defaultdict(list)
+        for category_id, path in Category.objects.values_list("id", "path"):
+            for segment in path.split("/")[:-1]:
+                if int(segment) in category_ids:
+                    members[int(segment)].append(category_id)
+        direct = cls._product_totals("category", {member for ids in members.values() for member in ids})
+        return {
+            category_id: cls._combine(direct.get(member, {}) for member in members.get(category_id, [category_id]))
+            for category_id in category_ids
+        }
+
+    @classmethod
+    def _scope_totals(cls, scope, scope_ids):
+        if scope == "category":
+            return cls._category_totals(set(scope_ids))
+        direct = cls._product_totals(scope, scope_ids)
+        return {scope_id: cls._combine([direct.get(scope_id, {})]) for scope_id in scope_ids}
+
+    @staticmethod
+    def _store_orders(store_ids):
+        """Paid orders per store, from the orders the sales rollup counts as sold."""
+        return dict(
+            OrderItem.objects.filter(
+                store_id__in=store_ids,
+                order_id__in=ProductSalesOrder.objects.filter(counted=True).values("order_id"),
+            ).values("store_id").annotate(orders=Count("order_id", distinct=True)).values_list("store_id", "orders").order_by()
+        )
+
+    @classmethod
+    def refresh(cls, scopes, batch_size=1000):
+        """Recompute the analytics rows of {scope: ids}. Returns the number of rows written."""
+        written = 0
+        catalog_fields = ["views_count", "products_count", "total_sold", "avg_rating", "top_product_id", "updated_at"]
+
+        for scope, model in (("category", CategoryAnalytics), ("brand", BrandAnalytics)):
+            ids = sorted(scopes.get(scope, ()))
+            for i in range(0, len(ids), batch_size):
+                totals = cls._scope_totals(scope, ids[i:i + batch_size])
+                rows = [
+                    model(**{
+                        f"{scope}_id": scope_id,
+                        "views_count": row["views_count"],
+                        "products_count": row["products_count"],
+                        "total_sold": row["total_sold"],
+                        "avg_rating": row["avg_rating"],
+                        "top_product_id": row["top_product"][0] if row["top_product"] else None,
+                    })
+                    for scope_id, row in totals.items()
+                ]
+                model.objects.bulk_create(rows, update_conflicts=True, unique_fields=[scope], update_fields=catalog_fields)
+                written += len(rows)
+
+        ids = sorted(scopes.get("store", ()))
+        store_fields = [
+            "views_count", "products_count", "orders_count", "total_sold_quantity", "total_revenue",
+            "average_rating", "total_reviews", "updated_at",
+        ]
+        for i in range(0, len(ids), batch_size):
+            chunk = ids[i:i + batch_size]
+            totals = cls._scope_totals("store", chunk)
+            orders = cls._store_orders(chunk)
+            rows = [
+                StoreAnalytics(
+                    store_id=store_id,
+                    views_count=row["views_count"],
+                    products_count=row["products_count"],
+                    orders_count=orders.get(store_id, 0),
+                    total_sold_quantity=row["total_sold"],
+                    total_revenue=row["total_revenue"],
+                    average_rating=row["avg_rating"],
+                    total_reviews=row["total_reviews"],
+                )
+                for store_id, row in totals.items()
+            ]
+            StoreAnalytics.objects.bulk_create(rows, update_conflicts=True, unique_fields=["store"], update_fields=store_fields)
+            written += len(rows)
+        return written
+
+    @classmethod
+    def run(cls, full=False, batch_size=1000):
+        # one run at a time; a full run and a delta run would race on the marks
+        if not cache.add(cls.LOCK_KEY, 1, timeout=cls.LOCK_TIMEOUT):
+            return {"rows": 0, "skipped": True}
+        try:
+            now = timezone.now()
+            marks = cls._marks()
+            # order deltas stop at the sales rollup's mark, the newest order reflected in ProductSalesRollup
+            sales_mark = cache.get(SalesRollupService.WATERMARK_KEY)
+            orders_until = parse_datetime(sales_mark) if sales_mark else None
+
+            if full or "changes" not in marks:
+                scopes = cls.all_scopes()
+            else:
+                scopes = cls.changed_scopes(marks["changes"], marks.get("orders"), orders_until, batch_size=batch_size)
+            written = cls.refresh(scopes, batch_size=batch_size)
+
+            orders_mark = orders_until or marks.get("orders")
+            cache.set(cls.WATERMARK_KEY, {
+                "changes": now.isoformat(),
+                "orders": orders_mark.isoformat() if orders_mark else None,
+            }, timeout=None)
+        finally:
+            cache.delete(cls.LOCK_KEY)
+        return {"rows": written, "full": full or "changes" not in marks}
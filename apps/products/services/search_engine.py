@@ -0,0 +1,213 @@
+import re
+import threading
+from bisect import bisect_left
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector, TrigramSimilarity
+from django.db import connection
+from django.db.models import Case, Count, F, FloatField, Max, Q, Value, When
+from django.db.models.functions import Coalesce
+from django.utils.html import strip_tags
+
+from ..models import Product, ProductSearchDocument
+
+
+SEARCH_CONFIG = "english"
+TRIGRAM_THRESHOLD = 0.3
+FALLBACK_RESULT_LIMIT = 1000
+
+# field weights used by the in-process fallback index (mirrors A/B/C on PostgreSQL)
+FIELD_WEIGHTS = {"title": 4.0, "keywords": 2.0, "body": 1.0}
+
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(text):
+    return TOKEN_RE.findall((text or "").lower())
+
+
+def is_postgres():
+    return connection.vendor == "postgresql"
+
+
+class InMemorySearchIndex:
+    """
+    Inverted index used when the database is not PostgreSQL (SQLite dev).
+    Rebuilt lazily whenever the document table changes.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stamp = None
+        self._postings = {}
+        self._vocabulary = []
+
+    def _current_stamp(self):
+        stats = ProductSearchDocument.objects.aggregate(total=Count("pk"), last_update=Max("updated_at"))
+        return stats["total"], stats["last_update"]
+
+    def _rebuild(self, stamp):
+        postings = {}
+        rows = ProductSearchDocument.objects.values_list("product_id", "title", "keywords", "body")
+        for product_id, title, keywords, body in rows.iterator(chunk_size=2000):
+            for field, text in (("title", title), ("keywords", keywords), ("body", body)):
+                weight = FIELD_WEIGHTS[field]
+                for token in tokenize(text):
+                    scores = postings.setdefault(token, {})
+                    scores[product_id] = scores.get(product_id, 0.0) + weight
+        self._postings = postings
+        self._vocabulary = sorted(postings)
+        self._stamp = stamp
+
+    def _refresh(self):
+        stamp = self._current_stamp()
+        if stamp != self._stamp:
+            with self._lock:
+                if stamp != self._stamp:
+                    self._rebuild(stamp)
+
+    def _matches(self, token, prefix=False):
+        if not prefix:
+            return self._postings.get(token, {})
+        merged = {}
+        start = bisect_left(self._vocabulary, token)
+        for word in self._vocabulary[start:]:
+            if not word.startswith(token):
+                break
+            for product_id, score in self._postings[word].items():
+                merged[product_id] = merged.get(product_id, 0.0) + score
+        return merged
+
+    def search(self, term, limit=FALLBACK_RESULT_LIMIT):
+        """Return [(product_id, score)] matching every token, the last one as a prefix."""
+        tokens = tokenize(term)
+        if not tokens:
+            return []
+        self._refresh()
+
+        scores = None
+        for position, token in enumerate(tokens):
+            matches = self._matches(token, prefix=position == len(tokens) - 1)
+            if scores is None:
+                scores = dict(matches)
+            else:
+                scores = {pid: score + matches[pid] for pid, score in scores.items() if pid in matches}
+            if not scores:
+                return []
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        return ranked[:limit]
+
+
+fallback_index = InMemorySearchIndex()
+
+
+class ProductSearchService:
+    """Maintain ProductSearchDocument rows and run ranked product search"""
+
+    # Product fields that feed the search document
+    INDEXED_FIELDS = {"title", "description", "specification", "brand", "category", "store"}
+
+    @staticmethod
+    def build_document(product):
+        keywords = [
+            product.brand.name if product.brand_id else "",
+            product.category.name if product.category_id else "",
+            product.store.store_name if product.store_id else "",
+        ]
+        body = [strip_tags(product.description or ""), strip_tags(product.specification or "")]
+        return {
+            "title": product.title or "",
+            "keywords": " ".join(k for k in keywords if k),
+            "body": " ".join(b for b in body if b),
+        }
+
+    @staticmethod
+    def _update_vectors(product_ids):
+        if not is_postgres() or not product_ids:
+            return
+        ProductSearchDocument.objects.filter(product_id__in=product_ids).update(
+            search_vector=(
+                SearchVector("title", weight="A", config=SEARCH_CONFIG)
+                + SearchVector("keywords", weight="B", config=SEARCH_CONFIG)
+                + SearchVector("body", weight="C", config=SEARCH_CONFIG)
+            )
+        )
+
+    @classmethod
+    def index_product(cls, product, update_fields=None):
+        """Create or refresh the search document of a single product."""
+        if update_fields is not None and not cls.INDEXED_FIELDS.intersection(update_fields):
+            return
+        ProductSearchDocument.objects.update_or_create(
+            product_id=product.pk,
+            defaults=cls.build_document(product),
+        )
+        cls._update_vectors([product.pk])
+
+    @classmethod
+    def index_products(cls, product_ids=None, batch_size=500):
+        """
+        Rebuild documents in batches. `product_ids=None` reindexes the whole catalog.
+        Returns the number of documents written.
+        """
+        queryset = Product.objects.select_related("brand", "category", "store").only(
+            "id", "title", "description", "specification",
+            "brand__name", "category__name", "store__store_name",
+        ).order_by("id")
+        if product_ids is not None:
+            queryset = queryset.filter(id__in=list(product_ids))
+
+        written = 0
+        batch = []
+        for product in queryset.iterator(chunk_size=batch_size):
+            batch.append(ProductSearchDocument(product_id=product.pk, **cls.build_document(product)))
+            if len(batch) >= batch_size:
+                written += cls._write_batch(batch)
+                batch = []
+        if batch:
+            written += cls._write_batch(batch)
+        return written
+
+    @classmethod
+    def _write_batch(cls, documents):
+        ProductSearchDocument.objects.bulk_create(
+            documents,
+            update_conflicts=True,
+            unique_fields=["product"],
+            update_fields=["title", "keywords", "body", "updated_at"],
+        )
+        cls._update_vectors([doc.product_id for doc in documents])
+        return len(documents)
+
+    @staticmethod
+    def search(queryset, term):
+        """
+        Filter `queryset` to products matching `term` and annotate `search_rank`.
+        Callers order by `-search_rank` to get relevance ordering.
+        """
+        term = (term or "").strip()
+        if not term:
+            return queryset
+
+        if is_postgres():
+            query = SearchQuery(term, search_type="websearch", config=SEARCH_CONFIG)
+            return queryset.filter(
+                Q(search_document__search_vector=query)
+                | Q(search_document__title__trigram_similar=term)
+            ).annotate(
+                search_rank=(
+                    Coalesce(SearchRank(F("search_document__search_vector"), query), Value(0.0))
+                    + Coalesce(TrigramSimilarity("search_document__title", term), Value(0.0))
+                )
+            )
+
+        ranked = fallback_index.search(term)
+        if not ranked:
+            return queryset.none()
+        return queryset.filter(id__in=[pid for pid, _ in ranked]).annotate(
+            search_rank=Case(
+                *[When(id=pid, then=Value(score)) for pid, score in ranked],
+                default=Value(0.0),
+                output_field=FloatField(),
+            )
+        )
@@ -0,0 +1,293 @@
+import json
+import logging
+import re
+
+from django.db import transaction
+from django.db.models import Count, F, IntegerField, Q, Value
+from django.db.models.functions import Coalesce
+from django_redis import get_redis_connection
+
+from apps.catalog.models import Brand, Category
+from ..models import Product
+
+logger = logging.getLogger("myapp")
+
+
+# the hash tag keeps every suggest key in one Redis Cluster slot, so the lookup script may touch them together
+SUGGEST_PREFIX = "{suggest}"
+GENERATION_KEY = f"{SUGGEST_PREFIX}:generation"
+SUGGEST_KINDS = {"product": "p", "brand": "b", "category": "c"}
+# prefixes are indexed from this many characters up to MAX_PREFIX_LENGTH
+MIN_PREFIX_LENGTH = 2
+MAX_PREFIX_LENGTH = 20
+# a label is also completable from each of its first words ("galaxy s24" in "samsung galaxy s24")
+MAX_WORD_STARTS = 5
+# best-scored members kept per prefix set; the periodic rebuild restores anything trimmed
+PREFIX_CAPACITY = 50
+# completions returned per request (products; brands and categories get half)
+SUGGEST_DEFAULT_LIMIT = 6
+SUGGEST_MAX_LIMIT = 10
+# one unit sold weighs as much as this many views
+SALES_WEIGHT = 10
+
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+# one round trip: the top members of every kind's prefix set and their payloads.
+# KEYS: generation, items hash, one prefix set per kind; ARGV: the generation the keys were
+# built for, then one limit per kind. Returns nil when a rebuild switched generation meanwhile.
+SUGGEST_SCRIPT = """
+if (redis.call('GET', KEYS[1]) or '0') ~= ARGV[1] then
+    return false
+end
+local result = {}
+for i = 3, #KEYS do
+    local members = redis.call('ZREVRANGE', KEYS[i], 0, tonumber(ARGV[i - 1]) - 1)
+    if #members > 0 then
+        result[#result + 1] = redis.call('HMGET', KEYS[2], unpack(members))
+    else
+        result[#result + 1] = {}
+    end
+end
+return result
+"""
+
+
+def normalize(text):
+    return " ".join(TOKEN_RE.findall(str(text or "").lower()))
+
+
+def prefixes(label):
+    """Every indexed prefix of a label: of the whole phrase and of the phrase from each of its first words."""
+    words = normalize(label).split(" ")
+    result = set()
+    for start in range(min(len(words), MAX_WORD_STARTS)):
+        phrase = " ".join(words[start:])
+        for length in range(MIN_PREFIX_LENGTH, min(len(phrase), MAX_PREFIX_LENGTH) + 1):
+            result.add(phrase[:length].rstrip())
+    result.discard("")
+    return result
+
+
+class ProductSuggestService:
+    """
+    Typeahead over product titles, brand names and category names, served from Redis.
+
+    Every prefix of a label (and of the label from each of its first words) is a sorted set
+    "{suggest}:<generation>:<kind>:<prefix>" of members like "p:12" scored by popularity
+    (views plus weighted 30 day sales for products, published product count for brands and
+    categories), trimmed to PREFIX_CAPACITY. Display payloads live in one hash. A lookup is
+    a single Lua call; the database is never read on the request path.
+
+    Products are (re)indexed after commit when saved published and removed otherwise;
+    `rebuild` writes a fresh generation and switches to it, so scores are refreshed without
+    a window of empty results.
+    """
+
+    # Product fields shown in or ranking a suggestion
+    SOURCE_FIELDS = {"title", "slug", "status", "main_image"}
+
+    # ---------- keys ----------
+    @staticmethod
+    def _generation(conn):
+        return int(conn.get(GENERATION_KEY) or 0)
+
+    @staticmethod
+    def _set_key(generation, kind, prefix):
+        return f"{SUGGEST_PREFIX}:{generation}:{kind}:{prefix}"
+
+    @staticmethod
+    def _items_key(generation):
+        return f"{SUGGEST_PREFIX}:{generation}:items"
+
+    # ---------- lookup ----------
+    @classmethod
+    def suggest(cls, term, limits):
+        """
+        {"product": [...], "brand": [...], "category": [...]} completions of `term`;
+        limits: {kind: count}. Empty lists when the term is too short or Redis is down.
+        """
+        prefix = normalize(term)[:MAX_PREFIX_LENGTH].rstrip()
+        result = {kind: [] for kind in limits}
+        if len(prefix) < MIN_PREFIX_LENGTH:
+            return result
+        try:
+            conn = get_redis_connection("default")
+            payloads = None
+            # a rebuild may switch generation between the read and the script; retry once
+            for _ in range(2):
+                generation = cls._generation(conn)
+                keys = [GENERATION_KEY, cls._items_key(generation)]
+                keys.extend(cls._set_key(generation, kind, prefix) for kind in limits)
+                payloads = conn.eval(SUGGEST_SCRIPT, len(keys), *keys, generation, *limits.values())
+                if payloads is not None:
+                    break
+        except Exception as e:
+            logger.warning(f"Suggest lookup failed: {str(e)}")
+            return result
+        if payloads is None:
+            return result
+        for kind, items in zip(limits, payloads):
+            result[kind] = [json.loads(item) for item in items if item]
+        return result
+
+    # ---------- documents ----------
+    @staticmethod
+    def _product_queryset():
+        return Product.objects.filter(status="published").annotate(
+            score=F("view_count") + Coalesce(F("sales_rollup__quantity_30d"), Value(0), output_field=IntegerField()) * SALES_WEIGHT
+        ).only("id", "title", "slug", "main_image", "view_count")
+
+    @staticmethod
+    def _product_entry(product):
+        return "product", f"p:{product.pk}", product.title, product.score, {
+            "id": product.pk,
+            "title": product.title,
+            "slug": product.slug,
+            "image": product.main_image.url if product.main_image else None,
+        }
+
+    @staticmethod
+    def _catalog_queryset(model):
+        relation = "products" if model is Category else "product"
+        queryset = model.objects.annotate(score=Count(relation, filter=Q(**{f"{relation}__status": "published"})))
+        if model is Category:
+            queryset = queryset.filter(is_active=True)
+        return queryset.only("id", "name", "slug")
+
+    @staticmethod
+    def _catalog_entry(instance):
+        kind = "category" if isinstance(instance, Category) else "brand"
+        return kind, f"{SUGGEST_KINDS[kind]}:{instance.pk}", instance.name, instance.score, {
+            "id": instance.pk,
+            "name": instance.name,
+            "slug": instance.slug,
+        }
+
+    # ---------- writing ----------
+    @staticmethod
+    def _write(pipe, generation, entries, previous=None):
+        """
+        Queue entries [(kind, member, label, score, payload)] on a pipeline; `previous`
+        ({member: stored payload}) lets a renamed label drop the prefixes it no longer has.
+        """
+        items_key = ProductSuggestService._items_key(generation)
+        for kind, member, label, score, payload in entries:
+            new_prefixes = prefixes(label)
+            if previous and previous.get(member):
+                old = json.loads(previous[member])
+                for prefix in prefixes(old.get("title") or old.get("name")) - new_prefixes:
+                    pipe.zrem(ProductSuggestService._set_key(generation, kind, prefix), member)
+            for prefix in new_prefixes:
+                key = ProductSuggestService._set_key(generation, kind, prefix)
+                pipe.zadd(key, {member: score})
+                pipe.zremrangebyrank(key, 0, -PREFIX_CAPACITY - 1)
+            pipe.hset(items_key, member, json.dumps(payload))
+        return pipe
+
+    @staticmethod
+    def _remove(conn, generation, kind, member):
+        items_key = ProductSuggestService._items_key(generation)
+        stored = conn.hget(items_key, member)
+        if not stored:
+            return
+        stored = json.loads(stored)
+        pipe = conn.pipeline(transaction=False)
+        for prefix in prefixes(stored.get("title") or stored.get("name")):
+            pipe.zrem(ProductSuggestService._set_key(generation, kind, prefix), member)
+        pipe.hdel(items_key, member)
+        pipe.execute()
+
+    @classmethod
+    def _index(cls, kind, members, entries):
+        """Write `entries` into the current generation and remove the `members` that have none."""
+        try:
+            conn = get_redis_connection("default")
+            generation = cls._generation(conn)
+            written = {entry[1] for entry in entries}
+            for member in members:
+                if member not in written:
+                    cls._remove(conn, generation, kind, member)
+            if entries:
+                members = [entry[1] for entry in entries]
+                previous = dict(zip(members, conn.hmget(cls._items_key(generation), members)))
+                cls._write(conn.pipeline(transaction=False), generation, entries, previous).execute()
+        except Exception as e:
+            # the periodic rebuild picks the change up
+            logger.warning(f"Suggest index update failed: {str(e)}")
+
+    @classmethod
+    def index_products(cls, product_ids):
+        """Index the published products among `product_ids` and remove the others, once the transaction commits."""
+        product_ids = [product_id for product_id in product_ids if product_id]
+        if not product_ids:
+            return
+
+        def index():
+            entries = [cls._product_entry(product) for product in cls._product_queryset().filter(pk__in=product_ids)]
+            cls._index("product", [f"p:{product_id}" for product_id in product_ids], entries)
+
+        transaction.on_commit(index)
+
+    @classmethod
+    def index_product(cls, product_id, update_fields=None):
+        if update_fields is not None and not cls.SOURCE_FIELDS.intersection(update_fields):
+            return
+        cls.index_products([product_id])
+
+    @classmethod
+    def remove_product(cls, product_id):
+        transaction.on_commit(lambda: cls._index("product", [f"p:{product_id}"], []))
+
+    @classmethod
+    def index_catalog(cls, model, pk):
+        """Index (or remove) one brand or category once the transaction commits."""
+        kind = "category" if model is Category else "brand"
+
+        def index():
+            entries = [cls._catalog_entry(instance) for instance in cls._catalog_queryset(model).filter(pk=pk)]
+            cls._index(kind, [f"{SUGGEST_KINDS[kind]}:{pk}"], entries)
+
+        transaction.on_commit(index)
+
+    # ---------- rebuild ----------
+    @classmethod
+    def rebuild(cls, batch_size=1000):
+        """Write every published product, brand and active category into a new generation and switch to it."""
+        conn = get_redis_connection("default")
+        current = cls._generation(conn)
+        generation = current + 1
+        # leftovers of an interrupted rebuild
+        cls._delete_generation(conn, generation)
+
+        counts = {}
+        for kind, queryset, entry_of in (
+            ("product", cls._product_queryset().order_by("pk"), cls._product_entry),
+            ("brand", cls._catalog_queryset(Brand).order_by("pk"), cls._catalog_entry),
+            ("category", cls._catalog_queryset(Category).order_by("pk"), cls._catalog_entry),
+        ):
+            counts[kind] = 0
+            batch = []
+            for instance in queryset.iterator(chunk_size=batch_size):
+                batch.append(entry_of(instance))
+                if len(batch) >= batch_size:
+                    cls._write(conn.pipeline(transaction=False), generation, batch).execute()
+                    counts[kind] += len(batch)
+                    batch = []
+            if batch:
+                cls._write(conn.pipeline(transaction=False), generation, batch).execute()
+                counts[kind] += len(batch)
+
+        conn.set(GENERATION_KEY, generation)
+        cls._delete_generation(conn, current)
+        return counts
+
+    @staticmethod
+    def _delete_generation(conn, generation, batch_size=1000):
+        keys = []
+        for key in conn.scan_iter(f"{SUGGEST_PREFIX}:{generation}:*", count=batch_size):
+            keys.append(key)
+            if len(keys) >= batch_size:
+                conn.unlink(*keys)
+                keys = []
+        if keys:
+            conn.unlink(*keys)
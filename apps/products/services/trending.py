@@ -0,0 +1,214 @@
+import logging
+import math
+import time
+
+from django.db import transaction
+from django_redis import get_redis_connection
+
+from ..models import Product
+
+logger = logging.getLogger("myapp")
+
+
+TRENDING_PREFIX = "trending"
+EPOCH_KEY = f"{TRENDING_PREFIX}:epoch"
+# product id -> "<category_id>:<store_id>", so event paths need not know a product's scopes
+DIMENSIONS_KEY = f"{TRENDING_PREFIX}:dimensions"
+# an event loses half of its weight every TRENDING_HALF_LIFE seconds
+TRENDING_HALF_LIFE = 60 * 60 * 24
+TRENDING_TAU = TRENDING_HALF_LIFE / math.log(2)
+# weight of one event (per unit for sales)
+EVENT_WEIGHTS = {"view": 1.0, "wishlist": 3.0, "add_to_cart": 5.0, "sales_count": 10.0}
+# members kept per scope at each rescale, and the decayed score below which a member is dropped
+TRENDING_CAPACITY = 1000
+MIN_SCORE = 0.01
+
+# forward decay: an event at time t adds weight * e^((t - epoch) / tau), so older events
+# weigh exponentially less relative to newer ones without ever touching stored scores
+RECORD_SCRIPT = """
+local now = tonumber(redis.call('TIME')[1])
+local epoch = tonumber(redis.call('GET', KEYS[2]))
+if not epoch then
+    epoch = now
+    redis.call('SET', KEYS[2], epoch)
+end
+local boost = math.exp((now - epoch) / tonumber(ARGV[2]))
+for i = 3, #ARGV, 2 do
+    local product_id = ARGV[i]
+    local increment = tonumber(ARGV[i + 1]) * boost
+    redis.call('ZINCRBY', ARGV[1] .. ':global', increment, product_id)
+    local dimensions = redis.call('HGET', KEYS[1], product_id)
+    if dimensions then
+        local separator = string.find(dimensions, ':', 1, true)
+        local category_id = string.sub(dimensions, 1, separator - 1)
+        local store_id = string.sub(dimensions, separator + 1)
+        if category_id ~= '' then
+            redis.call('ZINCRBY', ARGV[1] .. ':category:' .. category_id, increment, product_id)
+        end
+        if store_id ~= '' then
+            redis.call('ZINCRBY', ARGV[1] .. ':store:' .. store_id, increment, product_id)
+        end
+    end
+end
+return 1
+"""
+
+# scale every scope to a new epoch in one atomic step, dropping the faded and the overflow
+RESCALE_SCRIPT = """
+local now = tonumber(redis.call('TIME')[1])
+local epoch = tonumber(redis.call('GET', KEYS[1])) or now
+local factor = math.exp((epoch - now) / tonumber(ARGV[1]))
+for i = 2, #KEYS do
+    redis.call('ZUNIONSTORE', KEYS[i], 1, KEYS[i], 'WEIGHTS', factor)
+    redis.call('ZREMRANGEBYSCORE', KEYS[i], '-inf', '(' .. ARGV[2])
+    redis.call('ZREMRANGEBYRANK', KEYS[i], 0, -tonumber(ARGV[3]) - 1)
+end
+redis.call('SET', KEYS[1], now)
+return now
+"""
+
+
+class TrendingService:
+    """
+    "Trending now" from recent views, wishlist adds, add-to-carts and sales, with
+    exponential time decay, in Redis sorted sets per scope: global, per category and per
+    store. Recording is one Lua call (ZINCRBY per scope, O(log n)); reading a rail is one
+    ZREVRANGE. Scores grow with e^(t / tau) against a shared epoch, and a periodic rescale
+    multiplies every set back down and moves the epoch, so stored numbers stay bounded.
+    """
+
+    # Product fields that decide a product's trending scopes
+    SOURCE_FIELDS = {"category", "store"}
+
+    @staticmethod
+    def scope_key(category_id=None, store_id=None):
+        if category_id:
+            return f"{TRENDING_PREFIX}:category:{category_id}"
+        if store_id:
+            return f"{TRENDING_PREFIX}:store:{store_id}"
+        return f"{TRENDING_PREFIX}:global"
+
+    # ---------- recording ----------
+    @staticmethod
+    def record_many(events):
+        """events: iterable of (product_id, event, amount); unknown events are ignored."""
+        args = []
+        for product_id, event, amount in events:
+            weight = EVENT_WEIGHTS.get(event)
+            if product_id and weight and amount:
+                args.extend([product_id, weight * amount])
+        if not args:
+            return
+        try:
+            get_redis_connection("default").eval(
+                RECORD_SCRIPT, 2, DIMENSIONS_KEY, EPOCH_KEY, TRENDING_PREFIX, TRENDING_TAU, *args
+            )
+        except Exception as e:
+            # trending is best effort; the request path must not fail on it
+            logger.warning(f"Trending record failed: {str(e)}")
+
+    @classmethod
+    def record(cls, product_id, event, amount=1):
+        cls.record_many([(product_id, event, amount)])
+
+    @staticmethod
+    def _dimensions(category_id, store_id):
+        return f"{category_id or ''}:{store_id or ''}"
+
+    @classmethod
+    def sync_dimensions(cls, product, update_fields=None):
+        """Store the product's category / store for the record script, after commit."""
+        if update_fields is not None and not cls.SOURCE_FIELDS.intersection(update_fields):
+            return
+        product_id, dimensions = product.pk, cls._dimensions(product.category_id, product.store_id)
+
+        def write():
+            try:
+                get_redis_connection("default").hset(DIMENSIONS_KEY, product_id, dimensions)
+            except Exception as e:
+                logger.warning(f"Trending dimension sync failed: {str(e)}")
+
+        transaction.on_commit(write)
+
+    @classmethod
+    def remove_product(cls, product_id, category_id=None, store_id=None):
+        def remove():
+            try:
+                pipe = get_redis_connection("default").pipeline(transaction=False)
+                pipe.zrem(cls.scope_key(), product_id)
+                if category_id:
+                    pipe.zrem(cls.scope_key(category_id=category_id), product_id)
+                if store_id:
+                    pipe.zrem(cls.scope_key(store_id=store_id), product_id)
+                pipe.hdel(DIMENSIONS_KEY, product_id)
+                pipe.execute()
+            except Exception as e:
+                logger.warning(f"Trending removal failed: {str(e)}")
+
+        transaction.on_commit(remove)
+
+    # ---------- reading ----------
+    @classmethod
+    def top(cls, limit, category_id=None, store_id=None):
+        """[(product_id, decayed score)] of the scope, best first; [] when Redis is unavailable."""
+        try:
+            pipe = get_redis_connection("default").pipeline(transaction=False)
+            pipe.get(EPOCH_KEY)
+            pipe.zrevrange(cls.scope_key(category_id, store_id), 0, limit - 1, withscores=True)
+            epoch, members = pipe.execute()
+        except Exception as e:
+            logger.warning(f"Trending read failed: {str(e)}")
+            return []
+        # express the scores at the current time, comparable across rescales
+        decay = math.exp((float(epoch) - time.time()) / TRENDING_TAU) if epoch else 1.0
+        return [(int(member), round(score * decay, 4)) for member, score in members]
+
+    # ---------- maintenance ----------
+    @classmethod
+    def rescale(cls, batch_size=1000):
+        """
+        Move every scope to a new epoch, drop faded and overflowing members, then drop
+        products that are gone, unpublished or moved out of a scope, and backfill the
+        dimensions hash.
+        Returns the number of scopes rescaled.
+        """
+        conn = get_redis_connection("default")
+        keys = [key for key in conn.scan_iter(f"{TRENDING_PREFIX}:*", count=batch_size)]
+        scopes = [key for key in keys if key.decode() not in (EPOCH_KEY, DIMENSIONS_KEY)]
+        conn.eval(RESCALE_SCRIPT, len(scopes) + 1, EPOCH_KEY, *scopes, TRENDING_TAU, MIN_SCORE, TRENDING_CAPACITY)
+
+        pipe = conn.pipeline(transaction=False)
+        for scope in scopes:
+            pipe.zrange(scope, 0, -1)
+        memberships = pipe.execute() if scopes else []
+        # scopes are trimmed separately, so a category or store can keep members the global set dropped
+        member_ids = sorted({int(member) for members in memberships for member in members})
+        published = {}
+        for i in range(0, len(member_ids), batch_size):
+            published.update(
+                (product_id, (category_id, store_id))
+                for product_id, category_id, store_id in Product.objects.filter(
+                    pk__in=member_ids[i:i + batch_size], status="published"
+                ).values_list("id", "category_id", "store_id")
+            )
+        # scopes each product still belongs to; anything else is gone, unpublished or moved
+        allowed = {cls.scope_key().encode(): set(published)}
+        for product_id, (category_id, store_id) in published.items():
+            if category_id:
+                allowed.setdefault(cls.scope_key(category_id=category_id).encode(), set()).add(product_id)
+            if store_id:
+                allowed.setdefault(cls.scope_key(store_id=store_id).encode(), set()).add(product_id)
+
+        for scope, members in zip(scopes, memberships):
+            stale = [member for member in members if int(member) not in allowed.get(scope, ())]
+            if stale:
+                pipe.zrem(scope, *stale)
+        gone = [product_id for product_id in member_ids if product_id not in published]
+        if gone:
+            pipe.hdel(DIMENSIONS_KEY, *gone)
+        if published:
+            pipe.hset(DIMENSIONS_KEY, mapping={
+                product_id: cls._dimensions(*dimensions) for product_id, dimensions in published.items()
+            })
+        pipe.execute()
+        return len(scopes)
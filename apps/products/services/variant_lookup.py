@@ -0,0 +1,142 @@
+from django.core.cache import cache
+from django.db import transaction
+
+from ..models import Product, ProductVariant, ProductVariantAttribute
+
+
+VARIANT_LOOKUP_CACHE_PREFIX = "variant_lookup"
+VARIANT_LOOKUP_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def combination_key(value_ids):
+    return "-".join(str(value_id) for value_id in sorted(value_ids))
+
+
+class VariantLookupService:
+    """
+    Per-product variant lookup map cached in django-redis, so a client can resolve
+    "which variant is Red / XL" without downloading the whole variant tree.
+
+    The map stores every variant once and indexes it by the sorted tuple of its attribute
+    value ids ("3-7"), which makes resolving a full selection a single dict lookup. It is
+    dropped after commit whenever variants, their attribute values or their stock change.
+    """
+
+    # ---------- cache ----------
+    @staticmethod
+    def cache_key(slug):
+        return f"{VARIANT_LOOKUP_CACHE_PREFIX}:{slug}"
+
+    @classmethod
+    def get_map(cls, slug):
+        """The lookup map of the product, or None when the slug is unknown."""
+        lookup = cache.get(cls.cache_key(slug))
+        if lookup is None:
+            product_id = Product.objects.filter(slug=slug).values_list("id", flat=True).first()
+            if product_id is None:
+                return None
+            lookup = cls.build(product_id)
+            cache.set(cls.cache_key(slug), lookup, timeout=VARIANT_LOOKUP_CACHE_TIMEOUT)
+        return lookup
+
+    @classmethod
+    def invalidate(cls, product_id, slug=None):
+        if not product_id:
+            return
+
+        def drop():
+            key_slug = slug or Product.objects.filter(pk=product_id).values_list("slug", flat=True).first()
+            if key_slug is not None:
+                cache.delete(cls.cache_key(key_slug))
+
+        transaction.on_commit(drop)
+
+    @classmethod
+    def drop(cls, product_ids, batch_size=1000):
+        """Drop the lookup maps of many products at once; they rebuild on the next read."""
+        product_ids = list(product_ids)
+        for i in range(0, len(product_ids), batch_size):
+            slugs = Product.objects.filter(pk__in=product_ids[i:i + batch_size]).values_list("slug", flat=True)
+            cache.delete_many([cls.cache_key(slug) for slug in slugs])
+
+    # ---------- builder ----------
+    @staticmethod
+    def build(product_id):
+        attributes, values, selections = {}, {}, {}
+        for variant_id, attribute_id, attribute_name, value_id, value, color_code in (
+            ProductVariantAttribute.objects.filter(variant__product_id=product_id)
+            .values_list("variant_id", "attribute_id", "attribute__name", "value_id", "value__value", "value__color_code")
+            .order_by("attribute_id", "value_id")
+        ):
+            attributes[str(attribute_id)] = attribute_name
+            values[str(value_id)] = {"attribute": attribute_id, "value": value, "color_code": color_code}
+            selections.setdefault(variant_id, []).append(value_id)
+
+        variants, combinations = {}, {}
+        # default variant first, so it wins when two variants share a combination
+        for variant in ProductVariant.objects.filter(product_id=product_id).order_by("-is_default", "id"):
+            value_ids = sorted(selections.get(variant.id, []))
+            variants[str(variant.id)] = {
+                "id": variant.id,
+                "sku": variant.sku,
+                "variant_name": variant.variant_name,
+                "price": str(variant.price),
+                "discount_price": str(variant.discount_price) if variant.discount_price is not None else None,
+                "stock": variant.stock,
+                "image": variant.image.url if variant.image else None,
+                "is_default": variant.is_default,
+                "values": value_ids,
+            }
+            if value_ids:
+                combinations.setdefault(combination_key(value_ids), variant.id)
+
+        return {
+            "product_id": product_id,
+            "attributes": attributes,
+            "values": values,
+            "combinations": combinations,
+            "variants": variants,
+        }
+
+    # ---------- resolution ----------
+    @staticmethod
+    def validate_selection(lookup, value_ids):
+        """Error messages for a selection: unknown value ids or two values of one attribute."""
+        errors = []
+        unknown = [value_id for value_id in value_ids if str(value_id) not in lookup["values"]]
+        if unknown:
+            errors.append(f"Unknown value ids for this product: {', '.join(str(value_id) for value_id in unknown)}")
+        attributes = [lookup["values"][str(value_id)]["attribute"] for value_id in value_ids if str(value_id) in lookup["values"]]
+        if len(attributes) != len(set(attributes)):
+            errors.append("Select at most one value per attribute.")
+        return errors
+
+    @staticmethod
+    def resolve(lookup, value_ids):
+        """
+        The variant matching the full selection (None while the selection is partial or has
+        no variant) and, per attribute, the values that still lead to a variant when combined
+        with the selection on the other attributes.
+        """
+        value_ids = sorted(set(value_ids))
+        variant_id = lookup["combinations"].get(combination_key(value_ids))
+        variant = lookup["variants"][str(variant_id)] if variant_id is not None else None
+
+        selected = {lookup["values"][str(value_id)]["attribute"]: value_id for value_id in value_ids}
+        available = {}
+        for candidate in lookup["variants"].values():
+            by_attribute = {lookup["values"][str(value_id)]["attribute"]: value_id for value_id in candidate["values"]}
+            for attribute_id, value_id in by_attribute.items():
+                # the candidate must agree with every selected value except this attribute's own
+                if any(by_attribute.get(other) != chosen for other, chosen in selected.items() if other != attribute_id):
+                    continue
+                entry = available.setdefault(attribute_id, {}).setdefault(value_id, {"id": value_id, "in_stock": False})
+                entry["in_stock"] = entry["in_stock"] or candidate["stock"] > 0
+
+        return variant, {
+            lookup["attributes"][str(attribute_id)]: [
+                {**entry, "value": lookup["values"][str(value_id)]["value"], "color_code": lookup["values"][str(value_id)]["color_code"]}
+                for value_id, entry in sorted(entries.items())
+            ]
+            for attribute_id, entries in sorted(available.items())
+        }
@@ -0,0 +1,133 @@
+from itertools import product as cartesian
+
+from django.db import transaction
+
+from config.utils.skus import normalize_sku
+from ..models import ProductAttribute, ProductAttributeValue, ProductVariant, ProductVariantAttribute
+
+
+# upper bound of variants generated by one request
+MAX_MATRIX_VARIANTS = 1000
+
+
+class VariantMatrixService:
+    """
+    Generate the Cartesian product of attribute values as variants of one variable product.
+
+    Attributes, values, variants and variant attribute links are written with bulk_create
+    inside one transaction, so the per-row save hooks (default flag reset, price summary,
+    facet rows, caches) are replaced by a single refresh of the product at the end.
+    Combinations the product already has are skipped, which makes re-running a matrix safe.
+    """
+
+    @staticmethod
+    def combinations(attributes):
+        """[{"color": "red", "size": "s"}, ...] in the order the attributes and values were given."""
+        names = [attribute["name"] for attribute in attributes]
+        return [dict(zip(names, values)) for values in cartesian(*(attribute["values"] for attribute in attributes))]
+
+    @staticmethod
+    def sku_for(prefix, combination):
+        # parts joined with "_", which normalize_sku keeps, so the SKU round-trips through
+        # ProductVariantSerializer unchanged ("-" would be stripped on the next edit)
+        return normalize_sku("_".join([prefix, *combination.values()]))
+
+    @staticmethod
+    def _ensure_attributes(product, attributes):
+        """Get or create the attributes and values; returns ({name: attribute}, {(name, value): value_obj})."""
+        names = [attribute["name"] for attribute in attributes]
+        existing = {attribute.name: attribute for attribute in ProductAttribute.objects.filter(product=product, name__in=names)}
+        ProductAttribute.objects.bulk_create([
+            ProductAttribute(product=product, name=name, is_variation=True) for name in names if name not in existing
+        ])
+        attribute_map = {attribute.name: attribute for attribute in ProductAttribute.objects.filter(product=product, name__in=names)}
+
+        wanted = {(attribute["name"], value) for attribute in attributes for value in attribute["values"]}
+        existing_values = {
+            (value.attribute.name, value.value)
+            for value in ProductAttributeValue.objects.filter(attribute__in=attribute_map.values()).select_related("attribute")
+        }
+        ProductAttributeValue.objects.bulk_create([
+            ProductAttributeValue(attribute=attribute_map[name], value=value)
+            for name, value in sorted(wanted - existing_values)
+        ])
+        value_map = {
+            (value.attribute.name, value.value): value
+            for value in ProductAttributeValue.objects.filter(attribute__in=attribute_map.values()).select_related("attribute")
+        }
+        return attribute_map, value_map
+
+    @staticmethod
+    def _existing_combinations(product):
+        selections = {}
+        for variant_id, name, value in ProductVariantAttribute.objects.filter(variant__product=product).values_list(
+            "variant_id", "attribute__name", "value__value"
+        ):
+            selections.setdefault(variant_id, {})[name] = value
+        return {frozenset(selection.items()) for selection in selections.values()}
+
+    @classmethod
+    def generate(cls, product, attributes, rows, default=None):
+        """
+        attributes: [{"name": "color", "values": ["red", "blue"]}, ...] (already normalized)
+        rows: [{"combination": {...}, "sku", "variant_name", "price", "discount_price", "stock"}]
+        default: the combination to flag as default variant, if any.
+        Returns (created variants, number of combinations skipped because they exist);
+        raises ValueError when a generated SKU is already taken.
+        """
+        with transaction.atomic():
+            attribute_map, value_map = cls._ensure_attributes(product, attributes)
+            existing = cls._existing_combinations(product)
+            requested = len(rows)
+            rows = [row for row in rows if frozenset(row["combination"].items()) not in existing]
+            skipped = requested - len(rows)
+
+            taken = set(ProductVariant.objects.filter(sku__in=[row["sku"] for row in rows]).values_list("sku", flat=True))
+            if taken:
+                raise ValueError(f"SKU already in use: {', '.join(sorted(taken))}")
+
+            if default is not None and any(row["combination"] == default for row in rows):
+                ProductVariant.objects.filter(product=product, is_default=True).update(is_default=False)
+
+            variants = ProductVariant.objects.bulk_create([
+                ProductVariant(
+                    product=product,
+                    sku=row["sku"],
+                    variant_name=row["variant_name"],
+                    price=row["price"],
+                    discount_price=row.get("discount_price"),
+                    stock=row["stock"],
+                    is_default=row["combination"] == default,
+                )
+                for row in rows
+            ])
+            ProductVariantAttribute.objects.bulk_create([
+                ProductVariantAttribute(
+                    variant=variant,
+                    attribute=attribute_map[name],
+                    value=value_map[(name, value)],
+                )
+                for variant, row in zip(variants, rows)
+                for name, value in row["combination"].items()
+            ])
+            for variant, row in zip(variants, rows):
+                variant.combination = row["combination"]
+
+            cls._after_write(product.pk)
+        return variants, skipped
+
+    @staticmethod
+    def _after_write(product_id):
+        """What the skipped save hooks would have done, once for the whole matrix."""
+        from .price_summary import PriceSummaryService
+        from .attribute_facets import AttributeFacetService
+        from .facets import ProductFacetService
+        from .home_rails import HomeRailService
+        from .product_detail import ProductDetailService
+        from .variant_lookup import VariantLookupService
+        PriceSummaryService.refresh(product_id)
+        AttributeFacetService.sync_products([product_id])
+        ProductFacetService.invalidate()
+        HomeRailService.invalidate()
+        ProductDetailService.invalidate(product_id)
+        VariantLookupService.invalidate(product_id)
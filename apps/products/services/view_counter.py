@@ -0,0 +1,102 @@
+import hashlib
+import logging
+from collections import defaultdict
+from datetime import date
+
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Value, When
+from django.utils import timezone
+from django_redis import get_redis_connection
+
+from ..models import Product
+from .product_analytics import ProductAnalyticsService
+from .redis_buffer import drain_hash
+from .trending import TrendingService
+
+logger = logging.getLogger("myapp")
+
+
+PENDING_KEY = "product_views:pending"
+UNIQUE_PREFIX = "product_views:unique:"
+UNIQUE_TTL = 60 * 60 * 48
+
+# PFADD into the day's HyperLogLog; only a new viewer bumps the pending counter
+RECORD_VIEW_SCRIPT = """
+local added = redis.call('PFADD', KEYS[1], ARGV[1])
+redis.call('EXPIRE', KEYS[1], ARGV[3])
+if added == 1 then
+    redis.call('HINCRBY', KEYS[2], ARGV[2], 1)
+end
+return added
+"""
+
+
+class ProductViewCounter:
+    """
+    Buffer product detail views in Redis instead of writing the product row per view.
+
+    Each view is PFADDed into a per-product, per-day HyperLogLog of viewers; when the
+    sketch grows (a new viewer that day) the pending hash field "<date>:<product_id>"
+    is incremented. `flush` moves the pending deltas into Product.view_count and
+    ProductAnalytics.views in bulk.
+    """
+
+    @staticmethod
+    def viewer_key(request):
+        if request.user and request.user.is_authenticated:
+            return f"u{request.user.id}"
+        from apps.activity_log.utils.functions import get_client_ip
+        fingerprint = f"{get_client_ip(request)}|{request.META.get('HTTP_USER_AGENT', '')}"
+        return "a" + hashlib.sha1(fingerprint.encode()).hexdigest()[:16]
+
+    @staticmethod
+    def record(product_id, viewer):
+        today = timezone.localdate().isoformat()
+        try:
+            conn = get_redis_connection("default")
+            added = conn.eval(
+                RECORD_VIEW_SCRIPT, 2,
+                f"{UNIQUE_PREFIX}{today}:{product_id}", PENDING_KEY,
+                viewer, f"{today}:{product_id}", UNIQUE_TTL,
+            )
+        except Exception as e:
+            # without Redis there is no dedupe; count the view with a single-row UPDATE
+            logger.warning(f"Redis view counter failed, updating directly: {str(e)}")
+            Product.objects.filter(pk=product_id).update(view_count=F("view_count") + 1)
+            return
+        if added:
+            # repeat views by the same viewer that day do not push a product up
+            TrendingService.record(product_id, "view")
+
+    @staticmethod
+    def unique_viewers(product_id, day=None):
+        day = (day or timezone.localdate()).isoformat()
+        return get_redis_connection("default").pfcount(f"{UNIQUE_PREFIX}{day}:{product_id}")
+
+    @staticmethod
+    @transaction.atomic
+    def _write(pending, batch_size):
+        """pending: {"<date>:<product_id>": count} -> Product.view_count and ProductAnalytics.views"""
+        per_product = defaultdict(int)
+        per_day = {}
+        for field, count in pending.items():
+            day, product_id = field.split(":")
+            product_id = int(product_id)
+            per_product[product_id] += count
+            per_day[(product_id, date.fromisoformat(day))] = {"views": count}
+
+        product_ids = sorted(per_product)
+        for i in range(0, len(product_ids), batch_size):
+            chunk = product_ids[i:i + batch_size]
+            Product.objects.filter(pk__in=chunk).update(view_count=F("view_count") + Case(
+                *[When(pk=product_id, then=Value(per_product[product_id])) for product_id in chunk],
+                default=Value(0),
+                output_field=IntegerField(),
+            ))
+        ProductAnalyticsService.add_counts(per_day, batch_size=batch_size)
+        return len(product_ids)
+
+    @classmethod
+    def flush(cls, batch_size=500):
+        """Write the buffered deltas; returns the number of products updated."""
+        return drain_hash(PENDING_KEY, lambda pending: cls._write(pending, batch_size))
@@ -0,0 +1,210 @@
+from config.celery import app
+import logging
+
+logger = logging.getLogger("myapp")
+
+
+@app.task
+def reindex_product_search_documents(product_ids=None, brand_id=None, category_id=None, store_id=None):
+    """
+    Refresh search documents after a brand / category / store rename,
+    or for an explicit list of products.
+    """
+    from .models import Product
+    from .services.search_engine import ProductSearchService
+
+    try:
+        if product_ids is None and any([brand_id, category_id, store_id]):
+            filters = {}
+            if brand_id:
+                filters["brand_id"] = brand_id
+            if category_id:
+                filters["category_id"] = category_id
+            if store_id:
+                filters["store_id"] = store_id
+            product_ids = list(Product.objects.filter(**filters).values_list("id", flat=True))
+
+        written = ProductSearchService.index_products(product_ids)
+        return {"status": "success", "indexed": written}
+    except Exception as e:
+        logger.exception(f"Search reindex failed: {str(e)}")
+        return {"status": "failed", "error": str(e)}
+
+
+@app.task
+def rebuild_home_rails(rails=None, only_missing=False):
+    """
+    Recompute the cached homepage rails. Runs on a schedule and shortly after
+    writes that invalidated a rail (with only_missing=True).
+    """
+    from .services.home_rails import HomeRailService
+
+    try:
+        rebuilt = HomeRailService.rebuild(rails, only_missing=only_missing)
+        return {"status": "success", "rebuilt": rebuilt}
+    except Exception as e:
+        logger.exception(f"Home rail rebuild failed: {str(e)}")
+        return {"status": "failed", "error": str(e)}
+
+
+@app.task
+def refresh_sales_rollup(batch_size=1000):
+    """
+    Fold newly paid (and newly cancelled / refunded) orders into the daily sales
+    buckets and refresh the windowed best-seller totals.
+    """
+    from .services.sales_rollup import SalesRollupService
+
+    try:
+        result = SalesRollupService.run(batch_size=batch_size)
+        return {"status": "success", **result}
+    except Exception as e:
+        logger.exception(f"Sales rollup refresh failed: {str(e)}")
+        return {"status": "failed", "error": str(e)}
+
+
+@app.task
+def refresh_bought_together(batch_size=1000):
+    """
+    Fold newly paid (and newly cancelled / refunded) orders into the product co-occurrence
+    counts and refresh the "frequently bought together" lists of the products they touch.
+    """
+    from .services.bought_together import BoughtTogetherService
+
+    try:
+        result = BoughtTogetherService.run(batch_size=batch_size)
+        return {"status": "success", **result}
+    except Exception as e:
+        logger.exception(f"Bought together refresh failed: {str(e)}")
+        return {"status": "failed", "error": str(e)}
+
+
+@app.task
+def flush_product_views(batch_size=500):
+    """Move buffered product views from Redis into Product.view_count and ProductAnalytics.views."""
+    from .services.view_counter import ProductViewCounter
+
+    try:
+        flushed = ProductViewCounter.flush(batch_size=batch_size)
+        return {"status": "success", "products": flushed}
+    except Exception as e:
+        logger.exception(f"Product view flush failed: {str(e)}")
+        return {"status": "failed", "error": str(e)}
+
+
+@app.task
+def flush_product_events(batch_size=500):
+    """Move buffered add-to-cart / wishlist / sale counters from Redis into ProductAnalytics."""
+    from .services.event_counter import ProductEventCounter
+
+    try:
+        written = ProductEventCounter.flush(batch_size=batch_size)
+        return {"status": "success", "rows": written}
+    except Exception as e:
+        logger.exception(f"Product event flush failed: {str(e)}")
+        return {"status": "failed", "error": str(e)}
+
+
+@app.task
+def rebuild_suggest_index(batch_size=1000):
+    """Rewrite the typeahead index with fresh popularity scores (new generation, then switch)."""
+    from .services.suggest import ProductSuggestService
+
+    try:
+        counts = ProductSuggestService.rebuild(batch_size=batch_size)
+        return {"status": "success", **counts}
+    except Exception as e:
+        logger.exception(f"Suggest index rebuild failed: {str(e)}")
+        return {"status": "failed", "error": str(e)}
+
+
+@app.task
+def rescale_trending_scores(batch_size=1000):
+    """Move the trending sorted sets to a new decay epoch and trim them."""
+    from .services.trending import TrendingService
+
+    try:
+        scopes = TrendingService.rescale(batch_size=batch_size)
+        return {"status": "success", "scopes": scopes}
+    except Exception as e:
+        logger.exception(f"Trending rescale failed: {str(e)}")
+        return {"status": "failed", "error": str(e)}
+
+
+@app.task
+def refresh_scope_analytics(full=False, batch_size=1000):
+    """
+    Update Category / Brand / Store analytics for the scopes touched since the last run;
+    `full` recomputes every row (nightly reconciliation).
+    """
+    from .services.scope_analytics import ScopeAnalyticsService
+
+    try:
+        result = ScopeAnalyticsService.run(full=full, batch_size=batch_size)
+        return {"status": "success", **result}
+    except Exception as e:
+        logger.exception(f"Scope analytics refresh failed: {str(e)}")
+        return {"status": "failed", "error": str(e)}
+
+
+@app.task
+def rebuild_product_detail(product_id):
+    """Recompute the cached product detail document and first review page after a write."""
+    from .services.product_detail import ProductDetailService
+
+    try:
+        rebuilt = ProductDetailService.rebuild(product_id)
+        return {"status": "success", "rebuilt": rebuilt}
+    except Exception as e:
+        logger.exception(f"Product detail rebuild failed: {str(e)}")
+        return {"status": "failed", "error": str(e)}
+
+
+@app.task
+def drop_product_details(brand_id=None, category_id=None, store_id=None):
+    """Drop cached product detail documents after a brand / category / store rename."""
+    from .models import Product
+    from .services.product_detail import ProductDetailService
+
+    try:
+        filters = {}
+        if brand_id:
+            filters["brand_id"] = brand_id
+        if category_id:
+            filters["category_id"] = category_id
+        if store_id:
+            filters["store_id"] = store_id
+        if not filters:
+            return {"status": "success", "dropped": 0}
+        product_ids = Product.objects.filter(**filters).values_list("id", flat=True)
+        dropped = ProductDetailService.drop(product_ids)
+        return {"status": "success", "dropped": dropped}
+    except Exception as e:
+        logger.exception(f"Product detail drop failed: {str(e)}")
+        return {"status": "failed", "error": str(e)}
+
+
+@app.task
+def import_products_file(path, job_id, file_format, store_id=None, batch_size=500):
+    """
+    Run a catalog import uploaded through ProductImportView. Progress is written to the
+    cache under the job id after every chunk; the uploaded file is removed afterwards.
+    """
+    from django.core.files.storage import default_storage
+    from .services.product_import import ProductImportService, ProductImportJob
+
+    def progress(stats):
+        ProductImportJob.update(job_id, status="running", **stats)
+
+    try:
+        service = ProductImportService(store_id=store_id, batch_size=batch_size, progress=progress)
+        with default_storage.open(path, "rb") as fileobj:
+            stats = service.run(fileobj, file_format)
+        ProductImportJob.update(job_id, status="completed", **stats)
+        return {"status": "success", "created": stats["created"], "failed": stats["failed"]}
+    except Exception as e:
+        logger.exception(f"Product import failed: {str(e)}")
+        ProductImportJob.update(job_id, status="failed", error=str(e))
+        return {"status": "failed", "error": str(e)}
+    finally:
+        default_storage.delete(path)
@@ -2,16 +2,24 @@ from django.urls import path
 from . import views
 urlpatterns = [
     path('v1/products/', views.ProductsView.as_view(), name="products_view"),
+    path('v1/products/facets/', views.ProductFacetsView.as_view(), name="product_facets_view"),
     path('v1/products/latest/',views.LatestProductsView.as_view(),name = "latest_products_view"),
     path('v1/products/best_selling/',views.BestSellingProductsView.as_view(),name = "best_selling_products_view"),
+    path('v1/products/trending/', views.TrendingProductsView.as_view(), name="trending_products_view"),
     path('v1/products/top_categories/',views.TopFiveCategoriesProductView.as_view(),name = "top_five_categories_view"),
     # specific paths BEFORE the slug pattern
+    path('v1/products/recently_viewed/', views.ProductRecentlyViewedView.as_view(), name="product_recently_viewed_view"),
+    path('v1/products/suggest/', views.ProductSuggestView.as_view(), name="product_suggest_view"),
+    path('v1/products/imports/', views.ProductImportView.as_view(), name="product_import_view"),
+    path('v1/products/imports/<str:job_id>/', views.ProductImportStatusView.as_view(), name="product_import_status_view"),
     path('v1/products/attributes/', views.ProductAttributeView.as_view(), name="product_attribute_view"),
     path('v1/products/attributes/<int:pk>/', views.ProductAttributeDetailView.as_view(), name="product_attribute_detail_view"),
     path('v1/products/attributes/values/', views.ProductAttributeValuesView.as_view(), name="product_attribute_values_view"),
     path('v1/products/attributes/values/<int:pk>/', views.ProductAttributeValuesDetailView.as_view(), name="product_attribute_value_detail_view"),
     path('v1/products/attributes/<int:pk>/values/', views.AttributeSpecificValuesListView.as_view(), name="attribute_specific_values_view"),
     path('v1/products/variants/', views.ProductVariantView.as_view(), name="product_variant_view"),
+    path('v1/products/variants/generate/', views.ProductVariantMatrixView.as_view(), name="product_variant_matrix_view"),
+    path('v1/products/variants/bulk_update/', views.ProductVariantBulkUpdateView.as_view(), name="product_variant_bulk_update_view"),
     path('v1/products/variants/<int:pk>/', views.ProductVariantDetailView.as_view(), name="product_variant_detail_view"),
     path('v1/products/variants/attributes/', views.ProductVariantAttributeView.as_view(), name="product_variant_attribute_view"),
     
@@ -25,6 +33,9 @@ urlpatterns = [
     #  generic slug pattern 
 
     path('v1/products/<str:slug>/', views.ProductsDetailView.as_view(), name="products_detail_view"),
+    path('v1/products/<str:slug>/variant/', views.ProductVariantResolveView.as_view(), name="product_variant_resolve_view"),
+    path('v1/products/<str:slug>/bought_together/', views.ProductBoughtTogetherView.as_view(), name="product_bought_together_view"),
+    path('v1/products/<str:slug>/reviews/', views.ProductReviewsView.as_view(), name="product_reviews_view"),
     path('v1/products/<str:slug>/attributes/', views.ProductSpecificAttributeView.as_view(), name="product_specific_attributes_view"),
     
 ]
\ No newline at end of file
@@ -2,19 +2,41 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework import generics
+from rest_framework.exceptions import ValidationError
 from . import models
 from . import serializers
 from apps.activity_log.utils.functions import log_request
 import logging
+import uuid
 logger = logging.getLogger("myapp")
 from django.db import transaction
+from django.urls import reverse
+from django.core.files.storage import default_storage
 from rest_framework.permissions import IsAuthenticated,IsAdminUser,AllowAny
-from config.utils.pagination import CustomPageNumberPagination
+from config.utils.pagination import CustomPageNumberPagination, get_paginator
 from .filters import ProductFilter
+from .services.listing_filters import ProductListingFilters
+from .services.facets import ProductFacetService
+from .services.home_rails import HomeRailService
+from .services.sales_rollup import SALES_WINDOWS
+from .services.view_counter import ProductViewCounter
+from .services.product_detail import ProductDetailService, REVIEW_PAGE_SIZE
+from .services.variant_lookup import VariantLookupService
+from .services.bought_together import BoughtTogetherService, BOUGHT_TOGETHER_TOP_K
+from .services.product_cards import ProductCardService
+from .services.recently_viewed import RecentlyViewedService, RECENTLY_VIEWED_CAPACITY
+from .services.suggest import ProductSuggestService, SUGGEST_DEFAULT_LIMIT, SUGGEST_MAX_LIMIT
+from .services.trending import TrendingService
+from .services.product_import import IMPORT_FORMATS, ProductImportJob, detect_format
+from .tasks import import_products_file
+from .constants.sorting import PRODUCT_SORT_ORDERING
 from django.db.models import Prefetch, Count, Subquery, OuterRef,Q,Sum
 
 from apps.orders.models import OrderItem
 from apps.catalog.models import Category
+from apps.review.models import Review
+from apps.review.serializers import ReviewListSerializer
+from apps.stores.models import Store
 from decimal import Decimal
 from django.db.models import Avg, Count, Q
 from django.db.models import OuterRef, Subquery, Sum, IntegerField, Value
@@ -74,64 +96,41 @@ class ProductsView(APIView):
         try:
             queryset = (
                 models.Product.objects
-                .select_related("store", "category", "brand")
-                .annotate(
-                    average_rating=Avg(
-                        "reviews__rating",
-                        filter=Q(reviews__status="approved")
-                    ),
-                    total_reviews_count=Count(
-                        "reviews",
-                        filter=Q(reviews__status="approved")
-                    )
-                )
-                .prefetch_related(
-                    Prefetch(
-                        "variants",
-                        queryset=models.ProductVariant.objects
-                        .only("id", "price", "is_default", "product_id", "created_at")
-                        .order_by("created_at"),
-                        to_attr="prefetched_variants"
-                    )
-                )
+                .select_related("store", "category", "brand", "default_variant")
                 .filter(status="published")
             )
 
-            filters = Q()
-
-            brand = request.GET.get("brand")
-            category = request.GET.get("category")
-            search = request.GET.get("search")
-            store = request.GET.get("store")
-            min_price = request.GET.get("min_price")
-            max_price = request.GET.get("max_price")
             new_arrival = request.GET.get("new_arrival", "").lower() == "true"
+            sort = request.GET.get("sort")
+            if new_arrival and not sort:
+                sort = "newest"
 
+            if sort and sort not in PRODUCT_SORT_ORDERING:
+                return Response({
+                    "code": status.HTTP_400_BAD_REQUEST,
+                    "status": "failed",
+                    "message": "Invalid sort option",
+                    "errors": {
+                        "sort": [f"Choose one of: {', '.join(PRODUCT_SORT_ORDERING)}"]
+                    }
+                }, status=status.HTTP_400_BAD_REQUEST)
 
-            if brand:
-                filters &= Q(brand__slug=brand)
-
-            if category:
-                filters &= Q(category__slug=category)
-
-            if search:
-                filters &= Q(title__icontains=search)
-
-            if store:
-                filters &= Q(store__store_name__icontains=store)
-
-            if min_price:
-                filters &= Q(base_price__gte=Decimal(min_price))
-            if max_price:
-                filters &= Q(base_price__lte=Decimal(max_price))
-
-            queryset = queryset.filter(filters)
-            if new_arrival:
-                queryset = queryset.order_by("-created_at")
+            filters = ProductListingFilters.normalize(request.GET)
+            search = filters.get("search")
+            queryset = ProductListingFilters.apply(queryset, filters)
+
+            if sort:
+                ordering = PRODUCT_SORT_ORDERING[sort]
+                tie_breaker = "-id" if ordering.startswith("-") else "id"
+                queryset = queryset.order_by(ordering, tie_breaker)
+            elif search:
+                ordering = "-search_rank"
+                queryset = queryset.order_by("-search_rank", "-id")
             else:
+                ordering = "id"
                 queryset = queryset.order_by("id")
 
-            paginator = CustomPageNumberPagination()
+            paginator = get_paginator(request, ordering=ordering)
             products = paginator.paginate_queryset(queryset, request, view=self)
 
             serializer = serializers.ProductSerializerView(products, many=True)
@@ -156,29 +155,97 @@ class ProductsView(APIView):
 
 
 
-class ProductsDetailView(APIView):
-    # permission_classes = [IsAuthenticated]
+class ProductFacetsView(APIView):
+    """Facet counts for the product grid; accepts the same filters as ProductsView.get"""
 
-    def get(self, request, slug):
+    def get(self, request):
         try:
-            product = models.Product.objects.select_related(
-                "store", "category", "brand"
-            ).prefetch_related(
-                "images", "attributes", "variants","reviews"
-            ).get(slug=slug)
+            filters = ProductListingFilters.normalize(request.GET)
+            facets = ProductFacetService.get_facets(filters)
+            return Response({
+                "code": status.HTTP_200_OK,
+                "status": "success",
+                "message": "Product facets fetched successfully",
+                "data": facets
+            }, status=status.HTTP_200_OK)
+
+        except Exception as e:
+            logger.exception(str(e))
+            return Response({
+                "code": status.HTTP_500_INTERNAL_SERVER_ERROR,
+                "status": "error",
+                "message": "Product facets fetch failed",
+                "errors": {
+                    "server_error": [str(e)]
+                }
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+
+class ProductSuggestView(APIView):
+    """
+    Typeahead completions (?q=gal) for product titles, brands and categories, read from the
+    Redis prefix index only. ?limit caps the products (brands and categories get fewer).
+    """
+    # no per-keystroke user lookup; suggestions are the same for everyone
+    authentication_classes = []
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        try:
+            term = request.GET.get("q", "")
+            try:
+                limit = min(max(int(request.GET.get("limit", SUGGEST_DEFAULT_LIMIT)), 1), SUGGEST_MAX_LIMIT)
+            except ValueError:
+                limit = SUGGEST_DEFAULT_LIMIT
+            catalog_limit = max(1, limit // 2)
+            suggestions = ProductSuggestService.suggest(term, {"product": limit, "brand": catalog_limit, "category": catalog_limit})
+            return Response({
+                "code": status.HTTP_200_OK,
+                "status": "success",
+                "message": "Suggestions fetched successfully",
+                "data": {
+                    "query": term,
+                    "products": suggestions["product"],
+                    "brands": suggestions["brand"],
+                    "categories": suggestions["category"],
+                }
+            }, status=status.HTTP_200_OK)
+
+        except Exception as e:
+            logger.exception(str(e))
+            return Response({
+                "code": status.HTTP_500_INTERNAL_SERVER_ERROR,
+                "status": "error",
+                "message": "Suggestions fetch failed",
+                "errors": {
+                    "server_error": [str(e)]
+                }
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-            # ==============================
-            # Session based view count logic
-            # ==============================
-            session_key = f"viewed_product_{product.id}"
 
-            if not request.session.get(session_key):
-                with transaction.atomic():
-                    product.view_count += 1
-                    product.save(update_fields=["view_count"])
-                    request.session[session_key] = True
+class ProductsDetailView(APIView):
+    # permission_classes = [IsAuthenticated]
 
-            serializer = serializers.ProductDetailSerializer(product)
+    def get(self, request, slug):
+        try:
+            # cached read model: product document and first review page in one round trip
+            document, reviews = ProductDetailService.get(slug)
+            if document is None:
+                raise models.Product.DoesNotExist
+
+            # views are buffered in Redis (one per viewer per day) and flushed in bulk
+            ProductViewCounter.record(document["id"], ProductViewCounter.viewer_key(request))
+            visitor, guest_id = RecentlyViewedService.visitor_for_write(request)
+            RecentlyViewedService.record(visitor, document["id"])
+
+            review_count = document["total_reviews"]
+            next_reviews = None
+            if review_count > REVIEW_PAGE_SIZE:
+                next_reviews = request.build_absolute_uri(
+                    reverse("product_reviews_view", kwargs={"slug": slug})
+                    + f"?page=2&page_size={REVIEW_PAGE_SIZE}"
+                )
 
             log_request(
                 request,
@@ -188,12 +255,20 @@ class ProductsDetailView(APIView):
                 response_status_code=status.HTTP_200_OK
             )
 
-            return Response({
+            return RecentlyViewedService.set_guest_cookie(Response({
                 "code": status.HTTP_200_OK,
                 "status": "success",
                 "message": "Product fetched successfully",
-                "data": serializer.data
-            }, status=status.HTTP_200_OK)
+                "data": {
+                    **document,
+                    "reviews": reviews,
+                    "reviews_pagination": {
+                        "count": review_count,
+                        "page_size": REVIEW_PAGE_SIZE,
+                        "next": next_reviews,
+                    },
+                }
+            }, status=status.HTTP_200_OK), guest_id)
 
         except models.Product.DoesNotExist:
             log_request(
@@ -352,6 +427,287 @@ class ProductsDetailView(APIView):
                 "errors": { "server_error": [str(e)] }
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+class ProductReviewsView(APIView):
+    """Approved reviews of a product, paginated; the detail endpoint embeds only the first page."""
+
+    def get(self, request, slug):
+        try:
+            product_id = models.Product.objects.filter(slug=slug).values_list("id", flat=True).first()
+            if product_id is None:
+                return Response({
+                    "code": status.HTTP_404_NOT_FOUND,
+                    "status": "failed",
+                    "message": "Product not found"
+                }, status=status.HTTP_404_NOT_FOUND)
+
+            reviews = Review.objects.filter(
+                product_id=product_id, status="approved"
+            ).select_related("product")
+            paginator = get_paginator(request, ordering="-created_at")
+            paginator.page_size = REVIEW_PAGE_SIZE
+            result_page = paginator.paginate_queryset(reviews.order_by("-created_at", "-id"), request)
+            serializer = ReviewListSerializer(result_page, many=True)
+            return paginator.get_paginated_response({
+                "code": status.HTTP_200_OK,
+                "status": "success",
+                "message": "Product reviews fetched successfully",
+                "data": serializer.data
+            }, status=status.HTTP_200_OK)
+
+        except Exception as e:
+            logger.exception(str(e))
+            log_request(
+                request,
+                f"Product {slug} reviews fetch failed",
+                "error",
+                f"Server error: {str(e)}",
+                response_status_code=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+            return Response({
+                "code": status.HTTP_500_INTERNAL_SERVER_ERROR,
+                "status": "failed",
+                "message": "Internal server error",
+                "errors": {"server_error": [str(e)]}
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class ProductRecentlyViewedView(APIView):
+    """
+    Products the visitor (user, or guest via the guest_id cookie) viewed most recently,
+    newest first, as cached product cards. ?limit (default 12, max 20). DELETE clears it.
+    """
+
+    def get(self, request):
+        try:
+            try:
+                limit = min(max(int(request.GET.get("limit", 12)), 1), RECENTLY_VIEWED_CAPACITY)
+            except ValueError:
+                limit = 12
+            visitor, _ = RecentlyViewedService.visitor(request)
+            # the whole list, so unpublished products can be skipped without running short
+            product_ids = RecentlyViewedService.product_ids(visitor)
+            return Response({
+                "code": status.HTTP_200_OK,
+                "status": "success",
+                "message": "Recently viewed products fetched successfully",
+                "data": ProductCardService.get_many(product_ids)[:limit]
+            }, status=status.HTTP_200_OK)
+
+        except Exception as e:
+            logger.exception(str(e))
+            return Response({
+                "code": status.HTTP_500_INTERNAL_SERVER_ERROR,
+                "status": "failed",
+                "message": "Internal server error",
+                "errors": {"server_error": [str(e)]}
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    def delete(self, request):
+        try:
+            visitor, _ = RecentlyViewedService.visitor(request)
+            RecentlyViewedService.clear(visitor)
+            return Response({
+                "code": status.HTTP_204_NO_CONTENT,
+                "status": "success",
+                "message": "Recently viewed products cleared successfully"
+            }, status=status.HTTP_204_NO_CONTENT)
+
+        except Exception as e:
+            logger.exception(str(e))
+            return Response({
+                "code": status.HTTP_500_INTERNAL_SERVER_ERROR,
+                "status": "failed",
+                "message": "Internal server error",
+                "errors": {"server_error": [str(e)]}
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class ProductBoughtTogetherView(APIView):
+    """
+    "Customers also bought": the products most often bought in the same paid order,
+    precomputed nightly, returned as cached product cards. ?limit (default 8, max 20).
+    """
+
+    def get(self, request, slug):
+        try:
+            try:
+                limit = min(max(int(request.GET.get("limit", 8)), 1), BOUGHT_TOGETHER_TOP_K)
+            except ValueError:
+                limit = 8
+            # read a few extra neighbours to fill in for unpublished ones
+            neighbours = BoughtTogetherService.neighbour_ids(slug, limit=BOUGHT_TOGETHER_TOP_K)
+            if neighbours is None:
+                return Response({
+                    "code": status.HTTP_404_NOT_FOUND,
+                    "status": "failed",
+                    "message": "Product not found"
+                }, status=status.HTTP_404_NOT_FOUND)
+
+            counts = dict(neighbours)
+            cards = ProductCardService.get_many([product_id for product_id, _ in neighbours])[:limit]
+            return Response({
+                "code": status.HTTP_200_OK,
+                "status": "success",
+                "message": "Frequently bought together products fetched successfully",
+                "data": [{**card, "bought_together_count": counts.get(card["id"], 0)} for card in cards]
+            }, status=status.HTTP_200_OK)
+
+        except Exception as e:
+            logger.exception(str(e))
+            log_request(
+                request,
+                f"Product {slug} bought together fetch failed",
+                "error",
+                f"Server error: {str(e)}",
+                response_status_code=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+            return Response({
+                "code": status.HTTP_500_INTERNAL_SERVER_ERROR,
+                "status": "failed",
+                "message": "Internal server error",
+                "errors": {"server_error": [str(e)]}
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class ProductVariantResolveView(APIView):
+    """
+    Resolve the variant for a set of selected attribute value ids (?values=3,7)
+    from the cached per-product lookup map, plus the values still available.
+    """
+
+    def get(self, request, slug):
+        try:
+            raw_values = ",".join(request.query_params.getlist("values"))
+            try:
+                value_ids = sorted({int(value) for value in raw_values.split(",") if value.strip()})
+            except ValueError:
+                value_ids = None
+            if value_ids is None:
+                return Response({
+                    "code": status.HTTP_400_BAD_REQUEST,
+                    "status": "failed",
+                    "message": "Invalid attribute values",
+                    "errors": {"values": ["Provide attribute value ids separated by commas."]}
+                }, status=status.HTTP_400_BAD_REQUEST)
+
+            lookup = VariantLookupService.get_map(slug)
+            if lookup is None:
+                return Response({
+                    "code": status.HTTP_404_NOT_FOUND,
+                    "status": "failed",
+                    "message": "Product not found"
+                }, status=status.HTTP_404_NOT_FOUND)
+
+            errors = VariantLookupService.validate_selection(lookup, value_ids)
+            if errors:
+                return Response({
+                    "code": status.HTTP_400_BAD_REQUEST,
+                    "status": "failed",
+                    "message": "Invalid attribute values",
+                    "errors": {"values": errors}
+                }, status=status.HTTP_400_BAD_REQUEST)
+
+            variant, available = VariantLookupService.resolve(lookup, value_ids)
+            return Response({
+                "code": status.HTTP_200_OK,
+                "status": "success",
+                "message": "Variant resolved successfully" if variant else "No variant matches the selection",
+                "data": {
+                    "selected": value_ids,
+                    "variant": variant,
+                    "available": available,
+                }
+            }, status=status.HTTP_200_OK)
+
+        except Exception as e:
+            logger.exception(str(e))
+            log_request(
+                request,
+                f"Product {slug} variant resolve failed",
+                "error",
+                f"Server error: {str(e)}",
+                response_status_code=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+            return Response({
+                "code": status.HTTP_500_INTERNAL_SERVER_ERROR,
+                "status": "failed",
+                "message": "Internal server error",
+                "errors": {"server_error": [str(e)]}
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class ProductImportView(APIView):
+    """Upload a CSV / JSONL catalog file; the import runs in the background."""
+    permission_classes = [IsAuthenticated,IsAdminUser]
+
+    def post(self, request):
+        try:
+            upload = request.FILES.get("file")
+            file_format = request.data.get("format") or (detect_format(upload.name) if upload else None)
+            errors = {}
+            if upload is None:
+                errors["file"] = ["No file was submitted."]
+            elif file_format not in IMPORT_FORMATS:
+                errors["format"] = [f"Choose one of: {', '.join(IMPORT_FORMATS)}"]
+            store_id = request.data.get("store")
+            if store_id and not str(store_id).isdigit():
+                errors["store"] = ["A valid store id is required."]
+            if errors:
+                return Response({
+                    "code": status.HTTP_400_BAD_REQUEST,
+                    "status": "failed",
+                    "message": "Invalid import request",
+                    "errors": errors
+                }, status=status.HTTP_400_BAD_REQUEST)
+
+            job_id = uuid.uuid4().hex
+            path = default_storage.save(f"imports/products/{job_id}.{file_format}", upload)
+            ProductImportJob.update(job_id, status="queued", file=upload.name, processed=0, created=0, variants=0, failed=0, errors=[])
+            import_products_file.delay(path, job_id, file_format, store_id=int(store_id) if store_id else None)
+
+            log_request(request, "Product import queued", "info", f"Product import {job_id} queued", response_status_code=status.HTTP_202_ACCEPTED)
+            return Response({
+                "code": status.HTTP_202_ACCEPTED,
+                "status": "success",
+                "message": "Product import queued",
+                "data": {
+                    "job_id": job_id,
+                    "status_url": request.build_absolute_uri(
+                        reverse("product_import_status_view", kwargs={"job_id": job_id})
+                    ),
+                }
+            }, status=status.HTTP_202_ACCEPTED)
+        except Exception as e:
+            logger.exception(str(e))
+            log_request(request, "Product import failed", "error", "Product import failed due to server error", response_status_code=status.HTTP_500_INTERNAL_SERVER_ERROR)
+            return Response({
+                "code": status.HTTP_500_INTERNAL_SERVER_ERROR,
+                "status": "error",
+                "message": "Product import failed due to server error",
+                "errors": {"server_error": [str(e)]}
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class ProductImportStatusView(APIView):
+    """Progress and per-row errors of a background product import."""
+    permission_classes = [IsAuthenticated,IsAdminUser]
+
+    def get(self, request, job_id):
+        job = ProductImportJob.get(job_id)
+        if job is None:
+            return Response({
+                "code": status.HTTP_404_NOT_FOUND,
+                "status": "failed",
+                "message": "Import job not found"
+            }, status=status.HTTP_404_NOT_FOUND)
+        return Response({
+            "code": status.HTTP_200_OK,
+            "status": "success",
+            "message": "Import job fetched successfully",
+            "data": job
+        }, status=status.HTTP_200_OK)
+
+
 class ProductAttributeView(APIView):
     # permission_classes = [IsAuthenticated]
 
@@ -916,6 +1272,100 @@ class ProductVariantView(APIView):
                 "errors": {"server_error": [str(e)]}
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+class ProductVariantMatrixView(APIView):
+    """Create all combinations of the given attribute values as variants in one request."""
+    permission_classes = [IsAuthenticated,IsAdminUser]
+
+    def post(self, request):
+        try:
+            serializer = serializers.ProductVariantMatrixSerializer(data=request.data)
+            if not serializer.is_valid():
+                log_request(request, "Variant matrix generation failed", "warning", "Validation failed for variant matrix generation", response_status_code=status.HTTP_400_BAD_REQUEST)
+                return Response({
+                    "code": status.HTTP_400_BAD_REQUEST,
+                    "status": "fail",
+                    "message": "Validation error",
+                    "errors": serializer.errors
+                }, status=status.HTTP_400_BAD_REQUEST)
+
+            try:
+                result = serializer.save()
+            except ValidationError as e:
+                return Response({
+                    "code": status.HTTP_400_BAD_REQUEST,
+                    "status": "fail",
+                    "message": "Validation error",
+                    "errors": e.detail
+                }, status=status.HTTP_400_BAD_REQUEST)
+
+            product = serializer.validated_data["product"]
+            log_request(request, "Variant matrix generated", "info", f"{len(result['variants'])} variants generated for {product.title}", response_status_code=status.HTTP_201_CREATED)
+            return Response({
+                "code": status.HTTP_201_CREATED,
+                "status": "success",
+                "message": "Product variants generated successfully",
+                "data": {
+                    "product": product.id,
+                    "created": len(result["variants"]),
+                    "skipped": result["skipped"],
+                    "variants": [
+                        {
+                            "id": variant.id,
+                            "sku": variant.sku,
+                            "name": variant.variant_name,
+                            "price": variant.price,
+                            "stock": variant.stock,
+                            "is_default": variant.is_default,
+                            "values": variant.combination,
+                        }
+                        for variant in result["variants"]
+                    ],
+                }
+            }, status=status.HTTP_201_CREATED)
+        except Exception as e:
+            logger.exception(str(e))
+            log_request(request, "Variant matrix generation error", "error", "Variant matrix generation failed due to server error", response_status_code=status.HTTP_500_INTERNAL_SERVER_ERROR)
+            return Response({
+                "code": status.HTTP_500_INTERNAL_SERVER_ERROR,
+                "status": "error",
+                "message": "Variant matrix generation failed due to server error",
+                "errors": {"server_error": [str(e)]}
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+class ProductVariantBulkUpdateView(APIView):
+    """Apply a vendor's stock / price feed by SKU; returns one result per row."""
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        try:
+            serializer = serializers.ProductVariantBulkUpdateSerializer(data=request.data)
+            if not serializer.is_valid():
+                log_request(request, "Variant bulk update failed", "warning", "Validation failed for variant bulk update", response_status_code=status.HTTP_400_BAD_REQUEST)
+                return Response({
+                    "code": status.HTTP_400_BAD_REQUEST,
+                    "status": "fail",
+                    "message": "Validation error",
+                    "errors": serializer.errors
+                }, status=status.HTTP_400_BAD_REQUEST)
+
+            result = serializer.save(user=request.user)
+            log_request(request, "Variant bulk update", "info", f"{result['updated']} variants updated, {result['failed']} rows failed", response_status_code=status.HTTP_200_OK)
+            return Response({
+                "code": status.HTTP_200_OK,
+                "status": "success",
+                "message": f"{result['updated']} variants updated, {result['failed']} rows failed",
+                "data": result
+            }, status=status.HTTP_200_OK)
+        except Exception as e:
+            logger.exception(str(e))
+            log_request(request, "Variant bulk update error", "error", "Variant bulk update failed due to server error", response_status_code=status.HTTP_500_INTERNAL_SERVER_ERROR)
+            return Response({
+                "code": status.HTTP_500_INTERNAL_SERVER_ERROR,
+                "status": "error",
+                "message": "Variant bulk update failed due to server error",
+                "errors": {"server_error": [str(e)]}
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
 class ProductVariantDetailView(APIView):
     permission_classes = [IsAuthenticated]
 
@@ -1247,10 +1697,10 @@ class ProductAnalyticsView(APIView):
                     "product_title": pa.product.title,
                     "date": pa.date,
                     "views": pa.views,
-                    # "add_to_cart": pa.add_to_cart,
-                    # "wishlist": pa.wishlist,
-                    # "sales_count": pa.sales_count,
-                    # "revenue": pa.revenue,
+                    "add_to_cart": pa.add_to_cart,
+                    "wishlist": pa.wishlist,
+                    "sales_count": pa.sales_count,
+                    "revenue": pa.revenue,
                 })
 
             log_request(
@@ -1285,14 +1735,19 @@ class SingleProductAnalyticsView(APIView):
         try:
             product = models.Product.objects.get(slug=slug)
 
-            # Basic analytics: view count
+            # totals over the daily ProductAnalytics rows (fed by the Redis counters)
+            totals = models.ProductAnalytics.objects.filter(product=product).aggregate(
+                add_to_cart=Coalesce(Sum('add_to_cart'), 0),
+                wishlist=Coalesce(Sum('wishlist'), 0),
+                total_sales=Coalesce(Sum('sales_count'), 0),
+                revenue=Coalesce(Sum('revenue'), Decimal('0.00')),
+            )
             analytics_data = {
                 "product_id": product.id,
                 "product_title": product.title,
                 "view_count": product.view_count,
-                # Add more analytics data here as needed, e.g.,
-                # "total_sales": product.order_items.aggregate(total_sales=Sum('quantity'))['total_sales'],
-                # "average_rating": product.reviews.aggregate(avg_rating=Avg('rating'))['avg_rating'],
+                "average_rating": product.avg_rating,
+                **totals,
             }
 
             log_request(
@@ -1338,49 +1793,15 @@ class SingleProductAnalyticsView(APIView):
 
 class LatestProductsView(APIView):
     """
-    Get latest 15 products (optimized, no N+1)
+    Get latest 16 products (served from the home rail cache)
     """
     def get(self, request):
         try:
-            queryset = (
-                models.Product.objects
-                .select_related('brand', 'category', 'store')
-                .annotate(
-                    average_rating=Avg(
-                        "reviews__rating",
-                        filter=Q(reviews__status="approved")
-                    ),
-                    total_reviews_count=Count(
-                        "reviews",
-                        filter=Q(reviews__status="approved")
-                    )
-                )
-                .prefetch_related(
-                    Prefetch(
-                        'variants',
-                        queryset=models.ProductVariant.objects
-                        .only(
-                            'id', 'price', 'is_default',
-                            'product_id', 'created_at'
-                        )
-                        .order_by('created_at'),
-                        to_attr='prefetched_variants'
-                    )
-                )
-                .filter(status="published")
-                .order_by('-created_at')[:16]
-            )
-
-            serializer = serializers.ProductSerializerView(
-                queryset,
-                many=True
-            )
-
             return Response({
                 "code": status.HTTP_200_OK,
                 "status": "success",
                 "message": "Latest products fetched successfully",
-                "data": serializer.data
+                "data": HomeRailService.get("latest")
             }, status=status.HTTP_200_OK)
 
         except Exception as e:
@@ -1396,103 +1817,49 @@ class LatestProductsView(APIView):
 
 class BestSellingProductsView(APIView):
     """
-    Get 15 best selling products (optimized, variants included)
+    Get 16 best selling products.
+    Optional ?window=7d|30d|all (default all), ?category=<slug> and ?store=<slug>;
+    the unscoped all-time list is served from the home rail cache.
     """
     def get(self, request):
         try:
-            # Aggregate total quantity sold for each product
-            product_sales = (
-                OrderItem.objects.filter(
-                    order__payment_status='paid',
-                    order__status__in=['confirmed', 'completed', 'delivered']
-                )
-                .values('product_id')
-                .annotate(total_quantity_sold=Sum('quantity'))
-                .order_by('-total_quantity_sold')
-            )
-
-            # Keep mapping: product_id -> total_quantity_sold
-            sales_map = {item['product_id']: item['total_quantity_sold'] for item in product_sales if item['product_id']}
-
-            product_ids = list(sales_map.keys())
-
-            # Prefetch variants for all products at once
-            products_qs = (
-                models.Product.objects.filter(id__in=product_ids, status="published")
-                .select_related('store', 'brand', 'category')
-                .annotate(
-                    average_rating=Avg(
-                        "reviews__rating",
-                        filter=Q(reviews__status="approved")
-                    ),
-                    total_reviews_count=Count(
-                        "reviews",
-                        filter=Q(reviews__status="approved")
-                    )
-                )
-                .prefetch_related(
-                    Prefetch(
-                        'variants',
-                        queryset=models.ProductVariant.objects.only(
-                            'id', 'price', 'is_default', 'product_id', 'created_at'
-                        ).order_by('created_at'),
-                        to_attr='prefetched_variants'
-                    )
-                )
-            )
+            window = request.GET.get("window", "all")
+            category = request.GET.get("category")
+            store = request.GET.get("store")
 
-            # Map products by id
-            products_map = {p.id: p for p in products_qs}
-
-            # Preserve sales order
-            ordered_products = [products_map[pid] for pid in product_ids if pid in products_map]
-
-            # Fill up with additional published products if less than 16
-            if len(ordered_products) < 16:
-                additional_products = (
-                    models.Product.objects.filter(status="published")
-                    .exclude(id__in=product_ids)
-                    .select_related('store', 'brand', 'category')
-                    .annotate(
-                        average_rating=Avg(
-                            "reviews__rating",
-                            filter=Q(reviews__status="approved")
-                        ),
-                        total_reviews_count=Count(
-                            "reviews",
-                            filter=Q(reviews__status="approved")
-                        )
-                    )
-                    .prefetch_related(
-                        Prefetch(
-                            'variants',
-                            queryset=models.ProductVariant.objects.only(
-                                'id','price','is_default','product_id','created_at'
-                            ).order_by('created_at'),
-                            to_attr='prefetched_variants'
-                        )
-                    )
-                    .order_by('-created_at')[:16 - len(ordered_products)]
-                )
-                ordered_products.extend(additional_products)
+            if window not in SALES_WINDOWS:
+                return Response({
+                    "code": status.HTTP_400_BAD_REQUEST,
+                    "status": "failed",
+                    "message": "Invalid sales window",
+                    "errors": {
+                        "window": [f"Choose one of: {', '.join(SALES_WINDOWS)}"]
+                    }
+                }, status=status.HTTP_400_BAD_REQUEST)
 
-            # Pagination
+            if window == "all" and not category and not store:
+                product_list = HomeRailService.get("best_selling")
+            else:
+                category_id = store_id = None
+                if category:
+                    category_id = Category.objects.filter(slug=category).values_list("id", flat=True).first()
+                if store:
+                    store_id = Store.objects.filter(slug=store).values_list("id", flat=True).first()
+                if (category and not category_id) or (store and not store_id):
+                    product_list = []
+                else:
+                    product_list = HomeRailService.build_best_selling(window, category_id=category_id, store_id=store_id)
+
+            # Pagination over the rail
             paginator = CustomPageNumberPagination()
             paginator.page_size = 16
-            paginated_products = paginator.paginate_queryset(ordered_products, request, view=self)
-
-            # Serialize
-            product_list = []
-            for product in paginated_products:
-                product_data = serializers.ProductSerializerView(product).data
-                product_data['total_sales'] = sales_map.get(product.id, 0)
-                product_list.append(product_data)
+            paginated_products = paginator.paginate_queryset(product_list, request, view=self)
 
             return paginator.get_paginated_response({
                 "code": status.HTTP_200_OK,
                 "status": "success",
                 "message": "Best selling products fetched successfully",
-                "data": product_list
+                "data": paginated_products
             })
 
         except Exception as e:
@@ -1505,96 +1872,66 @@ class BestSellingProductsView(APIView):
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+class TrendingProductsView(APIView):
+    """
+    Products trending now (recent views, wishlist adds, add-to-carts and sales with a
+    24h half-life), read from the Redis sorted set of the scope and returned as cached
+    product cards. Optional ?category=<slug> or ?store=<slug>, ?limit (default 16, max 50).
+    """
+
+    def get(self, request):
+        try:
+            try:
+                limit = min(max(int(request.GET.get("limit", 16)), 1), 50)
+            except ValueError:
+                limit = 16
+            category = request.GET.get("category")
+            store = request.GET.get("store")
+
+            category_id = store_id = None
+            if category:
+                category_id = Category.objects.filter(slug=category).values_list("id", flat=True).first()
+            if store:
+                store_id = Store.objects.filter(slug=store).values_list("id", flat=True).first()
+            if (category and not category_id) or (store and not store_id):
+                products = []
+            else:
+                # read a few extra members to fill in for unpublished ones
+                ranked = TrendingService.top(limit + 8, category_id=category_id, store_id=store_id)
+                scores = dict(ranked)
+                cards = ProductCardService.get_many([product_id for product_id, _ in ranked])[:limit]
+                products = [{**card, "trending_score": scores.get(card["id"], 0)} for card in cards]
+
+            return Response({
+                "code": status.HTTP_200_OK,
+                "status": "success",
+                "message": "Trending products fetched successfully",
+                "data": products
+            }, status=status.HTTP_200_OK)
+
+        except Exception as e:
+            logger.exception(str(e))
+            return Response({
+                "code": status.HTTP_500_INTERNAL_SERVER_ERROR,
+                "status": "error",
+                "message": "Failed to fetch trending products",
+                "errors": {"server_error": [str(e)]}
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
 class TopFiveCategoriesProductView(APIView):
     """
-    Get top 5 categories with their products (optimized)
+    Get top 5 categories with their products (served from the home rail cache)
     """
     
     
     def get(self, request):
         try:
-            # SINGLE QUERY SOLUTION: Get all required data in one optimized query            
-            # Subquery to get latest product IDs for each category
-            # latest_product_subquery = models.Product.objects.filter(
-            #     category_id=OuterRef('pk'),
-            #     status="published"
-            # ).order_by('-created_at').values('id')[:10]
-            
-            # Get categories with products in a single query
-            categories = Category.objects.filter(
-                is_active=True
-            ).order_by('display_order')[:5].prefetch_related(
-                Prefetch(
-                    'products',
-                    queryset=models.Product.objects.filter(
-                        status="published")
-                    .select_related(
-                        'store', 'brand', 'category')
-                    .annotate(
-                        average_rating=Avg(
-                            "reviews__rating",
-                            filter=Q(reviews__status="approved")
-                        ),
-                        total_reviews_count=Count(
-                            "reviews",
-                            filter=Q(reviews__status="approved")
-                        )
-                    )
-                    .prefetch_related(
-                        Prefetch(
-                            'variants',
-                            queryset=models.ProductVariant.objects
-                            .only(
-                                'id', 'price', 'is_default',
-                                'product_id', 'created_at'
-                            )
-                            .order_by('created_at'),
-                            to_attr='prefetched_variants'
-                        )
-                    ).only(
-                        'id', 'slug', 'title', 'type',
-                        'base_price', 'main_image', 'stock',
-                        'is_featured', 'status',
-                        'store_id', 'brand_id', 'category_id'
-                    ).order_by('-created_at')[:10],
-                    to_attr='category_products'
-                )
-            ).annotate(
-                products_count=Count(
-                    'products',
-                    filter=Q(products__status="published")
-                )
-            )
-            
-            # Prepare response data
-            response_data = []
-            
-            for category in categories:
-                # Get products directly from prefetched data
-                category_products = getattr(category, 'category_products', [])
-                
-                # Serialize products
-                product_serializer = serializers.ProductSerializerView(
-                    category_products,
-                    many=True,
-                )
-                
-                category_data = {
-                    "category_id": category.id,
-                    "category_name": category.name,
-                    "category_slug": category.slug,
-                    "display_order": category.display_order,
-                    "products_count": getattr(category, 'products_count', len(category_products)),
-                    "products": product_serializer.data
-                }
-                
-                response_data.append(category_data)
-            
             return Response({
                 "code": status.HTTP_200_OK,
                 "status": "success",
                 "message": "Categories with products fetched successfully",
-                "data": response_data
+                "data": HomeRailService.get("top_categories")
             })
             
         except Exception as e:
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from ...services.rating_aggregate import RatingAggregateService
+
+
+class Command(BaseCommand):
+    help = 'Recomputes product rating averages, review totals and star histograms from approved reviews'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--product', type=int, action='append', dest='product_ids',
+                            help='Only repair this product id (repeatable)')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        try:
+            written = RatingAggregateService.recompute(
+                product_ids=options['product_ids'],
+                batch_size=options['batch_size'],
+            )
+            self.stdout.write(self.style.SUCCESS(f"Rating aggregates recomputed for {written} products"))
+        except Exception as e:
+            self.stdout.write(self.style.ERROR(f"Something went wrong: {e}"))
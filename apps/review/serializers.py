@@ -7,6 +7,7 @@ from django.db import transaction
 from .models import Review
 from apps.orders.models import OrderItem,Order
 from django.core.exceptions import ObjectDoesNotExist
+from .services.rating_aggregate import RatingAggregateService
 
 
 class ReviewCreateSerializer(serializers.Serializer):
@@ -108,6 +109,8 @@ class ReviewCreateSerializer(serializers.Serializer):
             status="pending",
             is_verified_purchase=True,
         )
+        # new reviews start as pending; this is a no-op unless that default changes
+        RatingAggregateService.apply_status_change(review, old_status=None)
 
         return review
     
@@ -0,0 +1,97 @@
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.db import transaction
+from django.db.models import Case, Count, DecimalField, F, FloatField, Value, When
+from django.db.models.functions import Cast
+
+from apps.products.models import Product
+from ..models import Review
+
+
+STAR_FIELDS = {star: f"rating_{star}_count" for star in range(1, 6)}
+
+
+def _average_expression():
+    weighted_sum = sum((F(field) * star for star, field in STAR_FIELDS.items()), Value(0))
+    return Case(
+        When(total_reviews__lte=0, then=Value(Decimal("0.00"))),
+        default=Cast(
+            Cast(weighted_sum, FloatField()) / F("total_reviews"),
+            DecimalField(max_digits=3, decimal_places=2),
+        ),
+        output_field=DecimalField(max_digits=3, decimal_places=2),
+    )
+
+
+class RatingAggregateService:
+    """
+    Keep Product.avg_rating, Product.total_reviews and the per-star histogram
+    in step with approved reviews, so listings never aggregate the review table.
+    """
+
+    @staticmethod
+    @transaction.atomic
+    def apply_status_change(review, old_status):
+        """
+        Apply the delta of a single review moving between statuses.
+        Only transitions into or out of 'approved' touch the product row.
+        """
+        was_approved = old_status == "approved"
+        is_approved = review.status == "approved"
+        if was_approved == is_approved or not review.product_id:
+            return
+
+        delta = 1 if is_approved else -1
+        star_field = STAR_FIELDS[review.rating]
+        products = Product.objects.filter(pk=review.product_id)
+        products.update(**{
+            star_field: F(star_field) + delta,
+            "total_reviews": F("total_reviews") + delta,
+        })
+        products.update(avg_rating=_average_expression())
+
+        from apps.products.services.product_detail import ProductDetailService
+        ProductDetailService.invalidate(review.product_id)
+
+    @staticmethod
+    def histogram(product):
+        return {str(star): getattr(product, field) for star, field in STAR_FIELDS.items()}
+
+    @staticmethod
+    def recompute(product_ids=None, batch_size=1000):
+        """
+        Rebuild the aggregates from the review table in bulk (one grouped query).
+        `product_ids=None` repairs every product. Returns the number of products written.
+        """
+        reviews = Review.objects.filter(status="approved", product__isnull=False)
+        products = Product.objects.all()
+        if product_ids is not None:
+            product_ids = list(product_ids)
+            reviews = reviews.filter(product_id__in=product_ids)
+            products = products.filter(id__in=product_ids)
+
+        stats = {}
+        rows = reviews.values("product_id", "rating").annotate(total=Count("id")).order_by()
+        for row in rows:
+            stats.setdefault(row["product_id"], {})[row["rating"]] = row["total"]
+
+        # products whose stored totals are non-zero but have no approved reviews left
+        stale_ids = products.filter(total_reviews__gt=0).exclude(id__in=list(stats)).values_list("id", flat=True)
+        target_ids = set(stats) | set(stale_ids)
+
+        fields = ["avg_rating", "total_reviews", *STAR_FIELDS.values()]
+        batch = []
+        for product_id in target_ids:
+            counts = stats.get(product_id, {})
+            total = sum(counts.values())
+            weighted = sum(star * count for star, count in counts.items())
+            average = (Decimal(weighted) / Decimal(total)).quantize(Decimal("0.01"), ROUND_HALF_UP) if total else Decimal("0.00")
+            values = {field: counts.get(star, 0) for star, field in STAR_FIELDS.items()}
+            batch.append(Product(pk=product_id, avg_rating=average, total_reviews=total, **values))
+
+        for i in range(0, len(batch), batch_size):
+            Product.objects.bulk_update(batch[i:i + batch_size], fields)
+
+        from apps.products.services.product_detail import ProductDetailService
+        ProductDetailService.drop(target_ids)
+        return len(batch)
@@ -7,6 +7,8 @@ from rest_framework.permissions import IsAuthenticated, IsAdminUser
 from django.shortcuts import get_object_or_404
 from .models import Review
 from .serializers import ReviewCreateSerializer, ReviewListSerializer
+from .services.rating_aggregate import RatingAggregateService
+from django.db import transaction
 
 logger = logging.getLogger("reviews")
 
@@ -61,12 +63,16 @@ class ReviewApproveView(APIView):
     def patch(self, request, review_id):
        
         try:
-            review = Review.objects.get(id=review_id)
-            status_choice = request.data.get('status')
-            if status_choice not in ['approved', 'rejected']:
-                return Response({"code": 400, "status": "failed", "message": "Invalid status"}, status=400)
-            review.status = status_choice
-            review.save()
+            with transaction.atomic():
+                # lock the row so concurrent approvals see each other's status and apply the delta once
+                review = Review.objects.select_for_update().get(id=review_id)
+                status_choice = request.data.get('status')
+                if status_choice not in ['approved', 'rejected']:
+                    return Response({"code": 400, "status": "failed", "message": "Invalid status"}, status=400)
+                old_status = review.status
+                review.status = status_choice
+                review.save()
+                RatingAggregateService.apply_status_change(review, old_status)
             return Response({
                 "code": 200,
                 "status": "success",
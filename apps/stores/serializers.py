@@ -2,6 +2,7 @@
 from rest_framework import serializers
 from .models import Store, CommissionRate
 from django.utils import timezone
+from apps.products.tasks import reindex_product_search_documents, drop_product_details
 
 
 
@@ -42,6 +43,14 @@ class StoreUpdateSerializer(serializers.ModelSerializer):
 			'store_name', 'logo', 'banner', 'address', 'description','slug'
 		]
 
+	def update(self, instance, validated_data):
+		old_name = instance.store_name
+		instance = super().update(instance, validated_data)
+		if instance.store_name != old_name:
+			reindex_product_search_documents.delay_on_commit(store_id=instance.id)
+			drop_product_details.delay_on_commit(store_id=instance.id)
+		return instance
+
 # class StoreSerializerForView(serializers.ModelSerializer):
 # 	class Meta:
 # 		model = Store
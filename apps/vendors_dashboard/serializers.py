@@ -1,6 +1,7 @@
 from rest_framework import serializers
 
 from apps.authentication.models import Vendor,CustomUser,Staff
+from apps.stores.models import StoreAnalytics
 
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
@@ -21,4 +22,18 @@ class StaffSerializerForView(serializers.ModelSerializer):
 
     class Meta:
         model = Staff
-        fields = ["id", "user", "phone_number", "nid_card_image"]
\ No newline at end of file
+        fields = ["id", "user", "phone_number", "nid_card_image"]
+
+
+class StoreAnalyticsSerializer(serializers.ModelSerializer):
+    store_id = serializers.IntegerField(source="store.id", read_only=True)
+    store_name = serializers.CharField(source="store.store_name", read_only=True)
+    store_slug = serializers.CharField(source="store.slug", read_only=True)
+
+    class Meta:
+        model = StoreAnalytics
+        fields = [
+            "store_id", "store_name", "store_slug", "views_count", "products_count", "orders_count",
+            "total_sold_quantity", "total_revenue", "average_rating", "total_reviews", "followers_count",
+            "updated_at",
+        ]
@@ -2,7 +2,7 @@
 from django.urls import path
 from .views import (VendorAllProducts,VendorProductVariantView,
 VendorProductAttributeView,VendorProductAttributeValuesView,
-VendorOwnProfileView,VendorAllOwnStaffView)
+VendorOwnProfileView,VendorAllOwnStaffView,VendorStoreAnalyticsView)
 
 
 
@@ -12,5 +12,6 @@ urlpatterns = [
     path('v1/vendors/products/variants/',VendorProductVariantView.as_view(), name='product_variant_view'),
     path('v1/vendors/products/attributes/',VendorProductAttributeView.as_view(), name='product_attribute_view'),
     path('v1/vendors/staff/',VendorAllOwnStaffView.as_view(), name='vendor_all_own_staff'),
+    path('v1/vendors/analytics/',VendorStoreAnalyticsView.as_view(), name='vendor_store_analytics'),
     path('v1/vendors/products/attributes/<int:pk>/values/',VendorProductAttributeValuesView.as_view(), name='product_attribute_values_view'),
 ]   
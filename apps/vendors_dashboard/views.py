@@ -15,7 +15,7 @@ from apps.products.serializers import (ProductSerializerView,ProductVariantSeria
                                        ProductAttributeSerializerForView,
                                        ProductAttributeValueSerializer)
 
-from apps.stores.models import Store
+from apps.stores.models import Store, StoreAnalytics
 from apps.authentication.models import Vendor,Staff
 #  ---------------------------------------------------------------------------
 
@@ -111,7 +111,7 @@ class VendorAllProducts(APIView):
 
     def get(self, request):
         try:
-            products = Product.objects.filter(store__vendor__user=request.user)
+            products = Product.objects.select_related("store", "brand", "category", "default_variant").filter(store__vendor__user=request.user)
             pagination = CustomPageNumberPagination()
             paginated_products = pagination.paginate_queryset(products, request)
             serializer = ProductSerializerView(paginated_products, many=True)
@@ -373,4 +373,35 @@ class VendorAllOwnStaffView(APIView):
                 "errors": {
                     "server_error": [str(e)]
                 }
-            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
\ No newline at end of file
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class VendorStoreAnalyticsView(APIView):
+    """
+    Analytics of the vendor's own stores, one precomputed StoreAnalytics row per store
+    (kept current by the refresh_scope_analytics task).
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        try:
+            analytics = StoreAnalytics.objects.select_related("store").filter(
+                store__vendor__user=request.user
+            ).order_by("store_id")
+            serializer = serializers.StoreAnalyticsSerializer(analytics, many=True)
+            return Response({
+                "code": status.HTTP_200_OK,
+                "status": "success",
+                "message": "Store analytics retrieved successfully",
+                "data": serializer.data
+            }, status=status.HTTP_200_OK)
+        except Exception as e:
+            logger.exception(str(e))
+            return Response({
+                "code": status.HTTP_500_INTERNAL_SERVER_ERROR,
+                "status": "failed",
+                "message": "Internal server error",
+                "errors": {
+                    "server_error": [str(e)]
+                }
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -8,6 +8,7 @@ from django.shortcuts import get_object_or_404
 
 
 from .models import Wishlist, WishlistItem
+from apps.products.services.event_counter import ProductEventCounter
 from .serializers import (
     WishlistListSerializer,
     WishlistItemCreateSerializer,
@@ -68,6 +69,7 @@ class WishlistItemAPIView(APIView):
 
             if serializer.is_valid():
                 item = serializer.save()
+                ProductEventCounter.record(item.product_id, "wishlist")
 
                 return Response(
                     {
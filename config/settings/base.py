@@ -42,6 +42,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     # 3rd party apps
     'corsheaders',
     'rest_framework',
@@ -68,6 +69,8 @@ INSTALLED_APPS = [
     'apps.admin_dashboard',
     'apps.company_dashboard',
     'apps.vendors_dashboard',
+    'apps.home',
+    'apps.images',
 ]
 
 MIDDLEWARE = [
@@ -286,6 +289,43 @@ CELERY_BEAT_SCHEDULE = {
         'task': 'apps.payments.tasks.process_pending_refunds',
         'schedule': crontab(minute=0),  # Run every hour
     },
+    'flush-product-views-every-2-min': {
+        'task': 'apps.products.tasks.flush_product_views',
+        'schedule': crontab(minute='*/2'),
+    },
+    'flush-product-events-every-2-min': {
+        'task': 'apps.products.tasks.flush_product_events',
+        'schedule': crontab(minute='*/2'),
+    },
+    'refresh-sales-rollup-every-10-min': {
+        'task': 'apps.products.tasks.refresh_sales_rollup',
+        'schedule': crontab(minute='*/10'),
+    },
+    'rebuild-home-rails-every-10-min': {
+        'task': 'apps.products.tasks.rebuild_home_rails',
+        'schedule': crontab(minute='*/10'),  # refresh before the 15 min cache timeout
+    },
+    'refresh-bought-together-nightly': {
+        'task': 'apps.products.tasks.refresh_bought_together',
+        'schedule': crontab(hour=3, minute=0),
+    },
+    'rebuild-suggest-index-hourly': {
+        'task': 'apps.products.tasks.rebuild_suggest_index',
+        'schedule': crontab(minute=15),
+    },
+    'rescale-trending-scores-hourly': {
+        'task': 'apps.products.tasks.rescale_trending_scores',
+        'schedule': crontab(minute=45),
+    },
+    'refresh-scope-analytics': {
+        'task': 'apps.products.tasks.refresh_scope_analytics',
+        'schedule': crontab(minute='*/15'),
+    },
+    'reconcile-scope-analytics-nightly': {
+        'task': 'apps.products.tasks.refresh_scope_analytics',
+        'schedule': crontab(hour=4, minute=30),
+        'kwargs': {'full': True},
+    },
 }
 
 # Email settings for production
@@ -39,6 +39,7 @@ urlpatterns = [
     path('api/vendors_dashboard/',include('apps.vendors_dashboard.urls')),
     path('api/admin_dashboard/',include('apps.admin_dashboard.urls')),
     path('api/company_dashboard/',include('apps.company_dashboard.urls')),
+    path('api/home/',include('apps.home.urls')),
     
 
 
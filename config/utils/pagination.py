@@ -1,5 +1,13 @@
-from rest_framework.pagination import PageNumberPagination
+import base64
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
 from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
 
 
 class CustomPageNumberPagination(PageNumberPagination):
@@ -21,3 +29,146 @@ class CustomPageNumberPagination(PageNumberPagination):
 
 
         }, status=status)
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination over (sort_key, id).
+    No COUNT(*) and no OFFSET: every page is a single indexed range scan,
+    so page 500 costs the same as page 1.
+
+    `ordering` is the sort key, e.g. "-created_at"; "id" is always used as tie-breaker
+    in the same direction. The sort key may also be an annotation (e.g. "-search_rank").
+    """
+    page_size = 100
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def __init__(self, ordering="-created_at", page_size=None):
+        self.ordering = ordering
+        if page_size is not None:
+            self.page_size = page_size
+
+    # ---------- cursor encoding ----------
+    @staticmethod
+    def _encode_value(value):
+        if isinstance(value, (datetime, date)):
+            return value.isoformat()
+        if isinstance(value, Decimal):
+            return str(value)
+        return value
+
+    def encode_cursor(self, value, pk, reverse=False):
+        payload = json.dumps({"v": self._encode_value(value), "id": pk, "r": int(reverse)}, separators=(",", ":"))
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            padded = encoded + "=" * (-len(encoded) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+            return payload["v"], int(payload["id"]), bool(payload.get("r", 0))
+        except (TypeError, ValueError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+
+    # ---------- helpers ----------
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+            if size > 0:
+                return min(size, self.max_page_size)
+        except (KeyError, ValueError):
+            pass
+        return self.page_size
+
+    @property
+    def _field(self):
+        return self.ordering.lstrip("-")
+
+    @property
+    def _descending(self):
+        return self.ordering.startswith("-")
+
+    def _sort_value(self, obj):
+        return getattr(obj, self._field)
+
+    def _keyset_filter(self, value, pk, forward):
+        # forward=True walks in the ordering direction, False walks back
+        less_than = self._descending == forward
+        op = "lt" if less_than else "gt"
+        if self._field == "id":
+            return Q(**{f"id__{op}": pk})
+        return Q(**{f"{self._field}__{op}": value}) | Q(**{self._field: value, f"id__{op}": pk})
+
+    def _order_by(self, forward):
+        descending = self._descending == forward
+        prefix = "-" if descending else ""
+        if self._field == "id":
+            return [f"{prefix}id"]
+        return [f"{prefix}{self._field}", f"{prefix}id"]
+
+    # ---------- paginator API ----------
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+
+        cursor = self.decode_cursor(request)
+        forward = True
+        if cursor is not None:
+            value, pk, reverse = cursor
+            forward = not reverse
+            queryset = queryset.filter(self._keyset_filter(value, pk, forward))
+
+        # fetch one extra row to know whether another page exists
+        rows = list(queryset.order_by(*self._order_by(forward))[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if not forward:
+            rows.reverse()
+
+        self.page = rows
+        if forward:
+            self.has_next, self.has_previous = has_more, cursor is not None
+        else:
+            self.has_next, self.has_previous = True, has_more
+        return rows
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        last = self.page[-1]
+        cursor = self.encode_cursor(self._sort_value(last), last.pk)
+        return replace_query_param(self.base_url, self.cursor_query_param, cursor)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        first = self.page[0]
+        cursor = self.encode_cursor(self._sort_value(first), first.pk, reverse=True)
+        return replace_query_param(self.base_url, self.cursor_query_param, cursor)
+
+    def get_paginated_response(self, data, status=200):
+        return Response({
+            **({"data": data} if isinstance(data, list) else data),
+            "pagination": {
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                "page_size": self.page_size,
+            }
+        }, status=status)
+
+
+def get_paginator(request, ordering="-created_at"):
+    """
+    Pick the paginator for a listing view.
+    Clients opt into keyset pagination with `?pagination=cursor` (or by following a cursor link);
+    everything else keeps the page-number behaviour and response shape.
+    """
+    if request.query_params.get("pagination") == "cursor" or request.query_params.get(KeysetPagination.cursor_query_param):
+        return KeysetPagination(ordering=ordering)
+    return CustomPageNumberPagination()
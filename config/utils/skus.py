@@ -0,0 +1,11 @@
+import re
+
+
+def normalize_sku(value):
+    """
+    The stored form of a SKU: lowercase, punctuation (hyphens included) removed and runs of
+    whitespace joined with "-". Every path that writes or looks up variants by SKU uses it,
+    so "ABC-123" from a feed finds the variant saved as "abc123".
+    """
+    value = re.sub(r'[^\w\s]', '', str(value).strip())
+    return re.sub(r'\s+', '-', value).lower().strip('-')
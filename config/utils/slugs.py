@@ -0,0 +1,49 @@
+from functools import reduce
+from operator import or_
+
+from django.db.models import Q
+from django.utils.text import slugify
+
+
+# distinct base slugs looked up per query (keeps the OR list under SQLite's expression depth limit)
+SLUG_LOOKUP_CHUNK = 500
+
+
+def allocate_slugs(model, texts, field="slug"):
+    """
+    Unique slugs for `texts`, in order, following the "base", "base-1", "base-2" scheme.
+
+    Taken slugs are read in bulk instead of one exists() query per attempt: one indexed
+    `IN` query for the base slugs, plus one "base-" prefix query for the bases that turned
+    out to be taken (each per SLUG_LOOKUP_CHUNK bases). Duplicates within `texts` get
+    successive suffixes.
+    """
+    max_length = model._meta.get_field(field).max_length
+    # leave room for a "-<n>" suffix
+    bases = [slugify(text)[:max_length - 8].strip("-") for text in texts]
+    manager = model._default_manager
+
+    taken = set()
+    distinct = sorted(set(bases))
+    for i in range(0, len(distinct), SLUG_LOOKUP_CHUNK):
+        taken.update(manager.filter(**{f"{field}__in": distinct[i:i + SLUG_LOOKUP_CHUNK]}).values_list(field, flat=True))
+
+    suffixed = sorted(taken)
+    for i in range(0, len(suffixed), SLUG_LOOKUP_CHUNK):
+        chunk = suffixed[i:i + SLUG_LOOKUP_CHUNK]
+        condition = reduce(or_, (Q(**{f"{field}__startswith": f"{base}-"}) for base in chunk))
+        taken.update(manager.filter(condition).values_list(field, flat=True))
+
+    slugs = []
+    next_suffix = {}
+    for base in bases:
+        slug = base
+        if slug in taken:
+            counter = next_suffix.get(base, 1)
+            while f"{base}-{counter}" in taken:
+                counter += 1
+            slug = f"{base}-{counter}"
+            next_suffix[base] = counter + 1
+        taken.add(slug)
+        slugs.append(slug)
+    return slugs